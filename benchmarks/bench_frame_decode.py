@@ -0,0 +1,81 @@
+"""
+Per-frame cost of getting an inbound media payload into the call's `AudioSampleBuffer`:
+decoding to a new array and appending it, vs decoding in place (`reserve`/`commit`).
+
+Allocations are counted with tracemalloc over frames replayed into a buffer that is
+already big enough, i.e. the steady state of a call:
+- "retained" is what's still allocated afterwards (should be 0);
+- "transient" is the peak allocated while handling a single frame,
+  above what was allocated before it (Python and numpy objects freed again right away).
+
+    PYTHONPATH='.' python benchmarks/bench_frame_decode.py [--frames 5000]
+"""
+from pathlib import Path
+import argparse
+import json
+import time
+import tracemalloc
+
+from twilio_phone_calls.audio.audio_conversions import (
+    twilio_mulaw_str__to__np_pcm_wav,
+    twilio_mulaw_str__into__np_pcm_wav,
+    twilio_mulaw_str__max_samples,
+)
+from twilio_phone_calls.audio.audio_sample_buffer import AudioSampleBuffer
+
+def _append(buffer: AudioSampleBuffer, payload: str) -> None:
+    buffer.append(twilio_mulaw_str__to__np_pcm_wav(payload))
+
+def _decode_in_place(buffer: AudioSampleBuffer, payload: str) -> None:
+    buffer.commit(twilio_mulaw_str__into__np_pcm_wav(payload, buffer.reserve(twilio_mulaw_str__max_samples(payload))))
+
+def _new_buffer(payloads: list[str]) -> AudioSampleBuffer:
+    buffer = AudioSampleBuffer(initial_capacity=sum(map(twilio_mulaw_str__max_samples, payloads)) + 160)
+    _decode_in_place(buffer, payloads[0]) # Size the scratch arrays.
+    return buffer
+
+def _per_frame_us(handle_frame, payloads: list[str]) -> float:
+    best = float("inf")
+    for _ in range(5):
+        buffer = _new_buffer(payloads)
+        start_time = time.perf_counter()
+        for payload in payloads:
+            handle_frame(buffer, payload)
+        best = min(best, time.perf_counter() - start_time)
+    return best / len(payloads) * 1e6
+
+def _allocations(handle_frame, payloads: list[str]) -> tuple[float, float]:
+    """
+    (retained bytes per frame, mean transient bytes per frame).
+    """
+    buffer = _new_buffer(payloads)
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    transient_total = 0
+    for payload in payloads:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        handle_frame(buffer, payload)
+        _, peak = tracemalloc.get_traced_memory()
+        transient_total += peak - before
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return retained / len(payloads), transient_total / len(payloads)
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stream", default="tests/fixtures/stream1.txt")
+    parser.add_argument("--frames", type=int, default=5000)
+    args = parser.parse_args()
+    with Path(args.stream).open() as f:
+        payloads = [message["media"]["payload"] for message in map(json.loads, f) if message["event"] == "media"]
+    payloads = (payloads * (args.frames // len(payloads) + 1))[:args.frames]
+
+    print(f"Per frame, over {len(payloads)} frames:")
+    print(f"  {'':<20} {'time (us)':>10} {'retained (B)':>13} {'transient (B)':>14}")
+    for name, handle_frame in (("decode + append", _append), ("decode in place", _decode_in_place)):
+        retained, transient = _allocations(handle_frame, payloads)
+        print(f"  {name:<20} {_per_frame_us(handle_frame, payloads):10.2f} {retained:13.1f} {transient:14.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Wall time of `import twilio_phone_calls` in a fresh interpreter,
+plus the slowest modules according to `python -X importtime`.
+
+    PYTHONPATH='.' python benchmarks/bench_import_time.py
+"""
+import statistics
+import subprocess
+import sys
+import time
+
+def _import_seconds() -> float:
+    start_time = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import twilio_phone_calls"], check=True)
+    return time.perf_counter() - start_time
+
+def _baseline_seconds() -> float:
+    start_time = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return time.perf_counter() - start_time
+
+def main(runs: int = 7) -> None:
+    baseline = statistics.median(_baseline_seconds() for _ in range(runs))
+    import_time = statistics.median(_import_seconds() for _ in range(runs))
+    print(f"import twilio_phone_calls: {(import_time - baseline) * 1000:.0f}ms (median of {runs}, interpreter startup excluded)")
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import twilio_phone_calls"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines()[1:]: # "import time: <self us> | <cumulative us> | <module>"
+        _, cumulative_us, module = line.split("|", 2)
+        rows.append((int(cumulative_us), module.rstrip()))
+    print("Slowest imports (cumulative):")
+    for cumulative_us, module in sorted(rows, reverse=True)[:10]:
+        print(f"  {cumulative_us / 1000:8.1f}ms {module}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Parsing inbound media frames: json.loads + pydantic vs the `str.find` fast path (`parse_stream_media_frame`),
+over the frames in tests/fixtures/stream1.txt.
+
+    PYTHONPATH='.' python benchmarks/bench_media_parse.py
+"""
+from pathlib import Path
+import json
+import time
+
+from twilio_phone_calls.twilio_pydantic import StreamMediaMessage, parse_stream_media_frame
+
+def _per_frame_us(parse, media_lines: list[str], repeat: int = 100) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        for line in media_lines:
+            parse(line)
+        best = min(best, time.perf_counter() - start_time)
+    return best / len(media_lines) * 1e6
+
+def main() -> None:
+    with Path("tests/fixtures/stream1.txt").open() as f:
+        media_lines = [line for line in f if '"event":"media"' in line]
+    results = {
+        "json.loads + model_validate": lambda line: StreamMediaMessage.model_validate(json.loads(line)).media.payload,
+        "json.loads only": lambda line: json.loads(line)["media"]["payload"],
+        "parse_stream_media_frame (str)": lambda line: parse_stream_media_frame(line).payload,
+    }
+    media_bytes = [line.encode() for line in media_lines]
+    print(f"Per media frame over {len(media_lines)} frames (microseconds):")
+    for name, parse in results.items():
+        print(f"  {name:<34} {_per_frame_us(parse, media_lines):6.2f}")
+    print(f"  {'parse_stream_media_frame (bytes)':<34} {_per_frame_us(lambda b: parse_stream_media_frame(b).payload, media_bytes):6.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Per-frame cost of the NumPy mu-law codec (vs audioop, when it's still importable).
+
+    PYTHONPATH='.' python benchmarks/bench_mulaw.py
+"""
+import timeit
+import warnings
+
+import numpy as np
+
+from twilio_phone_calls.audio.audio_conversions import TWILIO_FRAME_SIZE
+from twilio_phone_calls.audio.mulaw import mulaw_decode, mulaw_encode
+
+def _per_frame_us(stmt, number: int = 100_000) -> float:
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1e6
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    mulaw_frame: bytes = rng.integers(0, 256, size=TWILIO_FRAME_SIZE, dtype=np.uint8).tobytes()
+    pcm_int8 = mulaw_decode(mulaw_frame, dtype=np.int8)
+    pcm_int16 = mulaw_decode(mulaw_frame, dtype=np.int16)
+    pcm_float32 = mulaw_decode(mulaw_frame, dtype=np.float32)
+    out_int16 = np.empty(TWILIO_FRAME_SIZE, dtype=np.int16)
+    out_mulaw = np.empty(TWILIO_FRAME_SIZE, dtype=np.uint8)
+
+    print(f"Per {TWILIO_FRAME_SIZE}-sample frame (microseconds):")
+    results = {
+        "decode -> int8": lambda: mulaw_decode(mulaw_frame, dtype=np.int8),
+        "decode -> int16": lambda: mulaw_decode(mulaw_frame, dtype=np.int16),
+        "decode -> float32": lambda: mulaw_decode(mulaw_frame, dtype=np.float32),
+        "decode -> int16 (out=)": lambda: mulaw_decode(mulaw_frame, dtype=np.int16, out=out_int16),
+        "encode <- int8": lambda: mulaw_encode(pcm_int8),
+        "encode <- int16": lambda: mulaw_encode(pcm_int16),
+        "encode <- float32": lambda: mulaw_encode(pcm_float32),
+        "encode <- int16 (out=)": lambda: mulaw_encode(pcm_int16, out=out_mulaw),
+    }
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        try:
+            import audioop
+        except ImportError:
+            audioop = None
+    if audioop is not None:
+        pcm_int8_bytes, pcm_int16_bytes = pcm_int8.tobytes(), pcm_int16.tobytes()
+        results["audioop.ulaw2lin width=1"] = lambda: audioop.ulaw2lin(mulaw_frame, 1)
+        results["audioop.ulaw2lin width=2"] = lambda: audioop.ulaw2lin(mulaw_frame, 2)
+        results["audioop.lin2ulaw width=1"] = lambda: audioop.lin2ulaw(pcm_int8_bytes, 1)
+        results["audioop.lin2ulaw width=2"] = lambda: audioop.lin2ulaw(pcm_int16_bytes, 2)
+    for name, stmt in results.items():
+        print(f"  {name:<28} {_per_frame_us(stmt):6.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+End-to-end replay: N simultaneous `TwilioPhoneCall`s, each fed a recorded JSONL stream
+at real-time (--speed 1) or accelerated rate, with stub speech-to-text, text-to-text
+and text-to-speech that only sleep. Twilio's mark acknowledgements are simulated
+once the audio sent before them would have finished playing.
+
+Reports media frames/sec and handling cost per frame, event-loop lag,
+per-turn latency percentiles (from the instrumentation) and memory per call.
+
+    PYTHONPATH='.' python benchmarks/bench_replay.py [--calls 16] [--speed 10] [--stt-latency 0.2] [--json]
+"""
+from pathlib import Path
+import argparse
+import asyncio
+import base64
+import json
+import time
+import tracemalloc
+
+import numpy as np
+
+from twilio_phone_calls import TwilioPhoneCall
+from twilio_phone_calls.audio.audio_executor import AudioExecutor
+from twilio_phone_calls.audio.stt_engine import SttBackend, set_stt_backend
+from twilio_phone_calls.audio.tts_cache import TtsCache
+from twilio_phone_calls.audio.tts_engine import TtsBackend, set_tts_backend
+from twilio_phone_calls.instrumentation import InMemorySink
+
+FRAME_SECONDS = 0.02
+
+class SleepySttBackend(SttBackend):
+    def __init__(self, latency_seconds: float):
+        self.latency_seconds = latency_seconds
+
+    def transcribe(self, np_pcm_wav: np.ndarray, sample_rate: int = 8000) -> str:
+        time.sleep(self.latency_seconds)
+        return "I would like to book a table for two."
+
+class SleepyTtsBackend(TtsBackend):
+    """
+    Silence, about as long as the text would take to say (80ms per word).
+    """
+    name = "sleepy"
+
+    def __init__(self, latency_seconds: float):
+        self.latency_seconds = latency_seconds
+
+    def text__to__mulaw_bytes(self, text: str) -> bytes:
+        time.sleep(self.latency_seconds)
+        return b"\xff" * (640 * len(text.split()))
+
+class _FakeTwilio:
+    """
+    The websocket of one call: acknowledges each mark once the audio before it has played.
+    """
+    def __init__(self, speed: float):
+        self.speed = speed
+        self.phone_call: TwilioPhoneCall | None = None
+        self.playback_ends_at = 0.0
+        self.ack_tasks: set[asyncio.Task] = set()
+
+    async def send_text(self, text: str) -> None:
+        now = time.perf_counter()
+        self.playback_ends_at = max(self.playback_ends_at, now)
+        if text.startswith('{"event":"media"'):
+            payload = json.loads(text)["media"]["payload"]
+            self.playback_ends_at += len(base64.b64decode(payload)) / 8000 / self.speed
+        elif text.startswith('{"event":"mark"'):
+            ack_task = asyncio.create_task(self._ack(json.loads(text)["mark"]["name"], self.playback_ends_at - now))
+            self.ack_tasks.add(ack_task)
+            ack_task.add_done_callback(self.ack_tasks.discard)
+        elif text.startswith('{"event":"clear"'):
+            self.playback_ends_at = now
+
+    async def _ack(self, name: str, delay: float) -> None:
+        await asyncio.sleep(delay)
+        await self.phone_call.receive_twilio_message({"event": "mark", "mark": {"name": name}})
+
+async def _respond(text: str, llm_latency: float) -> str:
+    await asyncio.sleep(llm_latency)
+    return "Sure. For what time? We have tables at seven and at nine."
+
+async def _replay_call(
+    lines: list[str],
+    call_index: int,
+    args: argparse.Namespace,
+    audio_executor: AudioExecutor,
+    instrumentation_sink: InMemorySink | None,
+    handling_seconds: list[float],
+) -> TwilioPhoneCall:
+    lines = [line.replace("test_stream", f"bench_stream_{call_index}") for line in lines]
+    start_message = next(json.loads(line) for line in lines if '"event":"start"' in line)
+    media_lines = [line for line in lines if '"event":"media"' in line]
+    fake_twilio = _FakeTwilio(args.speed)
+    phone_call = TwilioPhoneCall.from_start_message(
+        start_message,
+        send_websocket_message_async_method=fake_twilio.send_text,
+        text_to_text_async_method=lambda text: _respond(text, args.llm_latency),
+        audio_executor=audio_executor,
+        tts_cache=TtsCache(max_memory_bytes=0), # Every sentence is synthesized.
+        instrumentation_sink=instrumentation_sink,
+    )
+    fake_twilio.phone_call = phone_call
+    await asyncio.sleep(call_index * FRAME_SECONDS / args.calls / args.speed) # Spread frame arrivals.
+    start_time = time.perf_counter()
+    for frame_index, line in enumerate(media_lines):
+        delay = start_time + frame_index * FRAME_SECONDS / args.speed - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        handling_start = time.perf_counter()
+        await phone_call.receive_twilio_text(line)
+        handling_seconds.append(time.perf_counter() - handling_start)
+    while fake_twilio.ack_tasks:
+        await asyncio.gather(*fake_twilio.ack_tasks)
+    return phone_call
+
+async def _monitor_loop_lag(lags: list[float], interval: float = 0.01) -> None:
+    while True:
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - expected))
+
+async def _run(
+    lines: list[str],
+    args: argparse.Namespace,
+    instrumentation_sink: InMemorySink | None,
+) -> dict:
+    audio_executor = AudioExecutor(max_workers=args.workers)
+    lags: list[float] = []
+    handling_seconds: list[float] = []
+    lag_task = asyncio.create_task(_monitor_loop_lag(lags))
+    start_time = time.perf_counter()
+    try:
+        phone_calls = await asyncio.gather(*[
+            _replay_call(lines, call_index, args, audio_executor, instrumentation_sink, handling_seconds)
+            for call_index in range(args.calls)
+        ])
+    finally:
+        lag_task.cancel()
+        audio_executor.shutdown()
+    wall_seconds = time.perf_counter() - start_time
+    return {
+        "phone_calls": phone_calls,
+        "wall_seconds": wall_seconds,
+        "frames": len(handling_seconds),
+        "handling_seconds": handling_seconds,
+        "lags": lags,
+    }
+
+def _percentiles(values: list[float], scale: float = 1000.0) -> dict[str, float]:
+    if not values:
+        return {}
+    values = sorted(values)
+    return {
+        f"p{q}": round(values[min(len(values) - 1, int(q / 100 * len(values)))] * scale, 2)
+        for q in (50, 90, 99)
+    } | {"max": round(values[-1] * scale, 2)}
+
+def _memory_per_call_kib(lines: list[str], args: argparse.Namespace) -> float:
+    """
+    A separate run under tracemalloc (which slows everything down):
+    the peak of what the calls allocated, per call.
+    """
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    asyncio.run(_run(lines, args, None))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (peak - baseline) / args.calls / 1024
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--streams", nargs="*", default=["tests/fixtures/stream1.txt"])
+    parser.add_argument("--calls", type=int, default=16)
+    parser.add_argument("--speed", type=float, default=10.0, help="1 is real time.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--stt-latency", type=float, default=0.2)
+    parser.add_argument("--tts-latency", type=float, default=0.1)
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--json", action="store_true", help="One JSON object per stream, for tracking regressions.")
+    args = parser.parse_args()
+    # Synthetic latencies are in real seconds; scale them with the replay.
+    set_stt_backend(SleepySttBackend(args.stt_latency / args.speed))
+    set_tts_backend(SleepyTtsBackend(args.tts_latency / args.speed))
+    args.llm_latency /= args.speed
+
+    for stream in args.streams:
+        with Path(stream).open() as f:
+            lines = f.readlines()
+        instrumentation_sink = InMemorySink()
+        result = asyncio.run(_run(lines, args, instrumentation_sink))
+        turn_latency_ms = { # Scaled back to real time.
+            name: {f"p{q}": round(histogram.percentile(q) * args.speed * 1000, 1) for q in (50, 90, 99)}
+            for name, histogram in instrumentation_sink.histograms.items()
+            if histogram.count and name in ("stt", "text_to_text", "tts", "time_to_first_audio", "turn")
+        }
+        report = {
+            "stream": stream,
+            "calls": args.calls,
+            "speed": args.speed,
+            "turns": len(instrumentation_sink.spans()),
+            "frames_per_second": round(result["frames"] / result["wall_seconds"]),
+            "handling_us_per_frame": _percentiles(result["handling_seconds"], scale=1e6),
+            "loop_lag_ms": _percentiles(result["lags"]),
+            "turn_latency_ms_at_real_time": turn_latency_ms,
+            "memory_per_call_kib": round(_memory_per_call_kib(lines, args), 1),
+        }
+        if args.json:
+            print(json.dumps(report))
+            continue
+        print(f"== {stream}: {args.calls} calls at {args.speed:g}x, {report['turns']} turns")
+        print(f"  media frames/sec:      {report['frames_per_second']}")
+        print(f"  handling per frame:    {report['handling_us_per_frame']}us (the tail includes whole turns)")
+        print(f"  event loop lag (ms):   {report['loop_lag_ms']}")
+        print(f"  memory per call:       {report['memory_per_call_kib']}KiB (peak, tracemalloc)")
+        print(f"  turn latency (ms, scaled back to real time):")
+        for name, percentiles in turn_latency_ms.items():
+            print(f"    {name:<20} {percentiles}")
+
+if __name__ == "__main__":
+    main()
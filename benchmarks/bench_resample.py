@@ -0,0 +1,67 @@
+"""
+`resample` (NumPy polyphase) against librosa's soxr_hq, when librosa is installed:
+speed on a 10 second clip of tones at the rates the calls use, and how far apart the outputs are.
+Then the per-chunk cost of `PcmToMulawStream` on 24kHz audio arriving in small pieces.
+
+    PYTHONPATH='.' python benchmarks/bench_resample.py [--seconds 10] [--chunk-ms 50]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from twilio_phone_calls.audio.resample import PcmToMulawStream, resample
+
+def _best_ms(function, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start_time)
+    return min(timings) * 1000
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--chunk-ms", type=float, default=50.0)
+    args = parser.parse_args()
+    try:
+        import librosa
+    except ImportError:
+        librosa = None
+    rng = np.random.default_rng(0)
+
+    print(f"{args.seconds:g}s of audio:")
+    print(f"  {'':<16} {'numpy (ms)':>10} {'librosa (ms)':>12} {'rel. rms diff':>13}")
+    for orig_sample_rate, target_sample_rate in ((24000, 8000), (8000, 16000), (22050, 8000), (44100, 8000)):
+        # Tones up to 80% of the lower Nyquist frequency: the two filters' transition bands differ.
+        times = np.arange(int(args.seconds * orig_sample_rate)) / orig_sample_rate
+        frequencies = rng.uniform(50, 0.4 * min(orig_sample_rate, target_sample_rate), size=40)
+        signal = (0.02 * np.sin(2 * np.pi * frequencies[:, None] * times).sum(axis=0)).astype(np.float32)
+        numpy_ms = _best_ms(lambda: resample(signal, orig_sample_rate, target_sample_rate))
+        name = f"{orig_sample_rate} -> {target_sample_rate}"
+        if librosa is None:
+            print(f"  {name:<16} {numpy_ms:10.1f} {'-':>12} {'-':>13}")
+            continue
+        expected = librosa.resample(signal, orig_sr=orig_sample_rate, target_sr=target_sample_rate)
+        librosa_ms = _best_ms(lambda: librosa.resample(signal, orig_sr=orig_sample_rate, target_sr=target_sample_rate))
+        resampled = resample(signal, orig_sample_rate, target_sample_rate)
+        inner = slice(100, len(expected) - 100) # Edges are padded differently.
+        difference = np.sqrt(np.mean((resampled[inner] - expected[inner]) ** 2) / np.mean(expected[inner] ** 2))
+        print(f"  {name:<16} {numpy_ms:10.1f} {librosa_ms:12.1f} {difference:13.1e}")
+
+    chunk_size = int(24000 * args.chunk_ms / 1000)
+    signal = (0.3 * rng.standard_normal(int(args.seconds * 24000))).astype(np.float32)
+    chunks = [signal[start:start + chunk_size] for start in range(0, len(signal), chunk_size)]
+
+    def stream() -> None:
+        pcm_to_mulaw_stream = PcmToMulawStream(24000)
+        for chunk in chunks:
+            pcm_to_mulaw_stream.process(chunk)
+        pcm_to_mulaw_stream.flush()
+
+    stream_ms = _best_ms(stream)
+    print(f"PcmToMulawStream, 24kHz in {args.chunk_ms:g}ms chunks: {1000 * stream_ms / len(chunks):.0f}us per chunk")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+Load test for `twilio_phone_calls.serve`: hundreds of simulated Twilio media streams at once,
+each replaying a recorded JSONL stream at real time (--speed 1) or faster, and echoing
+marks once the audio sent before them would have finished playing.
+
+By default the app runs in this process (driven over ASGI, with stub models that only sleep),
+so the numbers are the server's own cost. With `--url`, the streams go over real websockets
+(the `websockets` package) to a server started separately, e.g.
+
+    python -m twilio_phone_calls.serve --workers 4 --max-concurrent-calls 100
+
+Reports media frames/sec, answered streams, time to the greeting, and event-loop lag.
+
+    PYTHONPATH='.' python benchmarks/bench_serve.py [--streams 300] [--speed 1] [--url ws://127.0.0.1:8000/stream]
+"""
+from pathlib import Path
+import argparse
+import asyncio
+import base64
+import contextlib
+import json
+import time
+
+import numpy as np
+
+from twilio_phone_calls.audio.audio_executor import AudioExecutor
+from twilio_phone_calls.audio.stt_engine import SttBackend, set_stt_backend
+from twilio_phone_calls.audio.tts_cache import TtsCache
+from twilio_phone_calls.audio.tts_engine import TtsBackend, set_tts_backend
+from twilio_phone_calls.call_manager import CallManager
+from twilio_phone_calls.serve import create_app
+
+FRAME_SECONDS = 0.02
+GREETING = "Hey! How can I help you?"
+
+class SleepySttBackend(SttBackend):
+    def __init__(self, latency_seconds: float):
+        self.latency_seconds = latency_seconds
+
+    def transcribe(self, np_pcm_wav: np.ndarray, sample_rate: int = 8000) -> str:
+        time.sleep(self.latency_seconds)
+        return "I would like to book a table for two."
+
+class SleepyTtsBackend(TtsBackend):
+    """
+    Silence, about as long as the text would take to say (80ms per word).
+    """
+    name = "sleepy"
+
+    def __init__(self, latency_seconds: float):
+        self.latency_seconds = latency_seconds
+
+    def text__to__mulaw_bytes(self, text: str) -> bytes:
+        time.sleep(self.latency_seconds)
+        return b"\xff" * (640 * len(text.split()))
+
+class _AsgiConnection:
+    """
+    A websocket to the app in this process.
+    """
+    def __init__(self, app):
+        self._app = app
+        self._to_app: asyncio.Queue[dict] = asyncio.Queue()
+        self._from_app: asyncio.Queue[str | None] = asyncio.Queue()
+        self._app_task: asyncio.Task | None = None
+
+    async def connect(self) -> None:
+        scope = {
+            "type": "websocket", "asgi": {"version": "3.0"}, "scheme": "ws", "path": "/stream",
+            "raw_path": b"/stream", "query_string": b"", "root_path": "", "headers": [(b"host", b"bench")],
+            "client": ("127.0.0.1", 0), "server": ("bench", 80), "subprotocols": [],
+        }
+        self._app_task = asyncio.create_task(self._app(scope, self._to_app.get, self._receive_from_app))
+        self._to_app.put_nowait({"type": "websocket.connect"})
+
+    async def send(self, text: str) -> None:
+        self._to_app.put_nowait({"type": "websocket.receive", "text": text})
+
+    async def recv(self) -> str | None:
+        """
+        None once the app has closed the connection.
+        """
+        return await self._from_app.get()
+
+    async def close(self) -> None:
+        self._to_app.put_nowait({"type": "websocket.disconnect", "code": 1000})
+        await self._app_task
+
+    async def _receive_from_app(self, message: dict) -> None:
+        if message["type"] == "websocket.send":
+            self._from_app.put_nowait(message["text"])
+        elif message["type"] == "websocket.close":
+            self._from_app.put_nowait(None)
+
+class _WebsocketConnection:
+    """
+    A real websocket to a running server.
+    """
+    def __init__(self, url: str):
+        self._url = url
+        self._websocket = None
+
+    async def connect(self) -> None:
+        from websockets.asyncio.client import connect
+        self._websocket = await connect(self._url, compression=None)
+
+    async def send(self, text: str) -> None:
+        await self._websocket.send(text)
+
+    async def recv(self) -> str | None:
+        from websockets.exceptions import ConnectionClosed
+        try:
+            return await self._websocket.recv()
+        except ConnectionClosed:
+            return None
+
+    async def close(self) -> None:
+        await self._websocket.close()
+
+class _SimulatedTwilio:
+    """
+    One media stream: sends the recording in real time (scaled by `speed`),
+    and plays back what the server sends, echoing each mark once the audio before it has played.
+    """
+    def __init__(self, connection, speed: float):
+        self.connection = connection
+        self.speed = speed
+        self.sent_frames = 0
+        self.acks = 0 # "ack" marks: the end of each thing the server said (the greeting, then answers).
+        self.first_audio_seconds: float | None = None
+        self._playback_ends_at = 0.0
+
+    async def run(self, lines: list[str], answer_timeout_seconds: float) -> None:
+        await self.connection.connect()
+        start_time = time.perf_counter()
+        receive_task = asyncio.create_task(self._receive(start_time))
+        frame_index = 0
+        for line in lines[:-1]: # All but the stop message.
+            if '"event":"media"' in line:
+                delay = start_time + frame_index * FRAME_SECONDS / self.speed - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                frame_index += 1
+            await self.connection.send(line)
+        self.sent_frames = frame_index
+        deadline = time.perf_counter() + answer_timeout_seconds
+        while self.acks < 2 and time.perf_counter() < deadline and not receive_task.done():
+            await asyncio.sleep(0.05)
+        with contextlib.suppress(Exception):
+            await self.connection.send(lines[-1])
+        await self.connection.close()
+        receive_task.cancel()
+
+    async def _receive(self, start_time: float) -> None:
+        while (text := await self.connection.recv()) is not None:
+            now = time.perf_counter()
+            self._playback_ends_at = max(self._playback_ends_at, now)
+            if text.startswith('{"event":"media"'):
+                if self.first_audio_seconds is None:
+                    self.first_audio_seconds = now - start_time
+                payload = json.loads(text)["media"]["payload"]
+                self._playback_ends_at += len(base64.b64decode(payload)) / 8000 / self.speed
+            elif text.startswith('{"event":"mark"'):
+                name = json.loads(text)["mark"]["name"]
+                self.acks += name == "ack"
+                asyncio.get_running_loop().call_later(
+                    self._playback_ends_at - now,
+                    lambda name=name: asyncio.ensure_future(self._echo_mark(name)),
+                )
+            elif text.startswith('{"event":"clear"'):
+                self._playback_ends_at = now
+
+    async def _echo_mark(self, name: str) -> None:
+        with contextlib.suppress(Exception): # Hung up in the meantime.
+            await self.connection.send(json.dumps({"event": "mark", "mark": {"name": name}}))
+
+async def _monitor_loop_lag(lags: list[float], interval: float = 0.01) -> None:
+    while True:
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - expected))
+
+def _percentiles(values: list[float], scale: float = 1000.0) -> dict[str, float]:
+    if not values:
+        return {}
+    values = sorted(values)
+    return {
+        f"p{q}": round(values[min(len(values) - 1, int(q / 100 * len(values)))] * scale, 1)
+        for q in (50, 90, 99)
+    } | {"max": round(values[-1] * scale, 1)}
+
+async def _run(lines: list[str], args: argparse.Namespace) -> dict:
+    audio_executor = AudioExecutor(max_workers=args.workers)
+    app = None
+    if args.url is None:
+        app = create_app(
+            lambda text: asyncio.sleep(args.llm_latency, result="Sure. For what time?"),
+            call_manager=CallManager(
+                max_concurrent_calls=args.streams,
+                audio_executor=audio_executor,
+                tts_cache=TtsCache(),
+            ),
+            greeting=GREETING,
+        )
+        await app.state.call_manager.warm_up([GREETING]) # As at startup.
+    simulated_streams = [
+        _SimulatedTwilio(_AsgiConnection(app) if app else _WebsocketConnection(args.url), args.speed)
+        for _ in range(args.streams)
+    ]
+    lags: list[float] = []
+    lag_task = asyncio.create_task(_monitor_loop_lag(lags))
+    start_time = time.perf_counter()
+
+    async def run_stream(stream_index: int, simulated_stream: _SimulatedTwilio) -> None:
+        await asyncio.sleep(stream_index * args.ramp_seconds / args.streams) # Connections ramp up.
+        stream_lines = [
+            line.replace("test_stream", f"MZbench{stream_index}").replace("CA3ae75", f"CAbench{stream_index}_")
+            for line in lines
+        ]
+        await simulated_stream.run(stream_lines, answer_timeout_seconds=10 / args.speed + 5)
+
+    try:
+        await asyncio.gather(*[
+            run_stream(stream_index, simulated_stream)
+            for stream_index, simulated_stream in enumerate(simulated_streams)
+        ])
+    finally:
+        lag_task.cancel()
+        audio_executor.shutdown()
+    wall_seconds = time.perf_counter() - start_time
+    return {
+        "streams": args.streams,
+        "speed": args.speed,
+        "target": args.url or "in-process",
+        "frames_per_second": round(sum(stream.sent_frames for stream in simulated_streams) / wall_seconds),
+        "answered_streams": sum(stream.acks >= 2 for stream in simulated_streams),
+        "greeting_ms": _percentiles([
+            stream.first_audio_seconds for stream in simulated_streams if stream.first_audio_seconds is not None
+        ]),
+        "loop_lag_ms": _percentiles(lags),
+        "wall_seconds": round(wall_seconds, 2),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stream", default="tests/fixtures/stream1.txt")
+    parser.add_argument("--streams", type=int, default=300)
+    parser.add_argument("--speed", type=float, default=1.0, help="1 is real time.")
+    parser.add_argument("--ramp-seconds", type=float, default=1.0, help="Over which the streams connect.")
+    parser.add_argument("--url", help="A running server's websocket, instead of the app in this process.")
+    parser.add_argument("--workers", type=int, default=4, help="In-process audio executor workers.")
+    parser.add_argument("--stt-latency", type=float, default=0.2)
+    parser.add_argument("--tts-latency", type=float, default=0.1)
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+    # Synthetic latencies are in real seconds; scale them with the replay.
+    set_stt_backend(SleepySttBackend(args.stt_latency / args.speed))
+    set_tts_backend(SleepyTtsBackend(args.tts_latency / args.speed))
+    args.llm_latency /= args.speed
+
+    with Path(args.stream).open() as f:
+        lines = f.read().splitlines()
+    report = asyncio.run(_run(lines, args))
+    if args.json:
+        print(json.dumps(report))
+        return
+    print(f"== {report['streams']} streams at {args.speed:g}x against {report['target']} ({report['wall_seconds']}s)")
+    print(f"  media frames/sec:      {report['frames_per_second']}")
+    print(f"  answered streams:      {report['answered_streams']}/{report['streams']}")
+    print(f"  time to greeting (ms): {report['greeting_ms']}")
+    print(f"  event loop lag (ms):   {report['loop_lag_ms']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Speech-to-text throughput and latency with and without `SttBatcher`:
+`--utterances` utterances from different calls arrive every `--interval-ms`
+and are transcribed one at a time on the audio executor, or batched.
+
+By default the model is synthetic: a fixed cost per invocation (`--overhead-ms`,
+standing in for Python, kernel launches and decoder setup) plus a few dense layers over
+the padded batch in numpy. `--whisper base` runs the real model instead.
+
+    PYTHONPATH='.' python benchmarks/bench_stt_batching.py [--utterances 64] [--interval-ms 5] [--whisper tiny]
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from twilio_phone_calls.audio.audio_executor import AudioExecutor
+from twilio_phone_calls.audio.stt_batcher import SttBatcher
+from twilio_phone_calls.audio.stt_engine import SttBackend, WhisperSttBackend, set_stt_backend
+from twilio_phone_calls.audio.voice_to_text import np_pcm_wav__to__text_safe
+
+class SyntheticSttBackend(SttBackend):
+    def __init__(self, overhead_ms: float, frame_size: int = 400, hidden_size: int = 512):
+        self.overhead_seconds = overhead_ms / 1000
+        self.frame_size = frame_size
+        rng = np.random.default_rng(0)
+        self.weights = [
+            rng.standard_normal((frame_size, hidden_size), dtype=np.float32) / 20,
+            rng.standard_normal((hidden_size, hidden_size), dtype=np.float32) / 20,
+        ]
+
+    def transcribe(self, np_pcm_wav: np.ndarray, sample_rate: int = 8000) -> str:
+        return self.transcribe_batch([np_pcm_wav], sample_rate=sample_rate)[0]
+
+    def transcribe_batch(self, np_pcm_wavs: list[np.ndarray], sample_rate: int = 8000) -> list[str]:
+        time.sleep(self.overhead_seconds)
+        frame_count = max(len(np_pcm_wav) for np_pcm_wav in np_pcm_wavs) // self.frame_size + 1
+        padded = np.zeros((len(np_pcm_wavs), frame_count * self.frame_size), dtype=np.float32)
+        for index, np_pcm_wav in enumerate(np_pcm_wavs):
+            padded[index, :len(np_pcm_wav)] = np_pcm_wav
+        hidden = padded.reshape(len(np_pcm_wavs) * frame_count, self.frame_size)
+        for weights in self.weights:
+            hidden = np.tanh(hidden @ weights)
+        return [f"utterance of {len(np_pcm_wav)} samples" for np_pcm_wav in np_pcm_wavs]
+
+def _utterances(count: int) -> list[np.ndarray]:
+    rng = np.random.default_rng(1)
+    return [
+        rng.integers(-60, 60, size=int(rng.integers(8000, 8000 * 6))).astype(np.int8)
+        for _ in range(count)
+    ]
+
+async def _run(
+    utterances: list[np.ndarray],
+    interval_seconds: float,
+    audio_executor: AudioExecutor,
+    stt_batcher: SttBatcher | None,
+) -> tuple[float, list[float]]:
+    latencies: list[float] = []
+
+    async def transcribe(index: int, np_pcm_wav: np.ndarray) -> None:
+        await asyncio.sleep(index * interval_seconds)
+        start_time = time.perf_counter()
+        if stt_batcher is not None:
+            await stt_batcher.transcribe(np_pcm_wav)
+        else:
+            await audio_executor.run(f"MZ{index}", np_pcm_wav__to__text_safe, np_pcm_wav)
+        latencies.append(time.perf_counter() - start_time)
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*[transcribe(index, np_pcm_wav) for index, np_pcm_wav in enumerate(utterances)])
+    return time.perf_counter() - start_time, latencies
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--utterances", type=int, default=64)
+    parser.add_argument("--interval-ms", type=float, default=5.0, help="Between utterance arrivals.")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--overhead-ms", type=float, default=30.0, help="Synthetic model only.")
+    parser.add_argument("--whisper", default=None, help="A Whisper model name, instead of the synthetic model.")
+    args = parser.parse_args()
+    stt_backend = WhisperSttBackend(args.whisper) if args.whisper else SyntheticSttBackend(args.overhead_ms)
+    stt_backend.load()
+    set_stt_backend(stt_backend)
+    utterances = _utterances(args.utterances)
+
+    print(f"{args.utterances} utterances, one every {args.interval_ms:g}ms, {args.workers} workers:")
+    print(f"  {'':<32} {'utterances/s':>12} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    configs = [("one at a time", None)] + [
+        (f"batched (<= {max_batch_size}, {max_wait_ms:g}ms wait)", (max_batch_size, max_wait_ms))
+        for max_batch_size, max_wait_ms in ((4, 5), (8, 10), (16, 20))
+    ]
+    for name, batching in configs:
+        audio_executor = AudioExecutor(max_workers=args.workers, max_queued_jobs=args.utterances)
+        stt_batcher = None if batching is None else SttBatcher(
+            max_batch_size=batching[0],
+            max_wait_ms=batching[1],
+            audio_executor=audio_executor,
+        )
+        try:
+            wall_seconds, latencies = asyncio.run(_run(utterances, args.interval_ms / 1000, audio_executor, stt_batcher))
+        finally:
+            audio_executor.shutdown()
+        latencies.sort()
+        p50, p99 = (latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000 for q in (0.5, 0.99))
+        print(f"  {name:<32} {len(utterances) / wall_seconds:12.1f} {p50:9.1f} {p99:9.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Text-to-speech throughput with and without `TtsBatcher`, in seconds of audio generated
+per wall-clock second: `--calls` calls each synthesize a reply sentence by sentence
+(as `send_text_as_audio` does, with the cache disabled), all at once.
+
+By default the voice is `ToneTtsBackend` (offline and deterministic) plus a fixed cost
+per invocation (`--overhead-ms`, standing in for a model's per-call setup).
+`--backend coqui [--device cpu]` uses XTTS instead.
+
+    PYTHONPATH='.' python benchmarks/bench_tts_batching.py [--calls 32] [--overhead-ms 20]
+"""
+import argparse
+import asyncio
+import time
+
+from twilio_phone_calls.audio.audio_conversions import TWILIO_SAMPLE_RATE
+from twilio_phone_calls.audio.audio_executor import AudioExecutor
+from twilio_phone_calls.audio.tts_batcher import TtsBatcher
+from twilio_phone_calls.audio.tts_engine import (
+    CoquiTtsBackend,
+    ToneTtsBackend,
+    set_tts_backend,
+    split_into_sentences,
+    text__to__mulaw_bytes,
+)
+
+REPLY = "Sure thing. We have a table for two at seven. Would you like me to book it? It comes with a view of the river."
+
+class OverheadToneTtsBackend(ToneTtsBackend):
+    def __init__(self, overhead_ms: float):
+        super().__init__()
+        self.overhead_seconds = overhead_ms / 1000
+
+    def texts__to__mulaw_bytes(self, texts: list[str]) -> list[bytes]:
+        time.sleep(self.overhead_seconds)
+        return super().texts__to__mulaw_bytes(texts)
+
+async def _run(calls: int, audio_executor: AudioExecutor, tts_batcher: TtsBatcher | None) -> tuple[float, int]:
+    generated_bytes = 0
+
+    async def reply(call_index: int) -> None:
+        nonlocal generated_bytes
+        call_key = f"MZ{call_index}"
+        for sentence in split_into_sentences(REPLY):
+            sentence = f"{sentence} ({call_index})" # No two calls say quite the same thing.
+            if tts_batcher is not None:
+                mulaw_bytes = await tts_batcher.synthesize(sentence)
+            else:
+                mulaw_bytes = await audio_executor.run(call_key, text__to__mulaw_bytes, sentence)
+            generated_bytes += len(mulaw_bytes)
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*[reply(call_index) for call_index in range(calls)])
+    return time.perf_counter() - start_time, generated_bytes
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--overhead-ms", type=float, default=20.0, help="Tone backend only.")
+    parser.add_argument("--backend", choices=["tone", "coqui"], default="tone")
+    parser.add_argument("--device", default="cuda", help="Coqui only.")
+    args = parser.parse_args()
+    tts_backend = CoquiTtsBackend(args.device) if args.backend == "coqui" else OverheadToneTtsBackend(args.overhead_ms)
+    tts_backend.load()
+    set_tts_backend(tts_backend)
+
+    print(f"{args.calls} calls replying at once, {args.workers} workers, {args.backend} backend:")
+    print(f"  {'':<32} {'audio s / wall s':>16} {'wall (s)':>9}")
+    configs = [("one at a time", None)] + [
+        (f"batched (<= {max_batch_size}, {max_wait_ms:g}ms wait)", (max_batch_size, max_wait_ms))
+        for max_batch_size, max_wait_ms in ((4, 5), (8, 10), (16, 20))
+    ]
+    for name, batching in configs:
+        audio_executor = AudioExecutor(max_workers=args.workers, max_queued_jobs=args.calls)
+        tts_batcher = None if batching is None else TtsBatcher(
+            max_batch_size=batching[0],
+            max_wait_ms=batching[1],
+            audio_executor=audio_executor,
+        )
+        try:
+            wall_seconds, generated_bytes = asyncio.run(_run(args.calls, audio_executor, tts_batcher))
+        finally:
+            audio_executor.shutdown()
+        audio_seconds = generated_bytes / TWILIO_SAMPLE_RATE
+        print(f"  {name:<32} {audio_seconds / wall_seconds:16.1f} {wall_seconds:9.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Offline VAD evaluation: replays the fixture streams through `AudioSampleBuffer`
+with each detector, optionally with line noise added, and reports per utterance
+when speech was detected, when it ended and how long endpointing took.
+
+    PYTHONPATH='.' python benchmarks/eval_vad.py [--pause-ms 1250] [--noise 0 3 6]
+
+`--noise` is the standard deviation of added Gaussian noise, in int8 PCM steps.
+"""
+from pathlib import Path
+import argparse
+import json
+from typing import Callable
+
+import numpy as np
+
+from twilio_phone_calls.audio.audio_conversions import TWILIO_SAMPLE_RATE, twilio_mulaw_str__to__np_pcm_wav
+from twilio_phone_calls.audio.audio_sample_buffer import AudioSampleBuffer
+from twilio_phone_calls.audio.vad import EndpointingConfig, EnergyVad, VoiceActivityDetector
+
+def _load_chunks(fixture_path: Path) -> list[np.ndarray]:
+    with fixture_path.open() as f:
+        messages = [json.loads(line) for line in f]
+    return [
+        twilio_mulaw_str__to__np_pcm_wav(message["media"]["payload"])
+        for message in messages if message["event"] == "media"
+    ]
+
+def _add_noise(chunks: list[np.ndarray], noise: float, seed: int = 0) -> list[np.ndarray]:
+    if noise == 0:
+        return chunks
+    rng = np.random.default_rng(seed)
+    return [
+        np.clip(chunk.astype(np.float32) + rng.normal(0, noise, len(chunk)), -128, 127).astype(np.int8)
+        for chunk in chunks
+    ]
+
+def _replay(
+    chunks: list[np.ndarray],
+    make_vad: Callable[[], VoiceActivityDetector | None],
+    endpointing: EndpointingConfig,
+) -> list[dict]:
+    """
+    One dict per finished utterance, times in ms from the start of the stream.
+    """
+    vad = make_vad() # Shared across utterances, as in a call.
+    buffer = AudioSampleBuffer(vad=vad, endpointing=endpointing)
+    buffer_start = 0
+    stream_position = 0
+    started_at: int | None = None
+    utterances = []
+    for chunk in chunks:
+        buffer.append(chunk)
+        stream_position += len(chunk)
+        if started_at is None and buffer.check_has_started():
+            started_at = stream_position
+        if buffer.check_has_finished():
+            utterances.append({
+                "speech_start_ms": (buffer_start + buffer.first_nonempty_index) * 1000 // TWILIO_SAMPLE_RATE,
+                "detected_ms": started_at * 1000 // TWILIO_SAMPLE_RATE,
+                "speech_end_ms": (buffer_start + buffer.last_nonempty_index) * 1000 // TWILIO_SAMPLE_RATE,
+                "endpoint_ms": stream_position * 1000 // TWILIO_SAMPLE_RATE,
+            })
+            buffer = AudioSampleBuffer(vad=vad, endpointing=endpointing)
+            buffer_start = stream_position
+            started_at = None
+    return utterances
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixtures", nargs="*", default=["tests/fixtures/stream1.txt"])
+    parser.add_argument("--pause-ms", type=int, default=EndpointingConfig().pause_ms)
+    parser.add_argument("--noise", type=float, nargs="*", default=[0, 3, 6])
+    args = parser.parse_args()
+    endpointing = EndpointingConfig(pause_ms=args.pause_ms)
+    detectors: dict[str, Callable[[], VoiceActivityDetector | None]] = {
+        "fixed threshold": lambda: None,
+        "EnergyVad": EnergyVad,
+    }
+    for fixture in args.fixtures:
+        clean_chunks = _load_chunks(Path(fixture))
+        for noise in args.noise:
+            chunks = _add_noise(clean_chunks, noise)
+            print(f"== {fixture}, noise std {noise:g}, pause {endpointing.pause_ms}ms")
+            for name, make_vad in detectors.items():
+                utterances = _replay(chunks, make_vad, endpointing)
+                print(f"  {name}: {len(utterances)} utterance(s)")
+                for u in utterances:
+                    print(
+                        f"    speech {u['speech_start_ms']:>6}-{u['speech_end_ms']:<6}ms"
+                        f"  start detected after {u['detected_ms'] - u['speech_start_ms']:>4}ms"
+                        f"  endpoint after {u['endpoint_ms'] - u['speech_end_ms']:>5}ms"
+                    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+for bench_file in benchmarks/bench_*.py; do
+    echo "== $bench_file"
+    PYTHONPATH='.' python "$bench_file" "$@"
+done
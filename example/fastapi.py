@@ -1,35 +1,60 @@
 import json
-import sys
-import time
+import logging
 from datetime import datetime
 
 from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
-from fastapi.responses import Response
+from fastapi.responses import PlainTextResponse, Response
 
 from twilio_phone_calls import (
     create_twilio_voice_response,
+    CallManager,
     TwilioPhoneCall,
+    enable_call_logging,
+    enable_instrumentation,
 )
-from twilio_phone_calls.twilio_pydantic import StreamEventsEnum
+from twilio_phone_calls.twilio_pydantic import StreamEventsEnum, parse_stream_media_frame
 
 app = FastAPI()
 
+# Written from a background thread, with each call's sids attached.
+enable_call_logging(logging.INFO)
+logger = logging.getLogger("twilio_phone_calls.example")
+
 start_time = datetime.now()
 
+# Every call this worker is carrying, and the limits on how many.
+call_manager = CallManager(max_concurrent_calls=8)
+
+# Per-turn latency histograms, served at /metrics.
+instrumentation_sink = enable_instrumentation()
+
 # Your custom text-to-text function.
 async def parrot(caller_message: str) -> str:
     agent_response = caller_message.strip()
     return agent_response
 
+@app.on_event("startup")
+async def warm_up():
+    # Synthesize the "please hold" prompts before the first call needs them.
+    await call_manager.warm_up()
+
 # hello world
 @app.get("/")
 async def root():
-    print("Received hello world request")
+    logger.info("Received hello world request")
     return {"message": f"Hello World {start_time}"}
 
+@app.get("/calls")
+async def calls():
+    return call_manager.stats()
+
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(instrumentation_sink.prometheus_text())
+
 @app.post("/")
 async def phone_call(request: Request):
-    print("Received phone call")
+    logger.info("Received phone call")
     form_data = await request.form()
     voice_response = create_twilio_voice_response(
         caller_number=form_data.get("Caller"),
@@ -43,34 +68,42 @@ async def phone_call(request: Request):
 
 @app.websocket("/stream")
 async def stream(websocket: WebSocket):
+    stream: TwilioPhoneCall | None = None
     try:
         await websocket.accept()
-        print("Websocket opened.")
-        sys.stdout.flush() # TODO: Is this needed?
-
-        stream: TwilioPhoneCall | None = None
+        logger.info("Websocket opened.")
 
         while True:
             twilio_json = await websocket.receive_text()
+
+            if stream is not None:
+                # Fast path for the audio frames, which are almost all of the traffic.
+                stream_media_frame = parse_stream_media_frame(twilio_json)
+                if stream_media_frame is not None:
+                    await stream.receive_media_frame(stream_media_frame)
+                    continue
+
             twilio_message: dict = json.loads(twilio_json)
 
             if twilio_message["event"] == StreamEventsEnum.connected.value:
-                print("Connected to Twilio.")
+                logger.info("Connected to Twilio.")
                 continue
 
             if twilio_message["event"] == StreamEventsEnum.stop.value:
-                print("The caller hung up.")
+                (stream.logger if stream is not None else logger).info("The caller hung up.")
                 break
 
             if stream is None:
-                # Call created.
-                stream = TwilioPhoneCall.from_start_message(
+                # Call created (unless this worker is full).
+                stream = await call_manager.start_call(
                     twilio_message,
                     send_websocket_message_async_method=websocket.send_text,
                     text_to_text_async_method=parrot,
                 )
-                print(f"TwilioPhoneCall created: {stream.caller=}")
-                await stream.send_text_as_audio("Hey! How can I help you?")
+                if stream is None:
+                    break
+                stream.logger.info("TwilioPhoneCall created.")
+                stream.speak("Hey! How can I help you?") # The caller can talk over it.
             else:
                 """
                 Voice samples are split across (very) many twilio messages.
@@ -81,5 +114,8 @@ async def stream(websocket: WebSocket):
                 await stream.receive_twilio_message(twilio_message)
 
     except WebSocketDisconnect:
-        print("Websocket closed.")
+        logger.info("Websocket closed.")
+    finally:
+        if stream is not None:
+            call_manager.end_call(stream)
 
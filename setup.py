@@ -12,14 +12,12 @@ setup(
         'coqui-tts==0.25.3',
         'fastapi==0.115.8',
         'gTTS==2.5.4',
-        'librosa==0.10.2.post1',
         'noisereduce==3.0.3',
         'openai-whisper==20240930',
         'pydub==0.25.1',
         'pyright==1.1.393',
         'pytest==8.3.4',
         'python-multipart==0.0.20',
-        'pywav==1.1',
         'scikit-learn==1.6.1',
         'soundfile==0.13.1',
         'SpeechRecognition==3.14.1',
@@ -0,0 +1,46 @@
+from pathlib import Path
+
+import numpy as np
+
+from twilio_phone_calls.audio.audio_conversions import (
+    mulaw_bytes__to__mulaw_wav_bytes,
+    mulaw_filepath__to__np_pcm_wav,
+    mulaw_wav_bytes__to__mulaw_bytes,
+    np_pcm_wav__to__twilio_np_pcm_wav,
+    np_pcm_wav__to__wav_bytes,
+    wav_bytes__to__np_pcm_wav,
+)
+from twilio_phone_calls.audio.mulaw import mulaw_decode
+from twilio_phone_calls.audio.tmp_file_path import TmpFilePath
+
+SAMPLE_PATH = Path("tests/fixtures/1684778198.0636666.sample.wav") # Mulaw file.
+
+def test_mulaw_wav_round_trip_in_memory():
+    mulaw_bytes = mulaw_wav_bytes__to__mulaw_bytes(SAMPLE_PATH.read_bytes())
+    assert len(mulaw_bytes) == 26164
+    assert np.array_equal(mulaw_filepath__to__np_pcm_wav(SAMPLE_PATH), mulaw_decode(mulaw_bytes, dtype=np.int8))
+    for audio in (mulaw_bytes, mulaw_bytes[:-1]): # Odd lengths are padded.
+        assert mulaw_wav_bytes__to__mulaw_bytes(mulaw_bytes__to__mulaw_wav_bytes(audio)) == audio
+
+def test_wav_round_trip_in_memory():
+    sample_rate = 24000 # XTTS's rate.
+    times = np.arange(sample_rate // 2) / sample_rate
+    np_pcm_wav = (0.5 * np.sin(2 * np.pi * 300 * times)).astype(np.float32)
+    wav_bytes = np_pcm_wav__to__wav_bytes(np_pcm_wav, sample_rate=sample_rate)
+    assert wav_bytes[:4] == b"RIFF"
+    twilio_np_pcm_wav = wav_bytes__to__np_pcm_wav(wav_bytes)
+    assert twilio_np_pcm_wav.dtype == np.int8 and len(twilio_np_pcm_wav) == 4000
+    assert np.abs(twilio_np_pcm_wav.astype(np.int16) - np_pcm_wav__to__twilio_np_pcm_wav(np_pcm_wav, sample_rate)).max() <= 1
+
+def test_tmp_file_paths_are_unique():
+    paths = set()
+    for _ in range(100):
+        with TmpFilePath("wav") as tmp_path:
+            paths.add(tmp_path)
+    assert len(paths) == 100
+
+if __name__ == "__main__":
+    test_mulaw_wav_round_trip_in_memory()
+    test_wav_round_trip_in_memory()
+    test_tmp_file_paths_are_unique()
+    print("Tests pass.")
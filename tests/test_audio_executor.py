@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import time
+
+from twilio_phone_calls.audio.audio_executor import AudioExecutor
+
+def test_round_robin_across_calls():
+    executor = AudioExecutor(max_workers=1, max_queued_jobs=16)
+    started = threading.Event()
+    release = threading.Event()
+    order: list[str] = []
+
+    def block() -> None:
+        started.set()
+        release.wait()
+
+    def record(name: str) -> str:
+        order.append(name)
+        return name
+
+    async def main() -> list[str]:
+        blocker = asyncio.create_task(executor.run("a", block))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait)
+        # Call "a" queues a backlog before "b" and "c" show up.
+        jobs = [asyncio.create_task(executor.run("a", record, f"a{i}")) for i in range(3)]
+        await asyncio.sleep(0)
+        jobs += [
+            asyncio.create_task(executor.run("b", record, "b0")),
+            asyncio.create_task(executor.run("c", record, "c0")),
+        ]
+        await asyncio.sleep(0)
+        assert executor.queue_depth == 5
+        release.set()
+        await blocker
+        return await asyncio.gather(*jobs)
+
+    results = asyncio.run(main())
+    assert results == ["a0", "a1", "a2", "b0", "c0"]
+    assert order == ["a0", "b0", "c0", "a1", "a2"], order
+    executor.shutdown()
+
+def test_bounded_queue_waits_for_room():
+    executor = AudioExecutor(max_workers=1, max_queued_jobs=2)
+
+    async def main() -> list[float]:
+        jobs = [asyncio.create_task(executor.run("a", time.sleep, 0.02)) for _ in range(6)]
+        await asyncio.sleep(0.005)
+        assert executor.running == 1
+        assert executor.queue_depth == 2
+        return await asyncio.gather(*jobs)
+
+    assert asyncio.run(main()) == [None] * 6
+    assert executor.queue_depth == 0
+    executor.shutdown()
+
+def test_errors_and_cancellation():
+    executor = AudioExecutor(max_workers=1, max_queued_jobs=4)
+
+    def fail() -> None:
+        raise ValueError("nope")
+
+    async def main() -> None:
+        try:
+            await executor.run("a", fail)
+            assert False, "Expected ValueError"
+        except ValueError:
+            pass
+        running = asyncio.create_task(executor.run("a", time.sleep, 0.05))
+        queued = asyncio.create_task(executor.run("b", time.sleep, 0.05))
+        await asyncio.sleep(0.01)
+        queued.cancel()
+        await asyncio.sleep(0)
+        assert executor.queue_depth == 0
+        await running
+
+    asyncio.run(main())
+    executor.shutdown()
+
+if __name__ == "__main__":
+    test_round_robin_across_calls()
+    test_bounded_queue_waits_for_room()
+    test_errors_and_cancellation()
+    print("Tests pass.")
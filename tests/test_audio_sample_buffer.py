@@ -0,0 +1,87 @@
+from pathlib import Path
+import json
+
+import numpy as np
+
+from twilio_phone_calls.audio.audio_sample_buffer import AudioSampleBuffer
+from twilio_phone_calls.audio.audio_conversions import (
+    twilio_mulaw_str__to__np_pcm_wav,
+    twilio_mulaw_str__into__np_pcm_wav,
+    twilio_mulaw_str__max_samples,
+)
+
+class ConcatAudioSampleBuffer:
+    """
+    The original rescan-everything implementation, kept as a reference.
+    """
+    def __init__(self):
+        self._audio_buffer = np.empty(0, dtype=np.int8)
+
+    def append(self, data: np.ndarray) -> None:
+        self._audio_buffer = np.concatenate([self._audio_buffer, data])
+
+    def check_has_finished(self) -> bool:
+        not_empty = np.abs(self._audio_buffer) >= 8
+        return int(np.sum(not_empty)) >= 1000 and int(np.argmax(not_empty[::-1])) >= 10000
+
+    def crop_audio(self) -> np.ndarray:
+        is_nonempty = np.abs(self._audio_buffer) > 8
+        first = int(np.argmax(is_nonempty))
+        last = int(len(self._audio_buffer) - np.argmax(is_nonempty[::-1]))
+        return self._audio_buffer[max(0, first - 1000):min(len(self._audio_buffer), last + 1000)]
+
+def _assert_same_behavior(chunks: list[np.ndarray]) -> int:
+    buffer, reference = AudioSampleBuffer(initial_capacity=160), ConcatAudioSampleBuffer()
+    utterances = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        reference.append(chunk)
+        assert buffer.check_has_finished() == reference.check_has_finished()
+        if reference.check_has_finished():
+            assert np.array_equal(buffer.crop_audio(), reference.crop_audio())
+            buffer, reference = AudioSampleBuffer(initial_capacity=160), ConcatAudioSampleBuffer()
+            utterances += 1
+    return utterances
+
+def test_matches_reference_on_recorded_stream():
+    with Path("tests/fixtures/stream1.txt").open() as f:
+        messages = [json.loads(line) for line in f]
+    chunks = [
+        twilio_mulaw_str__to__np_pcm_wav(message["media"]["payload"])
+        for message in messages if message["event"] == "media"
+    ]
+    assert _assert_same_behavior(chunks) > 0
+
+def test_matches_reference_on_random_bursts():
+    rng = np.random.default_rng(0)
+    chunks = []
+    for _ in range(40):
+        amplitude = int(rng.choice([0, 8, 9, 40, 128]))
+        for _ in range(int(rng.integers(1, 80))):
+            size = int(rng.integers(1, 400))
+            chunks.append(rng.integers(-amplitude, amplitude + 1, size=size).astype(np.int8))
+    assert _assert_same_behavior(chunks) > 0
+
+def test_crop_audio_is_a_view():
+    buffer = AudioSampleBuffer()
+    buffer.append(np.full(2000, 50, dtype=np.int8))
+    assert np.shares_memory(buffer.crop_audio(), buffer._audio_buffer)
+
+def test_decoding_in_place_matches_append():
+    with Path("tests/fixtures/stream1.txt").open() as f:
+        payloads = [message["media"]["payload"] for message in map(json.loads, f) if message["event"] == "media"]
+    appended, decoded_in_place = AudioSampleBuffer(initial_capacity=160), AudioSampleBuffer(initial_capacity=160)
+    for payload in payloads:
+        appended.append(twilio_mulaw_str__to__np_pcm_wav(payload))
+        out = decoded_in_place.reserve(twilio_mulaw_str__max_samples(payload))
+        decoded_in_place.commit(twilio_mulaw_str__into__np_pcm_wav(payload, out))
+        assert decoded_in_place.check_has_finished() == appended.check_has_finished()
+    assert np.array_equal(decoded_in_place.audio, appended.audio)
+    assert decoded_in_place.crop_bounds() == appended.crop_bounds()
+
+if __name__ == "__main__":
+    test_matches_reference_on_recorded_stream()
+    test_matches_reference_on_random_bursts()
+    test_crop_audio_is_a_view()
+    test_decoding_in_place_matches_append()
+    print("Tests pass.")
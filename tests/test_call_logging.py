@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import threading
+
+from twilio_phone_calls import TwilioPhoneCall
+from twilio_phone_calls.call_logging import (
+    DEFAULT_FORMAT,
+    RateLimitFilter,
+    disable_call_logging,
+    enable_call_logging,
+    get_call_logger,
+)
+
+class ListHandler(logging.Handler):
+    """
+    Keeps each record, its formatted text and the thread that formatted it.
+    """
+    def __init__(self):
+        super().__init__()
+        self.setFormatter(logging.Formatter(DEFAULT_FORMAT))
+        self.records: list[logging.LogRecord] = []
+        self.lines: list[str] = []
+        self.threads: list[threading.Thread] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+        self.lines.append(self.format(record))
+        self.threads.append(threading.current_thread())
+
+class CountingRepr:
+    def __init__(self):
+        self.count = 0
+
+    def __repr__(self) -> str:
+        self.count += 1
+        return "counted"
+
+def test_records_carry_the_call_and_are_written_off_thread():
+    list_handler = ListHandler()
+    enable_call_logging(logging.INFO, handler=list_handler)
+    try:
+        call_logger = get_call_logger("twilio_phone_calls.test", "MZ1", "CA1", "+15551234567")
+        call_logger.info("Hello %s.", "there")
+        logging.getLogger("twilio_phone_calls.test").warning("Outside a call.")
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            call_logger.exception("Failed.")
+    finally:
+        disable_call_logging() # Writes out the queue.
+    assert list_handler.lines[0].endswith("[MZ1 CA1 +15551234567] Hello there.")
+    assert list_handler.lines[1].endswith("[- - -] Outside a call.")
+    assert "ValueError: boom" in list_handler.lines[2]
+    assert threading.current_thread() not in list_handler.threads
+
+def test_repeated_warnings_are_rate_limited():
+    now = [0.0]
+    list_handler = ListHandler()
+    enable_call_logging(handler=list_handler, rate_limit=RateLimitFilter(burst=3, interval_seconds=10, clock=lambda: now[0]))
+    try:
+        call_logger = get_call_logger("twilio_phone_calls.test", "MZ1", "CA1", "+1555")
+        for index in range(100):
+            call_logger.warning("Received other message type: %s", index)
+        call_logger.warning("Something else.")
+        call_logger.info("Not rate-limited.")
+        call_logger.info("Not rate-limited.")
+        now[0] = 10.0
+        call_logger.warning("Received other message type: %s", "again")
+    finally:
+        disable_call_logging()
+    messages = [record.getMessage() for record in list_handler.records]
+    assert messages == [
+        "Received other message type: 0",
+        "Received other message type: 1",
+        "Received other message type: 2",
+        "Something else.",
+        "Not rate-limited.",
+        "Not rate-limited.",
+        "Received other message type: again (97 similar messages suppressed)",
+    ], messages
+
+def test_debug_is_skipped_while_disabled():
+    counting_repr = CountingRepr()
+    list_handler = ListHandler()
+    enable_call_logging(logging.INFO, handler=list_handler)
+    try:
+        call_logger = get_call_logger("twilio_phone_calls.test", "MZ1", "CA1", "+1555")
+        call_logger.debug("Caller text: %r", counting_repr)
+        assert not call_logger.isEnabledFor(logging.DEBUG)
+        enable_call_logging(logging.DEBUG, handler=list_handler)
+        call_logger.debug("Caller text: %r", counting_repr)
+    finally:
+        disable_call_logging()
+    assert counting_repr.count == 1 # Formatted once, for the record that was written.
+    assert len(list_handler.lines) == 1 and list_handler.lines[0].endswith("Caller text: counted")
+
+def test_phone_call_logs_with_its_sids():
+    start_message = {
+        "event": "start",
+        "sequenceNumber": "1",
+        "streamSid": "MZ9",
+        "start": {
+            "accountSid": "AC1",
+            "streamSid": "MZ9",
+            "callSid": "CA9",
+            "tracks": ["inbound"],
+            "mediaFormat": {"encoding": "audio/x-mulaw", "sampleRate": 8000, "channels": 1},
+            "customParameters": {"caller": "+15550000000"},
+        },
+    }
+
+    async def noop(text: str) -> str:
+        return text
+
+    list_handler = ListHandler()
+    enable_call_logging(handler=list_handler)
+    try:
+        phone_call = TwilioPhoneCall.from_start_message(
+            start_message,
+            send_websocket_message_async_method=noop,
+            text_to_text_async_method=noop,
+        )
+        asyncio.run(phone_call.receive_twilio_message({"event": "dtmf"}))
+    finally:
+        disable_call_logging()
+    assert list_handler.lines[0].endswith("WARNING twilio_phone_calls.twilio_phone_call [MZ9 CA9 +15550000000] Received other message type: dtmf")
+
+if __name__ == "__main__":
+    test_records_carry_the_call_and_are_written_off_thread()
+    test_repeated_warnings_are_rate_limited()
+    test_debug_is_skipped_while_disabled()
+    test_phone_call_logs_with_its_sids()
+    print("Tests pass.")
@@ -0,0 +1,160 @@
+from pathlib import Path
+import asyncio
+import json
+
+import numpy as np
+
+from twilio_phone_calls import CallManager
+from twilio_phone_calls.audio.audio_executor import AudioExecutor
+from twilio_phone_calls.audio.stt_engine import SttBackend, get_stt_backend, set_stt_backend
+from twilio_phone_calls.audio.tts_cache import TtsCache
+from twilio_phone_calls.audio.tts_engine import ToneTtsBackend, TtsBackend, get_tts_backend, set_tts_backend, split_into_sentences
+
+class CountingTtsBackend(TtsBackend):
+    name = "counting"
+
+    def __init__(self):
+        self.texts: list[str] = []
+
+    def text__to__mulaw_bytes(self, text: str) -> bytes:
+        self.texts.append(text)
+        return b"\xff" * 160
+
+class Sent(list):
+    """
+    The messages sent to one websocket.
+    """
+    async def append_async(self, text: str) -> None:
+        self.append(text)
+
+def _start_message(sid: str) -> dict:
+    with Path("tests/fixtures/stream1.txt").open() as f:
+        start_message = json.loads(f.readlines()[1])
+    start_message["streamSid"] = f"MZ{sid}"
+    start_message["start"]["streamSid"] = f"MZ{sid}"
+    start_message["start"]["callSid"] = f"CA{sid}"
+    return start_message
+
+async def _echo(text: str) -> str:
+    return text
+
+def _with_tts_backend(tts_backend: TtsBackend, main) -> None:
+    previous_backend = get_tts_backend()
+    set_tts_backend(tts_backend)
+    try:
+        asyncio.run(main())
+    finally:
+        set_tts_backend(previous_backend)
+
+def test_rejects_calls_past_capacity():
+    tts_backend = CountingTtsBackend()
+    sent = {"1": Sent(), "2": Sent(), "3": Sent()}
+
+    async def main() -> None:
+        call_manager = CallManager(max_concurrent_calls=1, tts_cache=TtsCache())
+        first_call = await call_manager.start_call(_start_message("1"), sent["1"].append_async, _echo)
+        assert first_call is not None
+        assert call_manager.get_call("MZ1") is call_manager.get_call("CA1") is first_call
+        assert await call_manager.start_call(_start_message("2"), sent["2"].append_async, _echo) is None
+        assert call_manager.rejected_calls == 1 and len(call_manager) == 1
+        call_manager.end_call(first_call)
+        assert call_manager.get_call("MZ1") is None and len(call_manager) == 0
+        assert await call_manager.start_call(_start_message("3"), sent["3"].append_async, _echo) is not None
+
+    _with_tts_backend(tts_backend, main)
+    assert tts_backend.texts == split_into_sentences(CallManager().busy_text)
+    assert sent["1"] == [] and sent["3"] == []
+    assert [json.loads(text)["event"] for text in sent["2"]] == ["media", "mark", "media", "mark", "mark"] # The busy prompt.
+
+def test_holds_turns_past_inflight_limit():
+    tts_backend = CountingTtsBackend()
+    sent = {"1": Sent(), "2": Sent()}
+
+    async def main() -> None:
+        call_manager = CallManager(max_inflight_jobs=1, tts_cache=TtsCache())
+        await call_manager.warm_up()
+        first_call = await call_manager.start_call(_start_message("1"), sent["1"].append_async, _echo)
+        second_call = await call_manager.start_call(_start_message("2"), sent["2"].append_async, _echo)
+        first_turn_done = asyncio.Event()
+        second_turn_started = asyncio.Event()
+
+        async def first_turn() -> None:
+            async with call_manager.inference_slot(first_call):
+                assert call_manager.is_overloaded()
+                await first_turn_done.wait()
+
+        async def second_turn() -> None:
+            async with call_manager.inference_slot(second_call):
+                second_turn_started.set()
+
+        first_task = asyncio.create_task(first_turn())
+        await asyncio.sleep(0)
+        second_task = asyncio.create_task(second_turn())
+        await asyncio.sleep(0.05)
+        assert not second_turn_started.is_set()
+        assert call_manager.held_turns == 1
+        assert call_manager.stats()["inflight_jobs"] == 1
+        first_turn_done.set()
+        await asyncio.gather(first_task, second_task)
+        assert second_turn_started.is_set() and call_manager.inflight_jobs == 0
+
+    _with_tts_backend(tts_backend, main)
+    warm_sentences = split_into_sentences(CallManager().hold_text) + split_into_sentences(CallManager().busy_text)
+    assert sorted(tts_backend.texts) == sorted(warm_sentences) # Synthesized once, when warming up.
+    assert sent["1"] == []
+    assert [json.loads(text)["event"] for text in sent["2"]] == ["media", "mark", "mark"] # The hold prompt.
+
+def test_warm_up_with_a_process_pool():
+    audio_executor = AudioExecutor(max_workers=1, use_processes=True)
+    tts_cache = TtsCache()
+
+    async def main() -> None:
+        call_manager = CallManager(audio_executor=audio_executor, tts_cache=tts_cache)
+        await call_manager.warm_up(["Hey! How can I help you?"])
+
+    try:
+        _with_tts_backend(ToneTtsBackend(), main) # Set before the pool forks, so its worker has it too.
+    finally:
+        audio_executor.shutdown()
+    warm_sentences = split_into_sentences(CallManager().hold_text) + split_into_sentences(CallManager().busy_text)
+    assert len(tts_cache) == len(warm_sentences) + 2 and tts_cache.misses == len(tts_cache)
+
+class FixedSttBackend(SttBackend):
+    def transcribe(self, np_pcm_wav: np.ndarray, sample_rate: int = 8000) -> str:
+        return "hello"
+
+def test_answering_holds_no_inference_slot():
+    inflight_while_answering: list[int] = []
+    sent = Sent()
+    with Path("tests/fixtures/stream1.txt").open() as f:
+        media_messages = [message for message in map(json.loads, f) if message["event"] == "media"]
+
+    async def main() -> None:
+        call_manager = CallManager(max_inflight_jobs=1, tts_cache=TtsCache())
+
+        async def text_to_text(text: str) -> str:
+            inflight_while_answering.append(call_manager.inflight_jobs)
+            return "Sure."
+
+        phone_call = await call_manager.start_call(_start_message("1"), sent.append_async, text_to_text)
+        assert phone_call is not None
+        for message in media_messages:
+            await phone_call.receive_twilio_message(message)
+            await asyncio.sleep(0.001) # Turns run in the background.
+        await phone_call.turn_task
+
+    previous_stt_backend = get_stt_backend()
+    set_stt_backend(FixedSttBackend())
+    try:
+        _with_tts_backend(CountingTtsBackend(), main)
+    finally:
+        set_stt_backend(previous_stt_backend)
+    assert inflight_while_answering and set(inflight_while_answering) == {0} # The LLM isn't inference here.
+    assert json.loads(sent[-1])["mark"]["name"] == "ack"
+
+if __name__ == "__main__":
+    test_rejects_calls_past_capacity()
+    test_holds_turns_past_inflight_limit()
+    test_warm_up_with_a_process_pool()
+    test_answering_holds_no_inference_slot()
+    print("Tests pass.")
@@ -0,0 +1,19 @@
+import subprocess
+import sys
+
+HEAVY_MODULES = ["torch", "librosa", "pydub", "gtts", "speech_recognition", "twilio", "soundfile", "pywav", "whisper", "TTS"]
+
+def test_import_loads_no_heavy_modules():
+    """
+    Run in a fresh interpreter, since this one has probably imported them already.
+    """
+    code = (
+        "import sys, twilio_phone_calls, twilio_phone_calls.audio, twilio_phone_calls.twilio_pydantic; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "", f"Imported at import time: {result.stdout.strip()}"
+
+if __name__ == "__main__":
+    test_import_loads_no_heavy_modules()
+    print("Tests pass.")
@@ -0,0 +1,106 @@
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import contextlib
+import tempfile
+import threading
+
+import numpy as np
+
+from twilio_phone_calls.audio.audio_executor import AudioExecutor
+from twilio_phone_calls.audio.inference_server import InferenceServer
+from twilio_phone_calls.audio.remote_backends import RemoteSttBackend, RemoteTtsBackend
+from twilio_phone_calls.audio.stt_engine import SttBackend, get_stt_backend, set_stt_backend
+from twilio_phone_calls.audio.tts_engine import ToneTtsBackend, get_tts_backend, set_tts_backend
+
+class LengthSttBackend(SttBackend):
+    """
+    "<samples> <dtype> <sample rate>", so a test can tell the audio arrived whole.
+    """
+    def transcribe(self, np_pcm_wav: np.ndarray, sample_rate: int = 8000) -> str:
+        return f"{len(np_pcm_wav)} {np_pcm_wav.dtype} {sample_rate}"
+
+class SilenceSttBackend(SttBackend):
+    """
+    Hears nothing in silence (all zeros) and fails on anything else.
+    """
+    def transcribe(self, np_pcm_wav: np.ndarray, sample_rate: int = 8000) -> str:
+        if np_pcm_wav.any():
+            raise ValueError("Not silence")
+        return ""
+
+@contextlib.contextmanager
+def _serving(model: str, address: str, stt_backend: SttBackend | None = None):
+    """
+    An inference server on its own event loop and thread, as it would be in its own process.
+    Yields it and its listener.
+    """
+    previous_stt_backend, previous_tts_backend = get_stt_backend(), get_tts_backend()
+    set_stt_backend(stt_backend or LengthSttBackend())
+    set_tts_backend(ToneTtsBackend())
+    server = InferenceServer(model, max_wait_ms=20, audio_executor=AudioExecutor(max_workers=1))
+    loop = asyncio.new_event_loop()
+    listener = loop.run_until_complete(server.start(address))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        yield server, listener
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+        listener.close()
+        tasks = asyncio.all_tasks(loop) # Connection handlers, done once the clients close.
+        if tasks:
+            loop.run_until_complete(asyncio.wait(tasks, timeout=5))
+        loop.close()
+        set_stt_backend(previous_stt_backend)
+        set_tts_backend(previous_tts_backend)
+
+def test_remote_stt_multiplexes_threads_over_one_connection():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        address = f"unix:{tmp_dir}/stt.sock"
+        with _serving("stt", address) as (server, _):
+            remote_stt_backend = RemoteSttBackend(address)
+            remote_stt_backend.load()
+            utterances = [np.zeros(100 * (index + 1), dtype=np.int8) for index in range(16)]
+            with ThreadPoolExecutor(8) as pool:
+                texts = list(pool.map(remote_stt_backend.transcribe, utterances))
+            assert texts == [f"{100 * (index + 1)} int8 8000" for index in range(16)]
+            assert remote_stt_backend.transcribe_batch(
+                [np.zeros(5, dtype=np.float64), np.zeros(7, dtype=np.int16)], sample_rate=16000,
+            ) == ["5 float32 16000", "7 float32 16000"] # Mixed dtypes travel as float32.
+            assert max(server._get_stt_batcher(8000).batch_sizes) > 1 # Requests were batched together.
+            remote_stt_backend._client.close()
+
+def test_remote_stt_returns_raw_transcripts():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        address = f"unix:{tmp_dir}/stt.sock"
+        with _serving("stt", address, SilenceSttBackend()):
+            remote_stt_backend = RemoteSttBackend(address)
+            remote_stt_backend.load()
+            assert remote_stt_backend.transcribe(np.zeros(100, dtype=np.int16)) == "" # Not the fallback.
+            try:
+                remote_stt_backend.transcribe(np.ones(100, dtype=np.int16))
+                assert False, "Expected the server's error to be raised"
+            except RuntimeError as e:
+                assert "Not silence" in str(e), e
+            remote_stt_backend._client.close()
+
+def test_remote_tts_matches_the_local_voice():
+    with _serving("tts", "127.0.0.1:0") as (_, listener):
+        remote_tts_backend = RemoteTtsBackend(f"127.0.0.1:{listener.sockets[0].getsockname()[1]}")
+        remote_tts_backend.load()
+        assert (remote_tts_backend.name, remote_tts_backend.speaker) == ("remote:tone", "default")
+        texts = ["Hello there.", "", "How can I help you?"]
+        assert remote_tts_backend.texts__to__mulaw_bytes(texts) == ToneTtsBackend().texts__to__mulaw_bytes(texts)
+        try:
+            remote_tts_backend._client.request({"method": "transcribe_batch"})
+            assert False, "Expected the tts server to refuse"
+        except RuntimeError as e:
+            assert "doesn't serve" in str(e), e
+        remote_tts_backend._client.close()
+
+if __name__ == "__main__":
+    test_remote_stt_multiplexes_threads_over_one_connection()
+    test_remote_stt_returns_raw_transcripts()
+    test_remote_tts_matches_the_local_voice()
+    print("Tests pass.")
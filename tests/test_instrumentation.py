@@ -0,0 +1,124 @@
+from pathlib import Path
+import asyncio
+import json
+
+import numpy as np
+
+from twilio_phone_calls import TwilioPhoneCall
+from twilio_phone_calls.audio.stt_engine import SttBackend, get_stt_backend, set_stt_backend
+from twilio_phone_calls.audio.tts_cache import TtsCache
+from twilio_phone_calls.audio.tts_engine import TtsBackend, get_tts_backend, set_tts_backend
+from twilio_phone_calls.instrumentation import (
+    Histogram,
+    InMemorySink,
+    TurnSpan,
+    TurnStage,
+    histograms__to__prometheus_text,
+)
+
+class FixedSttBackend(SttBackend):
+    def transcribe(self, np_pcm_wav: np.ndarray, sample_rate: int = 8000) -> str:
+        return "hello"
+
+class SilentTtsBackend(TtsBackend):
+    name = "silent"
+
+    def text__to__mulaw_bytes(self, text: str) -> bytes:
+        return b"\xff" * 8000
+
+def _replay_stream(instrumentation_sink: InMemorySink | None) -> TwilioPhoneCall:
+    """
+    Both utterances in the fixture, each answered and acknowledged.
+    """
+    with Path("tests/fixtures/stream1.txt").open() as f:
+        messages = [json.loads(line) for line in f]
+    start_message = messages[1]
+    media_messages = [message for message in messages if message["event"] == "media"]
+    sent: list[str] = []
+
+    async def send_text(text: str) -> None:
+        sent.append(text)
+
+    async def text_to_text(text: str) -> str:
+        return f"You said {text}."
+
+    async def main() -> TwilioPhoneCall:
+        phone_call = TwilioPhoneCall.from_start_message(
+            start_message,
+            send_websocket_message_async_method=send_text,
+            text_to_text_async_method=text_to_text,
+            tts_cache=TtsCache(),
+            instrumentation_sink=instrumentation_sink,
+        )
+        acknowledged_count = 0
+
+        async def acknowledge_marks() -> None:
+            nonlocal acknowledged_count
+            for text in sent[acknowledged_count:]:
+                if json.loads(text)["event"] == "mark":
+                    await phone_call.receive_twilio_message({"event": "mark", "mark": json.loads(text)["mark"]})
+            acknowledged_count = len(sent)
+
+        for message in media_messages:
+            await phone_call.receive_twilio_message(message)
+            if phone_call.turn_task is not None:
+                await phone_call.turn_task # Turns run in the background.
+            await acknowledge_marks()
+        return phone_call
+
+    previous_stt_backend, previous_tts_backend = get_stt_backend(), get_tts_backend()
+    set_stt_backend(FixedSttBackend())
+    set_tts_backend(SilentTtsBackend())
+    try:
+        return asyncio.run(main())
+    finally:
+        set_stt_backend(previous_stt_backend)
+        set_tts_backend(previous_tts_backend)
+
+def test_every_stage_of_every_turn_is_recorded():
+    instrumentation_sink = InMemorySink()
+    phone_call = _replay_stream(instrumentation_sink)
+    spans = instrumentation_sink.spans(phone_call.stream_sid)
+    assert [span.turn_index for span in spans] == [1, 2]
+    for span in spans:
+        assert list(span.timestamps) == list(TurnStage), list(span.timestamps)
+        timestamps = [span.timestamps[stage] for stage in TurnStage]
+        assert timestamps == sorted(timestamps)
+    assert instrumentation_sink.histograms["turn"].count == 2
+    assert instrumentation_sink.spans("some other call") == []
+
+def test_disabled_by_default():
+    phone_call = _replay_stream(None)
+    assert phone_call._instrumentation_sink is None
+    assert phone_call._turn_span is None and phone_call._turn_count == 0
+
+def test_prometheus_text():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value)
+    assert histogram.percentile(50) == 0.5
+    assert histograms__to__prometheus_text({"stt": histogram}, metric_name="latency").splitlines()[2:] == [
+        'latency_bucket{stage="stt",le="0.1"} 1',
+        'latency_bucket{stage="stt",le="1"} 3',
+        'latency_bucket{stage="stt",le="+Inf"} 4',
+        'latency_sum{stage="stt"} 4.050000',
+        'latency_count{stage="stt"} 4',
+    ]
+
+def test_partial_turns_keep_the_stages_they_have():
+    instrumentation_sink = InMemorySink()
+    span = TurnSpan("MZ1", 1)
+    span.mark(TurnStage.pause_detected, 1.0)
+    span.mark(TurnStage.stt_start, 1.0)
+    span.mark(TurnStage.stt_end, 1.5)
+    instrumentation_sink.record_turn(span)
+    assert span.durations() == {"stt": 0.5}
+    assert instrumentation_sink.histograms["stt"].count == 1
+    assert instrumentation_sink.histograms["turn"].count == 0
+
+if __name__ == "__main__":
+    test_every_stage_of_every_turn_is_recorded()
+    test_disabled_by_default()
+    test_prometheus_text()
+    test_partial_turns_keep_the_stages_they_have()
+    print("Tests pass.")
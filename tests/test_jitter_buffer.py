@@ -0,0 +1,99 @@
+from pathlib import Path
+import asyncio
+import json
+
+import numpy as np
+
+from twilio_phone_calls import TwilioPhoneCall
+from twilio_phone_calls.audio.stt_engine import SttBackend, get_stt_backend, set_stt_backend
+from twilio_phone_calls.jitter_buffer import JitterBuffer
+from twilio_phone_calls.twilio_pydantic.stream_media_frame import StreamMediaFrame
+
+class FixedSttBackend(SttBackend):
+    def transcribe(self, np_pcm_wav: np.ndarray, sample_rate: int = 8000) -> str:
+        return "hello"
+
+PAYLOAD = "/" * 212 + "/w==" # 160 samples.
+
+def _frame(chunk: int) -> StreamMediaFrame:
+    return StreamMediaFrame(sequenceNumber=str(chunk + 1), chunk=str(chunk), timestamp=str(20 * chunk), payload=PAYLOAD)
+
+def _chunks(released: list) -> list:
+    return [int(item.chunk) if isinstance(item, StreamMediaFrame) else item for item in released]
+
+def test_in_order_frames_pass_straight_through():
+    jitter_buffer = JitterBuffer()
+    assert [_chunks(jitter_buffer.push(_frame(chunk))) for chunk in range(1, 4)] == [[1], [2], [3]]
+    assert jitter_buffer.media_time_ms == 80
+    assert jitter_buffer.stats() == {
+        "received_frames": 3, "reordered_frames": 0, "late_frames": 0, "lost_frames": 0, "filled_samples": 0,
+    }
+
+def test_reorders_and_drops_late_frames():
+    jitter_buffer = JitterBuffer(depth_frames=3)
+    released = [_chunks(jitter_buffer.push(_frame(chunk))) for chunk in [1, 3, 2, 2, 1]]
+    assert released == [[1], [], [2, 3], [], []]
+    assert jitter_buffer.reordered_frames == 1 and jitter_buffer.late_frames == 2
+
+def test_fills_lost_frames_with_silence_by_timestamp():
+    jitter_buffer = JitterBuffer(depth_frames=2)
+    released = [_chunks(jitter_buffer.push(_frame(chunk))) for chunk in [1, 4, 5, 6, 3]]
+    assert released == [[1], [], [2 * 160, 4, 5], [6], []] # Chunks 2 and 3 were 40ms of audio.
+    assert jitter_buffer.lost_frames == 2 and jitter_buffer.filled_samples == 320
+    assert jitter_buffer.late_frames == 1 and jitter_buffer.pending_frames == 0
+
+def test_endpointing_follows_media_time():
+    """
+    The fixture's two utterances, with frames swapped and dropped, are still detected as two.
+    """
+    with Path("tests/fixtures/stream1.txt").open() as f:
+        messages = [json.loads(line) for line in f]
+    media_messages = [message for message in messages if message["event"] == "media"]
+    jumbled_messages = []
+    swapped_count = dropped_count = 0
+    for index in range(0, len(media_messages) - 1, 2):
+        if index % 50 == 10:
+            jumbled_messages.append(media_messages[index + 1]) # Frame `index` is lost.
+            dropped_count += 1
+        else:
+            jumbled_messages += [media_messages[index + 1], media_messages[index]]
+            swapped_count += 1
+    caller_texts: list[str] = []
+
+    async def text_to_text(text: str) -> str:
+        caller_texts.append(text)
+        return ""
+
+    async def send_text(text: str) -> None:
+        pass
+
+    async def main() -> TwilioPhoneCall:
+        phone_call = TwilioPhoneCall.from_start_message(
+            messages[1],
+            send_websocket_message_async_method=send_text,
+            text_to_text_async_method=text_to_text,
+        )
+        for message in jumbled_messages:
+            await phone_call.receive_twilio_message(message)
+            if phone_call.turn_task is not None:
+                await phone_call.turn_task
+        return phone_call
+
+    previous_stt_backend = get_stt_backend()
+    set_stt_backend(FixedSttBackend())
+    try:
+        phone_call = asyncio.run(main())
+    finally:
+        set_stt_backend(previous_stt_backend)
+    assert caller_texts == ["hello", "hello"]
+    jitter_buffer = phone_call.jitter_buffer
+    assert jitter_buffer.late_frames == 1 # The very first frame: its successor set the starting point.
+    assert jitter_buffer.reordered_frames == swapped_count - 1
+    assert jitter_buffer.lost_frames == dropped_count and jitter_buffer.filled_samples == 160 * dropped_count
+
+if __name__ == "__main__":
+    test_in_order_frames_pass_straight_through()
+    test_reorders_and_drops_late_frames()
+    test_fills_lost_frames_with_silence_by_timestamp()
+    test_endpointing_follows_media_time()
+    print("Tests pass.")
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from twilio_phone_calls.audio.mulaw import (
+    MULAW_TO_INT16,
+    mulaw_decode,
+    mulaw_encode,
+)
+
+# (mu-law code, 16-bit linear value) pairs from the G.711 decoding table.
+G711_DECODE_REFERENCE = [
+    (0x00, -32124), (0x0F, -16764), (0x10, -15996), (0x1F, -8316),
+    (0x20, -7932), (0x40, -1884), (0x60, -372), (0x70, -120),
+    (0x7E, -8), (0x7F, 0), (0x80, 32124), (0x8F, 16764),
+    (0xC0, 1884), (0xEF, 132), (0xFE, 8), (0xFF, 0),
+]
+
+# (16-bit linear value, mu-law code) pairs, including clipping at both ends.
+G711_ENCODE_REFERENCE = [
+    (0, 0xFF), (-1, 0x7E), (100, 0xF2), (-100, 0x72), (1000, 0xCE),
+    (4000, 0xAF), (8031, 0xA0), (-8031, 0x20), (16764, 0x8F),
+    (32124, 0x80), (32767, 0x80), (-32768, 0x00),
+]
+
+def test_decode_matches_g711_reference():
+    codes = np.array([code for code, _ in G711_DECODE_REFERENCE], dtype=np.uint8)
+    expected = np.array([value for _, value in G711_DECODE_REFERENCE], dtype=np.int16)
+    assert np.array_equal(mulaw_decode(codes), expected)
+    assert np.array_equal(mulaw_decode(codes.tobytes(), dtype=np.int8), (expected >> 8).astype(np.int8))
+    assert np.allclose(mulaw_decode(codes, dtype=np.float32), expected / 32768)
+
+def test_encode_matches_g711_reference():
+    values = np.array([value for value, _ in G711_ENCODE_REFERENCE], dtype=np.int16)
+    expected = np.array([code for _, code in G711_ENCODE_REFERENCE], dtype=np.uint8)
+    assert np.array_equal(mulaw_encode(values), expected)
+    assert np.array_equal(mulaw_encode(values.astype(np.float32) / 32768), expected)
+
+def test_round_trip_every_code():
+    codes = np.arange(256, dtype=np.uint8)
+    decoded = mulaw_decode(codes)
+    # 0x7F and 0xFF both decode to 0 (negative and positive zero).
+    assert np.array_equal(MULAW_TO_INT16[mulaw_encode(decoded)], decoded)
+
+def test_writes_into_caller_buffers():
+    codes = np.arange(160, dtype=np.uint8)
+    pcm = np.empty(160, dtype=np.int16)
+    assert mulaw_decode(codes, out=pcm) is pcm
+    mulaw = np.empty(160, dtype=np.uint8)
+    assert mulaw_encode(pcm, out=mulaw) is mulaw
+    assert np.array_equal(MULAW_TO_INT16[mulaw], pcm)
+
+def test_matches_audioop_exhaustively():
+    audioop = pytest.importorskip("audioop")
+    all_codes = bytes(range(256))
+    for width, dtype in [(1, np.int8), (2, np.int16)]:
+        assert np.array_equal(mulaw_decode(all_codes, dtype=dtype), np.frombuffer(audioop.ulaw2lin(all_codes, width), dtype=dtype))
+        all_values = np.arange(np.iinfo(dtype).min, np.iinfo(dtype).max + 1).astype(dtype)
+        assert np.array_equal(mulaw_encode(all_values), np.frombuffer(audioop.lin2ulaw(all_values.tobytes(), width), dtype=np.uint8))
+
+if __name__ == "__main__":
+    test_decode_matches_g711_reference()
+    test_encode_matches_g711_reference()
+    test_round_trip_every_code()
+    test_writes_into_caller_buffers()
+    print("Tests pass.")
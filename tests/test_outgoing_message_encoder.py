@@ -0,0 +1,30 @@
+import base64
+
+from twilio_phone_calls.twilio_pydantic import (
+    OutgoingClearMessage,
+    OutgoingMarkMessage,
+    OutgoingMediaMessage,
+    OutgoingMessageEncoder,
+    StreamMarkPayload,
+)
+
+def test_byte_identical_to_pydantic():
+    for stream_sid in ["MZ18ad3ab5a668481ce02b83e7395059f0", "test_stream", 'quote"d\\sid-é']:
+        encoder = OutgoingMessageEncoder(stream_sid)
+        for mulaw_bytes in [b"", b"\xff" * 160, bytes(range(256))]:
+            twilio_mulaw_str = base64.b64encode(mulaw_bytes).decode("utf-8")
+            assert encoder.media_message_json(twilio_mulaw_str) == OutgoingMediaMessage.from_sid_and_mulaw_str(
+                stream_sid=stream_sid,
+                twilio_mulaw_str=twilio_mulaw_str,
+            ).model_dump_json()
+        for name in ["ack", "chunk-12", 'tab\tquote"é']:
+            assert encoder.mark_message_json(name) == OutgoingMarkMessage(
+                streamSid=stream_sid,
+                mark=StreamMarkPayload(name=name),
+            ).model_dump_json()
+        assert encoder.default_mark_message_json == OutgoingMarkMessage.create_default(stream_sid=stream_sid).model_dump_json()
+        assert encoder.clear_message_json == OutgoingClearMessage.create_default(stream_sid=stream_sid).model_dump_json()
+
+if __name__ == "__main__":
+    test_byte_identical_to_pydantic()
+    print("Tests pass.")
@@ -0,0 +1,106 @@
+from pathlib import Path
+import asyncio
+import json
+import time
+
+from twilio_phone_calls import TwilioPhoneCall
+from twilio_phone_calls.audio.tts_cache import TtsCache
+from twilio_phone_calls.audio.tts_engine import TtsBackend, get_tts_backend, set_tts_backend
+from twilio_phone_calls.playback_queue import PlaybackQueue
+from twilio_phone_calls.twilio_pydantic.outgoing_message_encoder import OutgoingMessageEncoder
+
+class Sent(list):
+    async def append_async(self, text: str) -> None:
+        self.append(text)
+
+    def events(self) -> list[str]:
+        return [json.loads(text)["event"] for text in self]
+
+def test_marks_track_what_was_played():
+    sent = Sent()
+
+    async def main() -> None:
+        playback = PlaybackQueue(sent.append_async, OutgoingMessageEncoder("MZ1"))
+        await playback.send_audio(b"\xff" * 4000, chunk_size=1600)
+        await playback.send_mark("ack")
+        assert sent.events() == ["media", "mark"] * 3 + ["mark"]
+        assert playback.pending_marks == 4 and playback.sent_seconds == 0.5
+        playback.on_mark("audio-2") # audio-1 is implied.
+        assert playback.pending_marks == 2 and playback.played_seconds == 0.4
+        playback.on_mark("someone else's mark")
+        assert playback.pending_marks == 2
+        playback.on_mark("ack")
+        assert not playback.is_playing() and playback.played_seconds == 0.5
+
+    asyncio.run(main())
+
+def test_cleared_audio_does_not_count_as_played():
+    sent = Sent()
+
+    async def main() -> None:
+        playback = PlaybackQueue(sent.append_async, OutgoingMessageEncoder("MZ1"))
+        await playback.send_audio(b"\xff" * 4000, chunk_size=1600)
+        playback.on_mark("audio-1")
+        await playback.clear()
+        assert sent.events()[-1] == "clear"
+        assert playback.interrupted_at_seconds == 0.2
+        assert not playback.is_playing() and playback.pending_marks == 2
+        # Twilio echoes the cleared marks right away.
+        playback.on_mark("audio-3")
+        assert playback.pending_marks == 0 and playback.played_seconds == 0.2
+        await playback.send_audio(b"\xff" * 800, chunk_size=1600)
+        playback.on_mark("audio-4")
+        assert playback.played_seconds == 0.3 and playback.sent_seconds == 0.6
+
+    asyncio.run(main())
+
+class SlowTtsBackend(TtsBackend):
+    name = "slow"
+
+    def __init__(self):
+        self.texts: list[str] = []
+
+    def text__to__mulaw_bytes(self, text: str) -> bytes:
+        time.sleep(0.05)
+        self.texts.append(text)
+        return b"\xff" * 1600
+
+def test_barge_in_cancels_pending_synthesis():
+    previous_backend = get_tts_backend()
+    tts_backend = SlowTtsBackend()
+    set_tts_backend(tts_backend)
+    sent = Sent()
+
+    async def main() -> None:
+        with Path("tests/fixtures/stream1.txt").open() as f:
+            messages = [json.loads(line) for line in f]
+        phone_call = TwilioPhoneCall.from_start_message(
+            messages[1],
+            send_websocket_message_async_method=sent.append_async,
+            text_to_text_async_method=lambda text: asyncio.sleep(0, "Okay."),
+            tts_cache=TtsCache(),
+        )
+        speech_task = phone_call.speak("One. Two. Three. Four. Five. Six. Seven. Eight.")
+        while "media" not in sent.events():
+            await asyncio.sleep(0.01)
+        for message in messages:
+            if message["event"] == "media":
+                await phone_call.receive_twilio_message(message)
+            if "clear" in sent.events():
+                break
+        await asyncio.sleep(0.2)
+        assert speech_task.cancelled()
+        assert phone_call.playback.interrupted_at_seconds == 0.0 # Nothing was acknowledged.
+
+    try:
+        asyncio.run(main())
+    finally:
+        set_tts_backend(previous_backend)
+    assert len(tts_backend.texts) < 8
+    assert sent.events()[sent.events().index("clear"):] == ["clear"] # Nothing more was spoken.
+
+if __name__ == "__main__":
+    test_marks_track_what_was_played()
+    test_cleared_audio_does_not_count_as_played()
+    test_barge_in_cancels_pending_synthesis()
+    print("Tests pass.")
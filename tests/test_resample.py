@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from twilio_phone_calls.audio.mulaw import mulaw_decode
+from twilio_phone_calls.audio.resample import (
+    PcmToMulawStream,
+    PolyphaseResampler,
+    StreamingNormalizer,
+    normalize_peak,
+    resample,
+)
+
+def _tones(sample_rate: int, seconds: float = 1.0, frequencies=(440, 1500)) -> np.ndarray:
+    times = np.arange(int(sample_rate * seconds)) / sample_rate
+    return sum(0.3 * np.sin(2 * np.pi * frequency * times) for frequency in frequencies).astype(np.float32)
+
+def _in_chunks(process, flush, signal: np.ndarray, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    outputs, start = [], 0
+    while start < len(signal):
+        size = int(rng.integers(1, 700))
+        outputs.append(process(signal[start:start + size]))
+        start += size
+    outputs.append(flush())
+    return np.concatenate(outputs)
+
+@pytest.mark.parametrize("orig_sample_rate,target_sample_rate", [(24000, 8000), (8000, 16000), (22050, 8000)])
+def test_streaming_matches_whole_signal_and_the_ideal_output(orig_sample_rate, target_sample_rate):
+    signal = _tones(orig_sample_rate)
+    resampled = resample(signal, orig_sample_rate, target_sample_rate)
+    assert len(resampled) == target_sample_rate
+    resampler = PolyphaseResampler(orig_sample_rate, target_sample_rate)
+    assert np.array_equal(_in_chunks(resampler.process, resampler.flush, signal), resampled)
+    # Away from the edges, the tones come through at the new rate.
+    ideal = _tones(target_sample_rate)
+    assert np.max(np.abs(resampled - ideal)[200:-200]) < 1e-3
+
+def test_resampling_removes_what_the_new_rate_cannot_carry():
+    resampled = resample(_tones(24000, frequencies=(6000,)), 24000, 8000) # Above 8kHz's Nyquist.
+    assert np.max(np.abs(resampled[200:-200])) < 1e-3
+
+def test_normalize_peak():
+    assert np.max(np.abs(normalize_peak(np.array([0, 20, -40], dtype=np.int8)))) == 1.0
+    assert not normalize_peak(np.zeros(10)).any()
+
+def test_streaming_normalizer_never_exceeds_the_target():
+    rng = np.random.default_rng(0)
+    signal = (rng.standard_normal(8000) * np.linspace(0.01, 0.5, 8000)).astype(np.float32)
+    signal[6000] = 0.9 # A sudden peak.
+    normalizer = StreamingNormalizer(target_peak=0.95, lookahead_samples=80)
+    normalized = _in_chunks(normalizer.process, normalizer.flush, signal)
+    assert len(normalized) == len(signal)
+    assert np.max(np.abs(normalized)) <= 0.95 + 1e-6
+    assert np.max(np.abs(normalized[6000 - 200:6000 - 80])) > 0.5 # No gain drop until the lookahead.
+    whole = StreamingNormalizer(target_peak=0.95, lookahead_samples=80)
+    assert np.allclose(np.concatenate([whole.process(signal), whole.flush()]), normalized)
+
+def test_generated_audio_to_mulaw_incrementally():
+    signal = _tones(24000, seconds=0.5)
+    stream = PcmToMulawStream(24000)
+    mulaw_bytes = b"".join([stream.process(signal[:5000]), stream.process(signal[5000:]), stream.flush()])
+    assert len(mulaw_bytes) == 4000
+    decoded = mulaw_decode(mulaw_bytes, dtype=np.float32)
+    assert 0.8 < np.max(np.abs(decoded)) <= 1.0
+
+if __name__ == "__main__":
+    for rates in [(24000, 8000), (8000, 16000), (22050, 8000)]:
+        test_streaming_matches_whole_signal_and_the_ideal_output(*rates)
+    test_resampling_removes_what_the_new_rate_cannot_carry()
+    test_normalize_peak()
+    test_streaming_normalizer_never_exceeds_the_target()
+    test_generated_audio_to_mulaw_incrementally()
+    print("Tests pass.")
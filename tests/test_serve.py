@@ -0,0 +1,260 @@
+from pathlib import Path
+import asyncio
+import contextlib
+import json
+import signal
+
+import numpy as np
+
+from twilio_phone_calls.audio.audio_executor import AudioExecutor
+from twilio_phone_calls.audio.stt_engine import SttBackend, get_stt_backend, set_stt_backend
+from twilio_phone_calls.audio.tts_cache import TtsCache
+from twilio_phone_calls.audio.tts_engine import ToneTtsBackend, get_tts_backend, set_tts_backend
+from twilio_phone_calls.call_manager import CallManager
+from twilio_phone_calls.serve import WebSocketSender, create_app
+
+class FixedSttBackend(SttBackend):
+    def transcribe(self, np_pcm_wav: np.ndarray, sample_rate: int = 8000) -> str:
+        return "hello"
+
+class _SimulatedTwilio:
+    """
+    One Twilio media stream, talking to the app in process (ASGI, no network).
+    Echoes each mark as soon as it's sent, as if the audio played instantly.
+    """
+    def __init__(self, app, stream_index: int):
+        self.app = app
+        self.stream_index = stream_index
+        self.sent: list[str] = []
+        self.closed = False
+        self._incoming: asyncio.Queue[dict] = asyncio.Queue()
+
+    def acks(self) -> int:
+        return sum('"name":"ack"' in text for text in self.sent)
+
+    async def run(self, lines: list[str], frame_seconds: float, expected_acks: int, burst_frames: int = 10) -> None:
+        """
+        Send the recorded messages, `burst_frames` at a time (`frame_seconds` apart on average),
+        then wait for `expected_acks` answers before hanging up.
+        """
+        lines = [
+            line.replace("test_stream", f"MZ{self.stream_index}").replace("CA3ae75", f"CA{self.stream_index}_")
+            for line in lines
+        ]
+        app_task = asyncio.create_task(self.app(_websocket_scope(), self._incoming.get, self._send))
+        self._incoming.put_nowait({"type": "websocket.connect"})
+        for line_index, line in enumerate(lines):
+            if '"event":"stop"' in line:
+                break
+            self._receive_text(line)
+            if line_index % burst_frames == 0:
+                await asyncio.sleep(frame_seconds * burst_frames)
+        for _ in range(500):
+            if self.acks() >= expected_acks:
+                break
+            await asyncio.sleep(0.01)
+        self._receive_text(lines[-1]) # The stop message.
+        self._incoming.put_nowait({"type": "websocket.disconnect", "code": 1000})
+        await app_task
+
+    # Private.
+
+    def _receive_text(self, text: str) -> None:
+        self._incoming.put_nowait({"type": "websocket.receive", "text": text})
+
+    async def _send(self, message: dict) -> None:
+        if message["type"] == "websocket.send":
+            self.sent.append(message["text"])
+            if message["text"].startswith('{"event":"mark"'):
+                name = json.loads(message["text"])["mark"]["name"]
+                self._receive_text(json.dumps({"event": "mark", "mark": {"name": name}}))
+        elif message["type"] == "websocket.close":
+            self.closed = True
+
+def _websocket_scope() -> dict:
+    return {
+        "type": "websocket",
+        "asgi": {"version": "3.0"},
+        "scheme": "ws",
+        "path": "/stream",
+        "raw_path": b"/stream",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"calls.example.com")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("calls.example.com", 443),
+        "subprotocols": [],
+    }
+
+@contextlib.contextmanager
+def _offline_models():
+    previous_stt_backend, previous_tts_backend = get_stt_backend(), get_tts_backend()
+    set_stt_backend(FixedSttBackend())
+    set_tts_backend(ToneTtsBackend())
+    try:
+        yield
+    finally:
+        set_stt_backend(previous_stt_backend)
+        set_tts_backend(previous_tts_backend)
+
+def _fixture_lines() -> list[str]:
+    with Path("tests/fixtures/stream1.txt").open() as f:
+        return f.read().splitlines()
+
+def test_hundreds_of_simultaneous_streams():
+    stream_count = 100
+    audio_executor = AudioExecutor(max_workers=4)
+    call_manager = CallManager(max_concurrent_calls=stream_count, audio_executor=audio_executor, tts_cache=TtsCache())
+    app = create_app(greeting=None, call_manager=call_manager)
+    simulated_streams = [_SimulatedTwilio(app, stream_index) for stream_index in range(stream_count)]
+
+    async def main() -> None:
+        await asyncio.gather(*[
+            simulated_stream.run(_fixture_lines(), frame_seconds=0.001, expected_acks=1)
+            for simulated_stream in simulated_streams
+        ])
+
+    try:
+        with _offline_models():
+            asyncio.run(main())
+    finally:
+        audio_executor.shutdown()
+    for simulated_stream in simulated_streams:
+        media_messages = [text for text in simulated_stream.sent if text.startswith('{"event":"media"')]
+        assert media_messages and f'"streamSid":"MZ{simulated_stream.stream_index}"' in media_messages[0]
+        assert simulated_stream.acks() >= 1, simulated_stream.stream_index # The caller was answered.
+        assert simulated_stream.closed
+    assert call_manager.rejected_calls == 0
+    assert len(call_manager) == 0
+
+def test_busy_callers_are_told_and_hung_up_on():
+    call_manager = CallManager(max_concurrent_calls=1, tts_cache=TtsCache())
+    app = create_app(greeting=None, call_manager=call_manager)
+    first_stream, second_stream = _SimulatedTwilio(app, 1), _SimulatedTwilio(app, 2)
+    lines = _fixture_lines()
+
+    async def main() -> None:
+        first_task = asyncio.create_task(first_stream.run(lines, frame_seconds=0.001, expected_acks=1))
+        while len(call_manager) == 0: # Until the first call has started.
+            await asyncio.sleep(0.01)
+        await second_stream.run(lines[:2] + lines[-1:], frame_seconds=0, expected_acks=1)
+        await first_task
+
+    with _offline_models():
+        asyncio.run(main())
+    assert call_manager.rejected_calls == 1
+    assert second_stream.closed and any(text.startswith('{"event":"media"') for text in second_stream.sent)
+
+def test_shutdown_waits_for_calls_in_progress():
+    call_manager = CallManager(tts_cache=TtsCache())
+    app = create_app(greeting=None, call_manager=call_manager, drain_seconds=5)
+    exits: list[int] = []
+    lines = _fixture_lines()
+
+    async def main() -> None:
+        async with app.router.lifespan_context(app): # Wraps the SIGTERM handler (here, the test's).
+            first_stream = _SimulatedTwilio(app, 1)
+            first_task = asyncio.create_task(first_stream.run(lines, frame_seconds=0.001, expected_acks=1))
+            while len(call_manager) == 0:
+                await asyncio.sleep(0.01)
+            signal.raise_signal(signal.SIGTERM)
+            await asyncio.sleep(0.05)
+            assert app.state.draining and exits == [] # The call goes on.
+            second_stream = _SimulatedTwilio(app, 2)
+            await second_stream.run(lines[:2] + lines[-1:], frame_seconds=0, expected_acks=0)
+            assert second_stream.closed and second_stream.sent == [] # Turned away.
+            await first_task
+            for _ in range(100):
+                if exits:
+                    break
+                await asyncio.sleep(0.05)
+            assert exits == [signal.SIGTERM] # Once the call had ended.
+
+    previous_handler = signal.signal(signal.SIGTERM, lambda signum, frame: exits.append(signum))
+    try:
+        with _offline_models():
+            asyncio.run(main())
+    finally:
+        signal.signal(signal.SIGTERM, previous_handler)
+
+class FailingTtsBackend(ToneTtsBackend):
+    def texts__to__mulaw_bytes(self, texts: list[str]) -> list[bytes]:
+        raise ConnectionError("No network")
+
+def test_failed_warm_up_still_starts():
+    app = create_app(greeting="Hello!", call_manager=CallManager(tts_cache=TtsCache()))
+
+    async def main() -> None:
+        async with app.router.lifespan_context(app):
+            assert not app.state.draining
+
+    previous_tts_backend = get_tts_backend()
+    set_tts_backend(FailingTtsBackend())
+    try:
+        asyncio.run(main())
+    finally:
+        set_tts_backend(previous_tts_backend)
+
+def test_twiml_points_twilio_at_the_stream():
+    app = create_app()
+    sent: list[dict] = []
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"CallSid=CA1&Caller=%2B15551234567", "more_body": False}
+
+    async def send(message: dict) -> None:
+        sent.append(message)
+
+    scope = _websocket_scope() | {"type": "http", "method": "POST", "scheme": "https", "path": "/", "raw_path": b"/"}
+    asyncio.run(app(scope, receive, send))
+    assert sent[0]["status"] == 200
+    assert sent[1]["body"].decode() == (
+        '<?xml version="1.0" encoding="UTF-8"?><Response><Connect>'
+        '<Stream name="stream" url="wss://calls.example.com/stream"><Parameter name="caller" value="+15551234567" />'
+        '</Stream></Connect></Response>'
+    )
+
+def test_sender_queue_is_bounded():
+    async def main() -> None:
+        unblock = asyncio.Event()
+        written: list[str] = []
+
+        async def slow_send_text(text: str) -> None:
+            await unblock.wait()
+            written.append(text)
+
+        websocket_sender = WebSocketSender(slow_send_text, max_queued_messages=2, send_timeout_seconds=0.05)
+        websocket_sender.start()
+        for index in range(3): # One being written, two queued.
+            await websocket_sender.send(str(index))
+        try:
+            await websocket_sender.send("3")
+            assert False, "Expected a full queue to time out"
+        except ConnectionError:
+            pass
+        try:
+            await websocket_sender.send("4")
+            assert False, "Expected the sender to be closed"
+        except ConnectionError:
+            pass
+        await websocket_sender.close()
+        assert written == []
+
+        websocket_sender = WebSocketSender(slow_send_text, max_queued_messages=2)
+        websocket_sender.start()
+        for index in range(3):
+            await websocket_sender.send(str(index))
+        unblock.set()
+        await websocket_sender.close() # Drains the queue first.
+        assert written == ["0", "1", "2"] and websocket_sender.sent_messages == 3
+
+    asyncio.run(main())
+
+if __name__ == "__main__":
+    test_hundreds_of_simultaneous_streams()
+    test_busy_callers_are_told_and_hung_up_on()
+    test_shutdown_waits_for_calls_in_progress()
+    test_failed_warm_up_still_starts()
+    test_twiml_points_twilio_at_the_stream()
+    test_sender_queue_is_bounded()
+    print("Tests pass.")
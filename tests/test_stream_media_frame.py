@@ -0,0 +1,55 @@
+from pathlib import Path
+import json
+
+from twilio_phone_calls.twilio_pydantic import (
+    StreamMediaFrame,
+    StreamMediaMessage,
+    parse_stream_media_frame,
+)
+
+def _stream_lines() -> list[str]:
+    with Path("tests/fixtures/stream1.txt").open() as f:
+        return f.readlines()
+
+def test_matches_pydantic_on_recorded_stream():
+    media_frames = 0
+    for line in _stream_lines():
+        stream_media_frame = parse_stream_media_frame(line)
+        twilio_message = json.loads(line)
+        if twilio_message["event"] != "media":
+            assert stream_media_frame is None
+            continue
+        message = StreamMediaMessage.model_validate(twilio_message)
+        assert stream_media_frame == StreamMediaFrame(
+            sequenceNumber=message.sequenceNumber,
+            chunk=message.media.chunk,
+            timestamp=message.media.timestamp,
+            payload=message.media.payload,
+        )
+        assert stream_media_frame == StreamMediaFrame.from_twilio_message(twilio_message)
+        assert parse_stream_media_frame(line.encode()) == stream_media_frame
+        media_frames += 1
+    assert media_frames > 0
+
+def test_field_order():
+    twilio_json = '{"streamSid":"MZ1","media":{"payload":"//8=","timestamp":"135","chunk":"1","track":"inbound"},"sequenceNumber":"2","event":"media"}'
+    assert parse_stream_media_frame(twilio_json) == StreamMediaFrame(
+        sequenceNumber="2",
+        chunk="1",
+        timestamp="135",
+        payload="//8=",
+    )
+
+def test_falls_back_on_pretty_json():
+    assert parse_stream_media_frame('{"event": "media", "sequenceNumber": "2"}') is None
+
+def test_falls_back_on_escaped_payload():
+    twilio_json = '{"event":"media","sequenceNumber":"2","media":{"chunk":"1","timestamp":"135","payload":"\\/\\/8="}}'
+    assert parse_stream_media_frame(twilio_json) is None
+
+if __name__ == "__main__":
+    test_matches_pydantic_on_recorded_stream()
+    test_field_order()
+    test_falls_back_on_pretty_json()
+    test_falls_back_on_escaped_payload()
+    print("Tests pass.")
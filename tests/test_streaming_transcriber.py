@@ -0,0 +1,70 @@
+import asyncio
+
+import numpy as np
+
+from twilio_phone_calls.audio.audio_executor import AudioExecutor
+from twilio_phone_calls.audio.audio_sample_buffer import AudioSampleBuffer
+from twilio_phone_calls.audio.streaming_transcriber import StreamingTranscriber
+from twilio_phone_calls.audio.stt_engine import SttBackend, get_stt_backend, set_stt_backend
+
+class LengthSttBackend(SttBackend):
+    """
+    "Transcribes" audio as its length, so the test can see what was transcribed.
+    """
+    def __init__(self):
+        self.lengths: list[int] = []
+
+    def transcribe(self, np_pcm_wav: np.ndarray, sample_rate: int = 8000) -> str:
+        self.lengths.append(len(np_pcm_wav))
+        return f"<{len(np_pcm_wav)}>"
+
+def _utterance_frames() -> list[np.ndarray]:
+    rng = np.random.default_rng(0)
+    silence = [np.zeros(160, dtype=np.int8)] * 50 # 1s.
+    speech = [rng.integers(-60, 60, size=160).astype(np.int8) for _ in range(500)] # 10s.
+    for quiet_frame in (150, 320):
+        speech[quiet_frame] = np.zeros(160, dtype=np.int8)
+    return silence + speech + silence + silence
+
+def test_partials_then_finalize_only_the_tail():
+    previous_backend = get_stt_backend()
+    stt_backend = LengthSttBackend()
+    set_stt_backend(stt_backend)
+    partial_texts: list[str] = []
+
+    async def on_partial(text: str) -> None:
+        partial_texts.append(text)
+
+    async def main() -> tuple[str, AudioSampleBuffer, StreamingTranscriber]:
+        streaming_transcriber = StreamingTranscriber(
+            audio_executor=AudioExecutor(max_workers=1),
+            call_key="test_stream",
+            partial_transcript_async_method=on_partial,
+        )
+        audio_buffer = AudioSampleBuffer()
+        for frame in _utterance_frames():
+            audio_buffer.append(frame)
+            if audio_buffer.check_has_started():
+                streaming_transcriber.on_audio(audio_buffer)
+            if audio_buffer.check_has_finished():
+                return await streaming_transcriber.finalize(audio_buffer), audio_buffer, streaming_transcriber
+            await asyncio.sleep(0.002)
+        assert False, "Expected the pause to be detected."
+
+    try:
+        final_text, audio_buffer, streaming_transcriber = asyncio.run(main())
+    finally:
+        set_stt_backend(previous_backend)
+
+    assert len(partial_texts) >= 5, partial_texts
+    committed_text = streaming_transcriber.committed_text
+    assert committed_text and final_text.startswith(committed_text)
+    starting_index, ending_index = audio_buffer.crop_bounds()
+    tail_length = int(final_text.split()[-1].strip("<>"))
+    assert tail_length < (ending_index - starting_index) / 2
+    # Committed pieces plus the tail cover the cropped utterance exactly once.
+    assert sum(int(word.strip("<>")) for word in final_text.split()) == ending_index - starting_index
+
+if __name__ == "__main__":
+    test_partials_then_finalize_only_the_tail()
+    print("Tests pass.")
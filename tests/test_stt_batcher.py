@@ -0,0 +1,94 @@
+import asyncio
+import time
+
+import numpy as np
+
+from twilio_phone_calls.audio.audio_executor import AudioExecutor
+from twilio_phone_calls.audio.stt_batcher import SttBatcher
+from twilio_phone_calls.audio.stt_engine import SttBackend, get_stt_backend, set_stt_backend
+from twilio_phone_calls.audio.voice_to_text import FALLBACK_CALLER_TEXT
+
+class BatchRecordingSttBackend(SttBackend):
+    def __init__(self, fail_batches: bool = False):
+        self.fail_batches = fail_batches
+        self.batch_sizes: list[int] = []
+
+    def transcribe(self, np_pcm_wav: np.ndarray, sample_rate: int = 8000) -> str:
+        return f"{len(np_pcm_wav)} samples" if len(np_pcm_wav) else ""
+
+    def transcribe_batch(self, np_pcm_wavs: list[np.ndarray], sample_rate: int = 8000) -> list[str]:
+        self.batch_sizes.append(len(np_pcm_wavs))
+        if self.fail_batches:
+            raise RuntimeError("Batch failed.")
+        return super().transcribe_batch(np_pcm_wavs, sample_rate=sample_rate)
+
+def _with_stt_backend(stt_backend: SttBackend, main):
+    previous_backend = get_stt_backend()
+    set_stt_backend(stt_backend)
+    audio_executor = AudioExecutor(max_workers=2)
+    try:
+        return asyncio.run(main(audio_executor))
+    finally:
+        audio_executor.shutdown()
+        set_stt_backend(previous_backend)
+
+def test_concurrent_utterances_share_a_batch():
+    stt_backend = BatchRecordingSttBackend()
+
+    async def main(audio_executor: AudioExecutor) -> list[str]:
+        stt_batcher = SttBatcher(max_batch_size=4, max_wait_ms=20, audio_executor=audio_executor)
+        return await asyncio.gather(*[
+            stt_batcher.transcribe(np.ones(1000 * (index + 1), dtype=np.int8))
+            for index in range(5)
+        ])
+
+    texts = _with_stt_backend(stt_backend, main)
+    assert texts == [f"{1000 * (index + 1)} samples" for index in range(5)]
+    assert stt_backend.batch_sizes == [4, 1]
+
+def test_max_wait_bounds_the_added_latency():
+    stt_backend = BatchRecordingSttBackend()
+
+    async def main(audio_executor: AudioExecutor) -> float:
+        stt_batcher = SttBatcher(max_batch_size=8, max_wait_ms=30, audio_executor=audio_executor)
+        start_time = time.perf_counter()
+        await stt_batcher.transcribe(np.ones(1000, dtype=np.int8))
+        return time.perf_counter() - start_time
+
+    elapsed = _with_stt_backend(stt_backend, main)
+    assert 0.03 <= elapsed < 0.5, elapsed
+    assert stt_backend.batch_sizes == [1]
+
+def test_failed_batch_falls_back_to_one_at_a_time():
+    stt_backend = BatchRecordingSttBackend(fail_batches=True)
+
+    async def main(audio_executor: AudioExecutor) -> list[str]:
+        stt_batcher = SttBatcher(max_batch_size=2, max_wait_ms=10, audio_executor=audio_executor)
+        return await asyncio.gather(
+            stt_batcher.transcribe(np.ones(1000, dtype=np.int8)),
+            stt_batcher.transcribe(np.ones(0, dtype=np.int8)),
+        )
+
+    assert _with_stt_backend(stt_backend, main) == ["1000 samples", FALLBACK_CALLER_TEXT]
+
+def test_cancelled_utterance_is_left_out():
+    stt_backend = BatchRecordingSttBackend()
+
+    async def main(audio_executor: AudioExecutor) -> str:
+        stt_batcher = SttBatcher(max_batch_size=8, max_wait_ms=20, audio_executor=audio_executor)
+        cancelled = asyncio.create_task(stt_batcher.transcribe(np.ones(1000, dtype=np.int8)))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        text = await stt_batcher.transcribe(np.ones(2000, dtype=np.int8))
+        assert cancelled.cancelled() and stt_batcher.pending == 0
+        return text
+
+    assert _with_stt_backend(stt_backend, main) == "2000 samples"
+    assert stt_backend.batch_sizes == [1]
+
+if __name__ == "__main__":
+    test_concurrent_utterances_share_a_batch()
+    test_max_wait_bounds_the_added_latency()
+    test_failed_batch_falls_back_to_one_at_a_time()
+    test_cancelled_utterance_is_left_out()
+    print("Tests pass.")
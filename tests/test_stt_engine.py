@@ -0,0 +1,81 @@
+import sys
+import types
+
+import numpy as np
+
+from twilio_phone_calls.audio.stt_engine import (
+    SttBackend,
+    WhisperSttBackend,
+    get_stt_backend,
+    set_stt_backend,
+)
+from twilio_phone_calls.audio.voice_to_text import (
+    np_pcm_wav__to__text,
+    np_pcm_wav__to__text_safe,
+)
+
+class EchoLengthSttBackend(SttBackend):
+    def __init__(self):
+        self.received: list[np.ndarray] = []
+
+    def transcribe(self, np_pcm_wav: np.ndarray, sample_rate: int = 8000) -> str:
+        self.received.append(np_pcm_wav)
+        return f" {len(np_pcm_wav)} samples " if len(np_pcm_wav) else ""
+
+def test_backend_receives_array_directly():
+    previous_backend = get_stt_backend()
+    backend = EchoLengthSttBackend()
+    set_stt_backend(backend)
+    try:
+        audio = np.ones(4000, dtype=np.int8)
+        assert np_pcm_wav__to__text(audio) == "4000 samples"
+        assert backend.received[0] is audio
+        assert np_pcm_wav__to__text_safe(audio[:0]).startswith("I'm sorry")
+    finally:
+        set_stt_backend(previous_backend)
+
+def test_whisper_model_loaded_once(monkeypatch):
+    loaded_models = []
+
+    class FakeWhisperModel:
+        def transcribe(self, audio: np.ndarray, fp16: bool) -> dict:
+            assert audio.dtype == np.float32
+            assert len(audio) == 2 * 8000
+            return {"text": " hello"}
+
+    def load_model(name: str) -> FakeWhisperModel:
+        loaded_models.append(name)
+        return FakeWhisperModel()
+
+    monkeypatch.setitem(sys.modules, "whisper", types.SimpleNamespace(load_model=load_model))
+    backend = WhisperSttBackend()
+    for _ in range(3):
+        assert backend.transcribe(np.full(8000, 20, dtype=np.int8)) == " hello"
+    assert loaded_models == ["base"]
+
+def test_whisper_decodes_a_batch_in_one_pass(monkeypatch):
+    import whisper
+    decoded_batches = []
+
+    class FakeWhisperModel:
+        dims = types.SimpleNamespace(n_mels=80)
+        device = "cpu"
+
+        def transcribe(self, audio: np.ndarray, fp16: bool) -> dict:
+            return {"text": " long"}
+
+    def decode(model, mels, options):
+        decoded_batches.append(tuple(mels.shape))
+        return [types.SimpleNamespace(text=f" utterance {index}") for index in range(len(mels))]
+
+    monkeypatch.setattr(whisper, "load_model", lambda name: FakeWhisperModel())
+    monkeypatch.setattr(whisper, "decode", decode)
+    backend = WhisperSttBackend()
+    short_audio, long_audio = np.full(8000, 20, dtype=np.int8), np.full(8000 * 31, 20, dtype=np.int8)
+    texts = backend.transcribe_batch([short_audio, long_audio, short_audio])
+    assert texts == [" utterance 0", " long", " utterance 1"]
+    assert decoded_batches == [(2, 80, 3000)] # Padded to Whisper's 30s window.
+
+if __name__ == "__main__":
+    test_backend_receives_array_directly()
+    print("Tests pass.")
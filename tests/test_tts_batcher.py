@@ -0,0 +1,89 @@
+from pathlib import Path
+import asyncio
+import json
+
+from twilio_phone_calls import TwilioPhoneCall
+from twilio_phone_calls.audio.audio_executor import AudioExecutor
+from twilio_phone_calls.audio.text_to_voice import get_xtts_model, xtts_model
+from twilio_phone_calls.audio.tts_batcher import TtsBatcher
+from twilio_phone_calls.audio.tts_cache import TtsCache
+from twilio_phone_calls.audio.tts_engine import ToneTtsBackend, get_tts_backend, set_tts_backend
+
+class CountingToneTtsBackend(ToneTtsBackend):
+    def __init__(self):
+        super().__init__()
+        self.batches: list[list[str]] = []
+
+    def texts__to__mulaw_bytes(self, texts: list[str]) -> list[bytes]:
+        self.batches.append(texts)
+        return super().texts__to__mulaw_bytes(texts)
+
+def _with_tts_backend(tts_backend, main):
+    previous_backend = get_tts_backend()
+    set_tts_backend(tts_backend)
+    audio_executor = AudioExecutor(max_workers=2)
+    try:
+        return asyncio.run(main(audio_executor))
+    finally:
+        audio_executor.shutdown()
+        set_tts_backend(previous_backend)
+
+def test_tone_backend_is_deterministic_and_batches_match_single_texts():
+    tts_backend = ToneTtsBackend(seconds_per_letter=0.05, gap_seconds=0.1)
+    texts = ["Hello there.", "How can I help you?", ""]
+    batch = tts_backend.texts__to__mulaw_bytes(texts)
+    assert batch == [tts_backend.text__to__mulaw_bytes(text) for text in texts]
+    assert batch == ToneTtsBackend(seconds_per_letter=0.05, gap_seconds=0.1).texts__to__mulaw_bytes(texts)
+    assert len(batch[0]) == (5 * 400 + 800) + (6 * 400 + 800) # "Hello" and "there." with their gaps.
+    assert batch[2] == b""
+
+def test_sentences_from_concurrent_calls_share_a_batch():
+    tts_backend = CountingToneTtsBackend()
+
+    async def main(audio_executor: AudioExecutor) -> list[bytes]:
+        tts_batcher = TtsBatcher(max_batch_size=8, max_wait_ms=20, audio_executor=audio_executor)
+        return await asyncio.gather(
+            tts_batcher.synthesize("Hey!"),
+            tts_batcher.synthesize("Hey!"),
+            tts_batcher.synthesize("Welcome back."),
+        )
+
+    mulaw_bytes = _with_tts_backend(tts_backend, main)
+    assert tts_backend.batches == [["Hey!", "Welcome back."]] # Each distinct sentence once.
+    assert mulaw_bytes == ToneTtsBackend().texts__to__mulaw_bytes(["Hey!", "Hey!", "Welcome back."])
+
+def test_phone_call_synthesizes_through_the_batcher():
+    tts_backend = CountingToneTtsBackend()
+    sent: list[str] = []
+
+    async def send_text(text: str) -> None:
+        sent.append(text)
+
+    async def main(audio_executor: AudioExecutor) -> None:
+        with Path("tests/fixtures/stream1.txt").open() as f:
+            start_message = json.loads(f.readlines()[1])
+        phone_call = TwilioPhoneCall.from_start_message(
+            start_message,
+            send_websocket_message_async_method=send_text,
+            text_to_text_async_method=lambda text: asyncio.sleep(0, text),
+            audio_executor=audio_executor,
+            tts_cache=TtsCache(),
+            tts_batcher=TtsBatcher(max_wait_ms=5, audio_executor=audio_executor),
+        )
+        await phone_call.send_text_as_audio("Hi. Bye.")
+
+    _with_tts_backend(tts_backend, main)
+    assert tts_backend.batches == [["Hi."], ["Bye."]]
+    assert json.loads(sent[-1])["mark"]["name"] == "ack"
+
+def test_one_xtts_model_per_device():
+    assert get_xtts_model("cuda") is xtts_model
+    assert get_xtts_model("cpu") is get_xtts_model("cpu") is not xtts_model
+    assert not get_xtts_model("cpu").is_loaded
+
+if __name__ == "__main__":
+    test_tone_backend_is_deterministic_and_batches_match_single_texts()
+    test_sentences_from_concurrent_calls_share_a_batch()
+    test_phone_call_synthesizes_through_the_batcher()
+    test_one_xtts_model_per_device()
+    print("Tests pass.")
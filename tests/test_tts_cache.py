@@ -0,0 +1,50 @@
+from pathlib import Path
+
+from twilio_phone_calls.audio.tts_cache import TtsCache
+from twilio_phone_calls.audio.tts_engine import TtsBackend
+
+class CountingTtsBackend(TtsBackend):
+    name = "counting"
+
+    def __init__(self, speaker: str = "default"):
+        self.speaker = speaker
+        self.synthesized: list[str] = []
+
+    def text__to__mulaw_bytes(self, text: str) -> bytes:
+        self.synthesized.append(text)
+        return text.encode("utf-8") * 10
+
+def test_key_normalizes_text_but_not_voice():
+    backend, other_speaker = CountingTtsBackend(), CountingTtsBackend(speaker="other")
+    assert TtsCache.make_key("Hey!  How can I help\nyou?", backend) == TtsCache.make_key(" Hey! How can I help you? ", backend)
+    assert TtsCache.make_key("Hey!", backend) != TtsCache.make_key("Hey!", other_speaker)
+    assert TtsCache.make_key("Hey!", backend) != TtsCache.make_key("hey!", backend)
+
+def test_lru_eviction_by_size():
+    backend = CountingTtsBackend()
+    tts_cache = TtsCache(max_memory_bytes=100)
+    for text in ["aaaa", "bbbb", "cccc"]: # 40 bytes each.
+        tts_cache.get_or_synthesize(text, backend)
+    assert len(tts_cache) == 2 and tts_cache.memory_bytes == 80
+    assert tts_cache.get("aaaa", backend) is None
+    tts_cache.get_or_synthesize("bbbb", backend) # Now most recently used.
+    tts_cache.get_or_synthesize("dddd", backend)
+    assert tts_cache.get("bbbb", backend) is not None
+    assert tts_cache.get("cccc", backend) is None
+    assert backend.synthesized == ["aaaa", "bbbb", "cccc", "dddd"]
+
+def test_disk_tier_survives_restart(tmp_path: Path):
+    backend = CountingTtsBackend()
+    TtsCache(disk_dir=tmp_path).warm_up(["Hey! How can I help you?"], backend)
+    assert backend.synthesized == ["Hey!", "How can I help you?"]
+
+    restarted_cache = TtsCache(disk_dir=tmp_path)
+    mulaw_bytes = restarted_cache.get_or_synthesize("How can I help you?", backend)
+    assert bytes(mulaw_bytes) == b"How can I help you?" * 10
+    assert backend.synthesized == ["Hey!", "How can I help you?"]
+    assert restarted_cache.hits == 1 and restarted_cache.misses == 0
+
+if __name__ == "__main__":
+    test_key_normalizes_text_but_not_voice()
+    test_lru_eviction_by_size()
+    print("Tests pass.")
@@ -1,9 +1,26 @@
 from pathlib import Path
+import asyncio
+import base64
 import json
+import threading
+import time
 
+import numpy as np
 from tqdm import tqdm
 
-from twilio_phone_calls import TwilioPhoneCall
+from twilio_phone_calls import TwilioPhoneCall, twilio_phone_call
+from twilio_phone_calls.audio import tts_engine
+from twilio_phone_calls.audio.audio_executor import AudioExecutor
+from twilio_phone_calls.audio.voice_to_text import FALLBACK_CALLER_TEXT
+from twilio_phone_calls.audio.stt_engine import SttBackend, get_stt_backend, set_stt_backend
+from twilio_phone_calls.audio.tts_cache import TtsCache
+from twilio_phone_calls.audio.tts_engine import (
+    ToneTtsBackend,
+    TtsBackend,
+    get_tts_backend,
+    set_tts_backend,
+    split_off_sentences,
+)
 
 class MockClient:
     def __init__(self):
@@ -83,3 +100,312 @@ async def test_twilio_stream():
 
     # assert False
 
+
+class SleepyTtsBackend(TtsBackend):
+    """
+    One byte of audio per character, after a fixed synthesis delay.
+    """
+    name = "sleepy"
+
+    def __init__(self, delay_seconds: float):
+        self.delay_seconds = delay_seconds
+        self.finished_at: list[float] = []
+
+    def text__to__mulaw_bytes(self, text: str) -> bytes:
+        time.sleep(self.delay_seconds)
+        self.finished_at.append(time.perf_counter())
+        return b"\xff" * len(text) * 100
+
+def test_send_text_as_audio_pipelines_sentences():
+    previous_backend = get_tts_backend()
+    tts_backend = SleepyTtsBackend(delay_seconds=0.05)
+    set_tts_backend(tts_backend)
+    sent: list[tuple[float, str]] = []
+
+    async def send_text(text: str) -> None:
+        sent.append((time.perf_counter(), text))
+
+    async def main() -> None:
+        with Path("tests/fixtures/stream1.txt").open() as f:
+            start_message = json.loads(f.readlines()[1])
+        stream = TwilioPhoneCall.from_start_message(
+            start_message,
+            send_websocket_message_async_method=send_text,
+            text_to_text_async_method=MockClient().text_to_text,
+            tts_cache=TtsCache(),
+        )
+        stream.outgoing_chunk_size = 1000
+        await stream.send_text_as_audio("Hello there. How are you doing today? Good!")
+
+    try:
+        asyncio.run(main())
+    finally:
+        set_tts_backend(previous_backend)
+
+    messages = [json.loads(text) for _, text in sent]
+    assert [m["event"] for m in messages[:-1]] == ["media", "mark"] * (len(messages[:-1]) // 2)
+    assert [m["mark"]["name"] for m in messages[1:-1:2]] == [f"audio-{i}" for i in range(1, 7)]
+    assert messages[-1] == {"event": "mark", "streamSid": "test_stream", "mark": {"name": "ack"}}
+    payload_sizes = [len(base64.b64decode(m["media"]["payload"])) for m in messages[:-1:2]]
+    assert payload_sizes == [1000, 200, 1000, 1000, 400, 500], payload_sizes
+    # The first sentence went out before the second one was synthesized.
+    assert sent[0][0] < tts_backend.finished_at[1]
+
+def test_send_text_as_audio_reuses_cached_sentences():
+    previous_backend = get_tts_backend()
+    tts_backend = SleepyTtsBackend(delay_seconds=0)
+    set_tts_backend(tts_backend)
+    sent: list[str] = []
+
+    async def send_text(text: str) -> None:
+        sent.append(text)
+
+    async def main() -> None:
+        with Path("tests/fixtures/stream1.txt").open() as f:
+            start_message = json.loads(f.readlines()[1])
+        stream = TwilioPhoneCall.from_start_message(
+            start_message,
+            send_websocket_message_async_method=send_text,
+            text_to_text_async_method=MockClient().text_to_text,
+            tts_cache=TtsCache(),
+        )
+        await stream.send_text_as_audio("Hey! How can I help you?")
+        await stream.send_text_as_audio("Sorry. How can I help you?")
+
+    try:
+        asyncio.run(main())
+    finally:
+        set_tts_backend(previous_backend)
+
+    assert len(tts_backend.finished_at) == 3 # "How can I help you?" was synthesized once.
+    media_payloads = [json.loads(text)["media"]["payload"] for text in sent if json.loads(text)["event"] == "media"]
+    assert media_payloads[1] == media_payloads[-1] # Same audio both times.
+
+class ThreadRecordingTtsCache(TtsCache):
+    """
+    Records which thread touches the disk tier.
+    """
+    def __init__(self, disk_dir: Path):
+        super().__init__(disk_dir=disk_dir)
+        self.disk_threads: list[threading.Thread] = []
+
+    def _read_from_disk(self, key: str):
+        self.disk_threads.append(threading.current_thread())
+        return super()._read_from_disk(key)
+
+    def _write_to_disk(self, key: str, mulaw_bytes: bytes) -> None:
+        self.disk_threads.append(threading.current_thread())
+        super()._write_to_disk(key, mulaw_bytes)
+
+def test_tts_cache_disk_tier_stays_off_the_event_loop(tmp_path: Path):
+    previous_backend = get_tts_backend()
+    tts_backend = SleepyTtsBackend(delay_seconds=0)
+    set_tts_backend(tts_backend)
+    tts_cache = ThreadRecordingTtsCache(tmp_path)
+
+    async def send_text(text: str) -> None:
+        pass
+
+    async def main() -> None:
+        with Path("tests/fixtures/stream1.txt").open() as f:
+            start_message = json.loads(f.readlines()[1])
+        stream = TwilioPhoneCall.from_start_message(
+            start_message,
+            send_websocket_message_async_method=send_text,
+            text_to_text_async_method=MockClient().text_to_text,
+            tts_cache=tts_cache,
+        )
+        await stream.send_text_as_audio("Hey! How can I help you?")
+        tts_cache.clear() # As after a restart: the disk tier still has both.
+        await stream.send_text_as_audio("Hey! How can I help you?")
+        await stream.send_text_as_audio("Hey! How can I help you?") # From memory.
+
+    try:
+        asyncio.run(main())
+    finally:
+        set_tts_backend(previous_backend)
+
+    assert len(tts_backend.finished_at) == 2
+    assert len(tts_cache.disk_threads) == 6 # Two misses and writes, then two reads.
+    assert threading.main_thread() not in tts_cache.disk_threads
+
+def test_send_text_as_audio_with_a_process_pool(tmp_path: Path):
+    previous_backend = get_tts_backend()
+    set_tts_backend(ToneTtsBackend()) # Before the pool forks, so its workers have it too.
+    audio_executor = AudioExecutor(max_workers=1, use_processes=True)
+    tts_cache = TtsCache(disk_dir=tmp_path)
+    sent: list[str] = []
+
+    async def send_text(text: str) -> None:
+        sent.append(text)
+
+    async def main() -> None:
+        with Path("tests/fixtures/stream1.txt").open() as f:
+            start_message = json.loads(f.readlines()[1])
+        stream = TwilioPhoneCall.from_start_message(
+            start_message,
+            send_websocket_message_async_method=send_text,
+            text_to_text_async_method=MockClient().text_to_text,
+            audio_executor=audio_executor,
+            tts_cache=tts_cache,
+        )
+        await stream.send_text_as_audio("Hey! How can I help you?") # Synthesized in the pool.
+        tts_cache.clear()
+        await stream.send_text_as_audio("Hey! How can I help you?") # Memory-mapped from disk.
+
+    try:
+        asyncio.run(main())
+    finally:
+        audio_executor.shutdown()
+        set_tts_backend(previous_backend)
+
+    media_payloads = [json.loads(text)["media"]["payload"] for text in sent if json.loads(text)["event"] == "media"]
+    assert media_payloads and media_payloads[:len(media_payloads) // 2] == media_payloads[len(media_payloads) // 2:]
+    assert tts_cache.misses == 2 and tts_cache.hits == 2
+
+def test_default_tts_backend_is_chosen_off_the_event_loop(monkeypatch):
+    choosing_threads: list[threading.Thread] = []
+    tts_backend = SleepyTtsBackend(delay_seconds=0)
+
+    def choose_tts_backend() -> TtsBackend:
+        choosing_threads.append(threading.current_thread())
+        return tts_backend
+
+    monkeypatch.setattr(tts_engine, "_tts_backend", None) # As if nothing had called `preload`.
+    monkeypatch.setattr(twilio_phone_call, "get_tts_backend", choose_tts_backend)
+    monkeypatch.setattr(tts_engine, "get_tts_backend", lambda: tts_backend) # For the synthesis itself.
+
+    async def send_text(text: str) -> None:
+        pass
+
+    async def main() -> None:
+        with Path("tests/fixtures/stream1.txt").open() as f:
+            start_message = json.loads(f.readlines()[1])
+        stream = TwilioPhoneCall.from_start_message(
+            start_message,
+            send_websocket_message_async_method=send_text,
+            text_to_text_async_method=MockClient().text_to_text,
+            tts_cache=TtsCache(),
+        )
+        await stream.send_text_as_audio("Hey!")
+
+    asyncio.run(main())
+    assert len(choosing_threads) == 1 and choosing_threads[0] is not threading.main_thread()
+    assert len(tts_backend.finished_at) == 1
+
+class CountingSttBackend(SttBackend):
+    """
+    "utterance 1", "utterance 2", ...
+    """
+    def __init__(self):
+        self.count = 0
+
+    def transcribe(self, np_pcm_wav: np.ndarray, sample_rate: int = 8000) -> str:
+        self.count += 1
+        return f"utterance {self.count}"
+
+def _replay_media(
+    sent: list[dict],
+    text_to_text_async_method=None,
+    text_to_text_stream_async_method=None,
+    stt_batcher=None,
+) -> None:
+    """
+    Both utterances in the fixture, a millisecond per frame, without waiting on the turns.
+    """
+    with Path("tests/fixtures/stream1.txt").open() as f:
+        messages = [json.loads(line) for line in f]
+
+    async def send_text(text: str) -> None:
+        sent.append(json.loads(text))
+
+    async def main() -> None:
+        phone_call = TwilioPhoneCall.from_start_message(
+            messages[1],
+            send_websocket_message_async_method=send_text,
+            text_to_text_async_method=text_to_text_async_method,
+            tts_cache=TtsCache(),
+            text_to_text_stream_async_method=text_to_text_stream_async_method,
+            stt_batcher=stt_batcher,
+        )
+        for message in messages:
+            if message["event"] == "media":
+                await phone_call.receive_twilio_message(message)
+                await asyncio.sleep(0.001) # Turns run in the background.
+        await phone_call.turn_task
+
+    previous_stt_backend, previous_tts_backend = get_stt_backend(), get_tts_backend()
+    set_stt_backend(CountingSttBackend())
+    set_tts_backend(SleepyTtsBackend(delay_seconds=0))
+    try:
+        asyncio.run(main())
+    finally:
+        set_stt_backend(previous_stt_backend)
+        set_tts_backend(previous_tts_backend)
+
+def test_new_utterance_cancels_the_turn_in_flight():
+    answered: list[str] = []
+    cancelled: list[str] = []
+
+    async def text_to_text(text: str) -> str:
+        if text == "utterance 1":
+            try:
+                await asyncio.Event().wait() # Thinks until the caller speaks again.
+            except asyncio.CancelledError:
+                cancelled.append(text)
+                raise
+        answered.append(text)
+        return "Got it."
+
+    sent: list[dict] = []
+    _replay_media(sent, text_to_text_async_method=text_to_text)
+    assert cancelled == ["utterance 1"]
+    assert answered == ["utterance 1 utterance 2"] # Nothing the caller said is lost.
+    assert sent[-1]["mark"]["name"] == "ack"
+
+class FailingFirstSttBatcher:
+    """
+    Fails the first transcription, then "utterance 2", "utterance 3", ...
+    """
+    def __init__(self):
+        self.count = 0
+
+    async def transcribe(self, np_pcm_wav: np.ndarray) -> str:
+        self.count += 1
+        if self.count == 1:
+            raise RuntimeError("STT worker died")
+        return f"utterance {self.count}"
+
+def test_failed_transcription_costs_only_its_utterance():
+    answered: list[str] = []
+
+    async def text_to_text(text: str) -> str:
+        answered.append(text)
+        return "Got it."
+
+    sent: list[dict] = []
+    _replay_media(sent, text_to_text_async_method=text_to_text, stt_batcher=FailingFirstSttBatcher())
+    assert answered[-1] == "utterance 2", answered # Still answered after the failure.
+    assert all(text in (FALLBACK_CALLER_TEXT, "utterance 2") for text in answered), answered
+    assert sent[-1]["mark"]["name"] == "ack"
+
+def test_streamed_answer_is_spoken_sentence_by_sentence():
+    spoken_before_done: list[int] = []
+    sent: list[dict] = []
+
+    async def text_to_text_stream(text: str):
+        for token in ["Sure", ", one", " moment", ". ", "Here ", "it is.", " Anything", " else?"]:
+            await asyncio.sleep(0.01)
+            yield token
+        spoken_before_done.append(sum(message["event"] == "media" for message in sent))
+
+    _replay_media(sent, text_to_text_stream_async_method=text_to_text_stream)
+    media_bytes = [len(base64.b64decode(m["media"]["payload"])) for m in sent if m["event"] == "media"]
+    # The first sentence is spoken before the last token arrives (one answer per utterance).
+    assert len(spoken_before_done) == 2 and spoken_before_done[-1] > spoken_before_done[0] > 0
+    assert sum(media_bytes) == 2 * 100 * len("Sure, one moment.Here it is.Anything else?")
+
+def test_split_off_sentences():
+    assert split_off_sentences("Hello there. How ") == (["Hello there."], "How ")
+    assert split_off_sentences("Hello there.") == ([], "Hello there.")
+    assert split_off_sentences("One! Two? Three") == (["One!", "Two?"], "Three")
@@ -0,0 +1,87 @@
+from pathlib import Path
+import json
+
+import numpy as np
+
+from twilio_phone_calls.audio.audio_sample_buffer import AudioSampleBuffer
+from twilio_phone_calls.audio.audio_conversions import twilio_mulaw_str__to__np_pcm_wav
+from twilio_phone_calls.audio.vad import EndpointingConfig, EnergyVad, ModelVad
+
+def _frames(seconds: float, make_frame) -> list[np.ndarray]:
+    return [make_frame() for _ in range(int(seconds * 50))]
+
+def _count_utterances(chunks: list[np.ndarray], vad, endpointing: EndpointingConfig | None = None) -> int:
+    buffer = AudioSampleBuffer(vad=vad, endpointing=endpointing)
+    utterances = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        if buffer.check_has_finished():
+            buffer = AudioSampleBuffer(vad=vad, endpointing=endpointing)
+            utterances += 1
+    return utterances
+
+def test_default_endpointing_matches_fixed_thresholds():
+    endpointing = EndpointingConfig()
+    assert (endpointing.pause_samples, endpointing.min_speech_samples, endpointing.padding_samples) == (10000, 1000, 1000)
+
+def test_energy_vad_ignores_steady_line_noise():
+    rng = np.random.default_rng(0)
+    noise = _frames(10, lambda: np.clip(rng.normal(0, 10, 160), -128, 127).astype(np.int8))
+    vad_buffer, fixed_threshold_buffer = AudioSampleBuffer(vad=EnergyVad()), AudioSampleBuffer()
+    for frame in noise:
+        vad_buffer.append(frame)
+        fixed_threshold_buffer.append(frame)
+    assert not vad_buffer.check_has_started()
+    assert fixed_threshold_buffer.check_has_started() # A false barge-in.
+
+def test_energy_vad_finds_speech_in_noise():
+    rng = np.random.default_rng(0)
+    t = np.arange(160) / 8000
+    noise = lambda: np.clip(rng.normal(0, 4, 160), -128, 127).astype(np.int8)
+    tone = lambda: np.clip(40 * np.sin(2 * np.pi * 300 * t) + rng.normal(0, 4, 160), -128, 127).astype(np.int8)
+    chunks = _frames(1, noise) + _frames(1, tone) + _frames(2, noise) + _frames(0.5, tone) + _frames(2, noise)
+    assert _count_utterances(chunks, EnergyVad()) == 2
+
+def test_hangover_bridges_short_gaps():
+    vad = EnergyVad(calibration_frames=0, hangover_frames=3)
+    loud, quiet = np.full(160, 60, dtype=np.int8), np.zeros(160, dtype=np.int8)
+    voiced = [bool(vad.voiced_mask(frame)[0]) for frame in [loud, quiet, quiet, quiet, quiet, loud]]
+    assert voiced == [True, True, True, True, False, True]
+
+def test_endpointing_is_configurable_in_ms():
+    chunks = [np.full(160, 50, dtype=np.int8)] * 10 + [np.zeros(160, dtype=np.int8)] * 40 # 200ms speech, 800ms pause.
+    assert _count_utterances(chunks, EnergyVad(calibration_frames=0)) == 0
+    assert _count_utterances(chunks, EnergyVad(calibration_frames=0), EndpointingConfig(pause_ms=500)) == 1
+
+def test_model_vad_hook():
+    """
+    The "model" says a frame is speech if its mean is positive.
+    """
+    seen_shapes = []
+    def predict(frames: np.ndarray) -> np.ndarray:
+        seen_shapes.append(frames.shape)
+        return (frames.mean(axis=1) > 0).astype(np.float32)
+    vad = ModelVad(predict, hangover_frames=0)
+    chunk = np.concatenate([np.full(160, 10, dtype=np.int8), np.full(160, -10, dtype=np.int8), np.full(100, 10, dtype=np.int8)])
+    mask = vad.voiced_mask(chunk)
+    assert seen_shapes == [(3, 160)]
+    assert mask.tolist() == [True] * 160 + [False] * 160 + [True] * 100
+
+def test_energy_vad_on_recorded_stream():
+    with Path("tests/fixtures/stream1.txt").open() as f:
+        messages = [json.loads(line) for line in f]
+    chunks = [
+        twilio_mulaw_str__to__np_pcm_wav(message["media"]["payload"])
+        for message in messages if message["event"] == "media"
+    ]
+    assert _count_utterances(chunks, EnergyVad()) == _count_utterances(chunks, None) == 2
+
+if __name__ == "__main__":
+    test_default_endpointing_matches_fixed_thresholds()
+    test_energy_vad_ignores_steady_line_noise()
+    test_energy_vad_finds_speech_in_noise()
+    test_hangover_bridges_short_gaps()
+    test_endpointing_is_configurable_in_ms()
+    test_model_vad_hook()
+    test_energy_vad_on_recorded_stream()
+    print("Tests pass.")
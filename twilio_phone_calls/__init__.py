@@ -1,2 +1,6 @@
 from .twilio_voice_response import create_twilio_voice_response
 from .twilio_phone_call import TwilioPhoneCall
+from .call_manager import CallManager
+from .preload import preload
+from .instrumentation import enable_instrumentation
+from .call_logging import enable_call_logging
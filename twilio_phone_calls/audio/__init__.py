@@ -1,15 +1,87 @@
 from .audio_conversions import (
     twilio_mulaw_str__to__np_pcm_wav,
+    twilio_mulaw_str__into__np_pcm_wav,
     np_pcm_wav__to__wav_filepath,
+    np_pcm_wav__to__wav_bytes,
+    np_pcm_wav__to__twilio_np_pcm_wav,
+    wav_bytes__to__np_pcm_wav,
     mulaw_filepath__to__np_pcm_wav,
+    mulaw_wav_bytes__to__mulaw_bytes,
+    mulaw_bytes__to__mulaw_wav_bytes,
     mp3_filepath__to__twilio_mulaw_str,
+    mp3_bytes__to__mulaw_bytes,
     text__to__mp3,
+    text__to__mp3_bytes,
     twilio_mulaw_str__to__pcm_wav_filepath__duplicate,
+    np_pcm_wav__to__normalized_float32,
 )
 
+from .resample import (
+    PolyphaseResampler,
+    StreamingNormalizer,
+    PcmToMulawStream,
+    resample,
+    normalize_peak,
+)
 from .audio_sample_buffer import AudioSampleBuffer
+from .vad import (
+    EndpointingConfig,
+    VoiceActivityDetector,
+    EnergyVad,
+    ModelVad,
+)
 from .tmp_file_path import TmpFilePath
+from .stt_engine import (
+    SttBackend,
+    WhisperSttBackend,
+    get_stt_backend,
+    set_stt_backend,
+)
+from .tts_engine import (
+    TtsBackend,
+    ToneTtsBackend,
+    GttsTtsBackend,
+    CoquiTtsBackend,
+    get_tts_backend,
+    get_tts_backend_nowait,
+    set_tts_backend,
+    text__to__mulaw_bytes,
+    texts__to__mulaw_bytes,
+)
+from .tts_cache import (
+    TtsCache,
+    get_tts_cache,
+    set_tts_cache,
+)
+from .micro_batcher import MicroBatcher
+from .tts_batcher import (
+    TtsBatcher,
+    get_tts_batcher,
+    set_tts_batcher,
+    enable_tts_batching,
+)
+from .audio_executor import (
+    AudioExecutor,
+    get_audio_executor,
+    configure_audio_executor,
+)
+from .stt_batcher import (
+    SttBatcher,
+    get_stt_batcher,
+    set_stt_batcher,
+    enable_stt_batching,
+)
 from .voice_to_text import (
     voice_to_text,
     voice_to_text_safe,
+    np_pcm_wav__to__text,
+    np_pcm_wav__to__text_safe,
+    np_pcm_wavs__to__texts_safe,
+)
+from .inference_server import InferenceServer
+from .remote_backends import (
+    InferenceClient,
+    RemoteSttBackend,
+    RemoteTtsBackend,
+    enable_remote_inference,
 )
@@ -1,30 +1,88 @@
-import audioop # FIXME: This is apparently deprecated and getting removed!!!
+"""
+soundfile, pydub and gTTS are imported inside the functions that use them:
+together they add seconds to `import twilio_phone_calls`, and the media path needs none of them.
+Resampling and normalization are NumPy-only (see `resample.py`).
+
+The `*_bytes` conversions keep WAV and MP3 in memory; the `*_filepath` ones are thin wrappers
+that read or write a file, for callers that have one.
+"""
 import base64
+import binascii
+import io
+import mmap
 from pathlib import Path
+from typing import Iterator
 
-import librosa
 import numpy as np
-import soundfile as sf
-from pywav import WavRead, WavWrite
-from pydub import AudioSegment
-from gtts import gTTS
 
-def twilio_mulaw_str__to__np_pcm_wav(twilio_audio_payload: str) -> np.ndarray:
+from .mulaw import mulaw_decode, mulaw_encode
+from .resample import normalize_peak, resample
+
+TWILIO_SAMPLE_RATE = 8000
+TWILIO_FRAME_SIZE = 160 # 20ms of 8kHz mulaw, the size of the frames Twilio sends us.
+
+_WAVE_FORMAT_MULAW = 7
+
+def twilio_mulaw_str__to__np_pcm_wav(twilio_audio_payload: str, dtype: type = np.int8) -> np.ndarray:
     """
     Twilio audio payloads are mulaw audio encoded as utf-8 strings.
-    Convert one of these to a numpy array of linear PCM WAV.
+    Convert one of these to a numpy array of linear PCM WAV
+    (8-bit by default; pass `np.int16` or `np.float32` to keep the full resolution).
     """
     audio_bytes_mulaw: bytes = base64.b64decode(twilio_audio_payload)
-    audio_bytes_linear_pcm_wav: bytes = audioop.ulaw2lin(audio_bytes_mulaw, 1)
-    return np.frombuffer(audio_bytes_linear_pcm_wav, dtype=np.int8)
+    return mulaw_decode(audio_bytes_mulaw, dtype=dtype)
+
+def twilio_mulaw_str__into__np_pcm_wav(twilio_audio_payload: str, out: np.ndarray) -> int:
+    """
+    Like `twilio_mulaw_str__to__np_pcm_wav`, but writes the samples into the start of `out`
+    (int8, int16 or float32, e.g. `AudioSampleBuffer.reserve`) and returns how many there are.
+    The decoded mulaw bytes are the only allocation: the standard library can't decode base64 in place.
+    """
+    audio_bytes_mulaw: bytes = binascii.a2b_base64(twilio_audio_payload)
+    size = len(audio_bytes_mulaw)
+    assert size <= len(out), f"Expected room for {size} samples, got {len(out)=}"
+    mulaw_decode(np.frombuffer(audio_bytes_mulaw, dtype=np.uint8), dtype=out.dtype, out=out[:size])
+    return size
+
+def twilio_mulaw_str__max_samples(twilio_audio_payload: str) -> int:
+    """
+    An upper bound on the samples in a payload, without decoding it.
+    """
+    return len(twilio_audio_payload) * 3 // 4
+
+def np_pcm_wav__to__mulaw_bytes(np_pcm_wav: np.ndarray) -> bytes:
+    """
+    Convert a numpy array of linear PCM WAV (int8, int16 or float in [-1, 1]) to raw mulaw bytes.
+    """
+    return mulaw_encode(np_pcm_wav).tobytes()
 
 def np_pcm_wav__to__twilio_mulaw_str(np_pcm_wav: np.ndarray) -> str:
     """
     Convert a numpy array of linear PCM WAV to a Twilio mulaw audio payload.
     """
-    audio_bytes_linear_pcm_wav: bytes = np_pcm_wav.tobytes()
-    audio_bytes_mulaw: bytes = audioop.lin2ulaw(audio_bytes_linear_pcm_wav, 1)
-    return base64.b64encode(audio_bytes_mulaw).decode("utf-8")
+    return mulaw_bytes__to__twilio_mulaw_str(np_pcm_wav__to__mulaw_bytes(np_pcm_wav))
+
+def mulaw_bytes__to__twilio_mulaw_str(mulaw_bytes: bytes) -> str:
+    return base64.b64encode(mulaw_bytes).decode("utf-8")
+
+def mulaw_bytes__to__twilio_mulaw_strs(mulaw_bytes: bytes | mmap.mmap, chunk_size: int) -> Iterator[str]:
+    """
+    Split mulaw audio into payloads of at most `chunk_size` bytes,
+    one per outgoing media message.
+    """
+    assert chunk_size > 0, f"Expected a positive chunk size, got {chunk_size=}"
+    mulaw_view = memoryview(mulaw_bytes)
+    for start in range(0, len(mulaw_view), chunk_size):
+        yield base64.b64encode(mulaw_view[start:start + chunk_size]).decode("utf-8")
+
+def np_pcm_wav__to__wav_bytes(np_pcm_wav: np.ndarray, sample_rate: int = 8000) -> bytes:
+    """
+    Peak-normalize a numpy array of linear PCM WAV and encode it as a 16-bit WAV file, in memory.
+    """
+    import soundfile as sf
+    wav_buffer = io.BytesIO()
+    sf.write(wav_buffer, normalize_peak(np_pcm_wav), sample_rate, format="WAV", subtype="PCM_16")
+    return wav_buffer.getvalue()
 
 def np_pcm_wav__to__wav_filepath(np_pcm_wav: np.ndarray, wav_path: str | Path) -> None:
     """
@@ -33,8 +91,39 @@ def np_pcm_wav__to__wav_filepath(np_pcm_wav: np.ndarray, wav_path: str | Path) -
     wav_path = Path(wav_path)
     assert wav_path.parent.exists(), f"Expected {wav_path.parent} to exist"
     assert wav_path.suffix == ".wav", f"Expected .wav file, got {wav_path}"
-    normalized_audio: np.ndarray = librosa.util.normalize(np_pcm_wav.astype(np.float32))
-    sf.write(str(wav_path), normalized_audio, 8000)
+    wav_path.write_bytes(np_pcm_wav__to__wav_bytes(np_pcm_wav))
+
+def np_pcm_wav__to__normalized_float32(
+    np_pcm_wav: np.ndarray,
+    sample_rate: int = 8000,
+    target_sample_rate: int = 16000,
+) -> np.ndarray:
+    """
+    Peak-normalize linear PCM WAV to float32 in [-1, 1] and resample it,
+    e.g. to the 16kHz that whisper expects. Nothing touches disk.
+    """
+    normalized_audio: np.ndarray = normalize_peak(np_pcm_wav)
+    if sample_rate != target_sample_rate:
+        normalized_audio = resample(normalized_audio, sample_rate, target_sample_rate)
+    return normalized_audio
+
+def np_pcm_wav__to__twilio_np_pcm_wav(np_pcm_wav: np.ndarray, sample_rate: int) -> np.ndarray:
+    """
+    Generated audio at any sample rate to what we send Twilio (before mulaw encoding):
+    8kHz, peak-normalized, 8-bit linear PCM WAV.
+    """
+    if sample_rate != TWILIO_SAMPLE_RATE:
+        np_pcm_wav = resample(np_pcm_wav, sample_rate, TWILIO_SAMPLE_RATE)
+    normalized_audio: np.ndarray = normalize_peak(np_pcm_wav)
+    return (normalized_audio * np.iinfo(np.int8).max).astype(np.int8)
+
+def wav_bytes__to__np_pcm_wav(wav_bytes: bytes) -> np.ndarray:
+    """
+    Decode a WAV file held in memory (any sample rate) into 8kHz 8-bit linear PCM WAV.
+    """
+    import soundfile as sf
+    audio_data, sample_rate = sf.read(io.BytesIO(wav_bytes), dtype="float32")
+    return np_pcm_wav__to__twilio_np_pcm_wav(audio_data, sample_rate)
 
 def wav_filepath__to__np_pcm_wav(wav_path: str | Path) -> np.ndarray:
     """
@@ -42,40 +131,85 @@ def wav_filepath__to__np_pcm_wav(wav_path: str | Path) -> np.ndarray:
     """
     wav_path = Path(wav_path)
     assert wav_path.exists(), f"Expected {wav_path} to exist"
-    # Read with original sample rate
-    audio_data, sample_rate = sf.read(str(wav_path))
-    # Resample to 8000 Hz if needed (Twilio's required rate)
-    if sample_rate != 8000:
-        audio_data = librosa.resample(audio_data, orig_sr=sample_rate, target_sr=8000)
-    # Normalize to [-1, 1] range first
-    audio_data = librosa.util.normalize(audio_data)
-    # Then scale to int8 range [-128, 127]
-    return (audio_data * np.iinfo(np.int8).max).astype(np.int8)
-
-def mulaw_filepath__to__np_pcm_wav(mulaw_path: str | Path) -> np.ndarray:
+    return wav_bytes__to__np_pcm_wav(wav_path.read_bytes())
+
+def mulaw_wav_bytes__to__mulaw_bytes(mulaw_wav_bytes: bytes) -> bytes:
+    """
+    The raw mulaw audio in a mulaw WAV file (Twilio's recording format), read from its RIFF chunks.
+    """
+    assert mulaw_wav_bytes[:4] == b"RIFF" and mulaw_wav_bytes[8:12] == b"WAVE", "Expected a WAV file"
+    wav_view = memoryview(mulaw_wav_bytes)
+    offset = 12
+    audio_format = None
+    while offset + 8 <= len(wav_view):
+        chunk_id = bytes(wav_view[offset:offset + 4])
+        chunk_size = int.from_bytes(wav_view[offset + 4:offset + 8], "little")
+        chunk = wav_view[offset + 8:offset + 8 + chunk_size]
+        if chunk_id == b"fmt ":
+            audio_format = int.from_bytes(chunk[:2], "little")
+        elif chunk_id == b"data":
+            assert audio_format == _WAVE_FORMAT_MULAW, f"Expected mulaw audio (format 7), got {audio_format=}"
+            return bytes(chunk)
+        offset += 8 + chunk_size + (chunk_size & 1) # Chunks are padded to an even size.
+    raise AssertionError("Expected a data chunk in the WAV file")
+
+def mulaw_bytes__to__mulaw_wav_bytes(mulaw_bytes: bytes, sample_rate: int = TWILIO_SAMPLE_RATE) -> bytes:
+    """
+    Wrap raw mono mulaw audio in a WAV file, in memory.
+    """
+    fmt_chunk = b"".join([
+        _WAVE_FORMAT_MULAW.to_bytes(2, "little"),
+        (1).to_bytes(2, "little"), # Channels.
+        sample_rate.to_bytes(4, "little"),
+        sample_rate.to_bytes(4, "little"), # Bytes per second.
+        (1).to_bytes(2, "little"), # Block align.
+        (8).to_bytes(2, "little"), # Bits per sample.
+        (0).to_bytes(2, "little"), # Extension size, required for non-PCM formats.
+    ])
+    padding = b"\0" * (len(mulaw_bytes) & 1)
+    chunks = b"".join([
+        b"fmt ", len(fmt_chunk).to_bytes(4, "little"), fmt_chunk,
+        b"fact", (4).to_bytes(4, "little"), len(mulaw_bytes).to_bytes(4, "little"), # Sample count, also for non-PCM.
+        b"data", len(mulaw_bytes).to_bytes(4, "little"), mulaw_bytes, padding,
+    ])
+    return b"RIFF" + (4 + len(chunks)).to_bytes(4, "little") + b"WAVE" + chunks
+
+def mulaw_filepath__to__np_pcm_wav(mulaw_path: str | Path, dtype: type = np.int8) -> np.ndarray:
     """
     Mulaw file is expected to be 8-bit mulaw format,
     which is how Twilio encodes audio.
     """
     assert Path(mulaw_path).exists(), f"Expected {mulaw_path} to exist"
-    wav_read = WavRead(str(mulaw_path))
-    audio_bytes = wav_read.getdata()
-    audio_bytes = audioop.ulaw2lin(audio_bytes, 1)
-    return np.frombuffer(audio_bytes, dtype=np.int8)
+    audio_bytes = mulaw_wav_bytes__to__mulaw_bytes(Path(mulaw_path).read_bytes())
+    return mulaw_decode(audio_bytes, dtype=dtype)
 
-def mp3_filepath__to__twilio_mulaw_str(mp3_path: str | Path) -> str:
+def mp3_bytes__to__mulaw_bytes(mp3_bytes: bytes) -> bytes:
+    """
+    Decode MP3 held in memory (pydub pipes it to ffmpeg) into 8kHz mulaw.
+    """
+    from pydub import AudioSegment
+    audio = AudioSegment.from_file(io.BytesIO(mp3_bytes), format="mp3")
+    audio = audio.set_frame_rate(8000).set_channels(1).set_sample_width(2)
+    return np_pcm_wav__to__mulaw_bytes(np.frombuffer(audio.raw_data, dtype="<i2"))
+
+def mp3_filepath__to__mulaw_bytes(mp3_path: str | Path) -> bytes:
     assert Path(mp3_path).exists(), f"Expected {mp3_path} to exist"
-    audio = AudioSegment.from_mp3(str(mp3_path))
-    audio: bytes = audio.set_frame_rate(8000).set_channels(1).set_sample_width(1)
-    mulaw_bytes: bytes = audioop.lin2ulaw(audio.raw_data, 1)
-    return base64.b64encode(mulaw_bytes).decode("utf-8")
+    return mp3_bytes__to__mulaw_bytes(Path(mp3_path).read_bytes())
+
+def mp3_filepath__to__twilio_mulaw_str(mp3_path: str | Path) -> str:
+    return mulaw_bytes__to__twilio_mulaw_str(mp3_filepath__to__mulaw_bytes(mp3_path))
+
+def text__to__mp3_bytes(text: str) -> bytes:
+    from gtts import gTTS
+    mp3_buffer = io.BytesIO()
+    gTTS(text=text, lang="en").write_to_fp(mp3_buffer)
+    return mp3_buffer.getvalue()
 
 def text__to__mp3(text: str, mp3_path: str | Path) -> None:
     mp3_path = Path(mp3_path)
     assert mp3_path.suffix == ".mp3", f"Expected .mp3 file, got {mp3_path}"
     assert mp3_path.parent.exists(), f"Expected {mp3_path.parent} to exist"
-    tts = gTTS(text=text, lang="en")
-    tts.save(str(mp3_path))
+    mp3_path.write_bytes(text__to__mp3_bytes(text))
 
 def twilio_mulaw_str__to__pcm_wav_filepath__duplicate(twilio_mulaw_str: str, pcm_wav_path: str | Path) -> None:
     """
@@ -85,6 +219,4 @@ def twilio_mulaw_str__to__pcm_wav_filepath__duplicate(twilio_mulaw_str: str, pcm
     assert pcm_wav_path.parent.exists(), f"Expected {pcm_wav_path.parent} to exist"
     assert pcm_wav_path.suffix == ".wav", f"Expected .wav file, got {pcm_wav_path}"
     audio_bytes_mulaw: bytes = base64.b64decode(twilio_mulaw_str)
-    wave_write = WavWrite(str(pcm_wav_path), 1, 8000, 8, 7)
-    wave_write.write(audio_bytes_mulaw)
-    wave_write.close()
+    pcm_wav_path.write_bytes(mulaw_bytes__to__mulaw_wav_bytes(audio_bytes_mulaw))
@@ -0,0 +1,200 @@
+import asyncio
+import collections
+import functools
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+
+class _Job:
+    def __init__(
+        self,
+        fn: Callable[..., Any],
+        args: tuple,
+        kwargs: dict,
+        loop: asyncio.AbstractEventLoop,
+    ):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.loop = loop
+        self.future: asyncio.Future = loop.create_future()
+
+class AudioExecutor:
+    """
+    Runs blocking audio work (speech-to-text, text-to-speech, conversions)
+    off the event loop, so one call's transcription doesn't stall
+    the media frames of every other call on the same worker.
+
+    Jobs are queued per call and handed to the pool round-robin across calls,
+    so a call with a backlog can't starve the others.
+    At most `max_queued_jobs` jobs wait at once; `run` waits for room beyond that.
+
+    With `use_processes=True` the functions and their arguments must be picklable,
+    and each worker process loads its own models.
+    """
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        max_queued_jobs: int = 64,
+        use_processes: bool = False,
+    ):
+        max_workers = max_workers or min(4, os.cpu_count() or 1)
+        assert max_workers > 0, f"Expected a positive number of workers, got {max_workers=}"
+        assert max_queued_jobs > 0, f"Expected a positive queue size, got {max_queued_jobs=}"
+        self.max_workers = max_workers
+        self.max_queued_jobs = max_queued_jobs
+        self._pool: Executor = ProcessPoolExecutor(max_workers) if use_processes \
+            else ThreadPoolExecutor(max_workers, thread_name_prefix="twilio_phone_calls_audio")
+        self._lock = threading.Lock()
+        self._queues: dict[str, collections.deque[_Job]] = {}
+        self._ready_call_keys: collections.deque[str] = collections.deque()
+        self._room_waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._queued = 0
+        self._running = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Jobs waiting for a worker.
+        """
+        return self._queued
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    async def run(self, call_key: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run `fn(*args, **kwargs)` in the pool on behalf of `call_key` (e.g. the stream sid)
+        and return its result.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                if self._queued < self.max_queued_jobs:
+                    job = _Job(fn, args, kwargs, loop)
+                    self._enqueue_locked(call_key, job)
+                    break
+                room: asyncio.Future = loop.create_future()
+                self._room_waiters.append((loop, room))
+            await room
+        self._dispatch()
+        try:
+            return await job.future
+        except asyncio.CancelledError:
+            self._discard(call_key, job)
+            raise
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
+
+    # Private.
+
+    def _enqueue_locked(self, call_key: str, job: _Job) -> None:
+        if call_key not in self._queues:
+            self._queues[call_key] = collections.deque()
+            self._ready_call_keys.append(call_key)
+        self._queues[call_key].append(job)
+        self._queued += 1
+
+    def _discard(self, call_key: str, job: _Job) -> None:
+        """
+        Drop a job whose caller stopped waiting, if it hasn't started yet.
+        """
+        with self._lock:
+            queue = self._queues.get(call_key)
+            if queue is None or job not in queue:
+                return
+            queue.remove(job)
+            if not queue:
+                del self._queues[call_key]
+                self._ready_call_keys.remove(call_key)
+            self._queued -= 1
+            self._wake_room_waiters_locked()
+
+    def _dispatch(self) -> None:
+        jobs: list[_Job] = []
+        with self._lock:
+            while self._running < self.max_workers and self._ready_call_keys:
+                call_key = self._ready_call_keys.popleft()
+                queue = self._queues[call_key]
+                jobs.append(queue.popleft())
+                if queue:
+                    self._ready_call_keys.append(call_key)
+                else:
+                    del self._queues[call_key]
+                self._queued -= 1
+                self._running += 1
+            if jobs:
+                self._wake_room_waiters_locked()
+        for job in jobs:
+            try:
+                pool_future = self._pool.submit(job.fn, *job.args, **job.kwargs)
+            except Exception as e:
+                pool_future = Future()
+                pool_future.set_exception(e)
+            pool_future.add_done_callback(functools.partial(self._on_job_done, job))
+
+    def _on_job_done(self, job: _Job, pool_future: Future) -> None:
+        with self._lock:
+            self._running -= 1
+        try:
+            job.loop.call_soon_threadsafe(_copy_result, pool_future, job.future)
+        except RuntimeError:
+            pass # The caller's event loop is closed; nobody is waiting.
+        self._dispatch()
+
+    def _wake_room_waiters_locked(self) -> None:
+        for loop, room in self._room_waiters:
+            try:
+                loop.call_soon_threadsafe(_set_result_if_pending, room, None)
+            except RuntimeError:
+                pass
+        self._room_waiters.clear()
+
+def _copy_result(pool_future: Future, future: asyncio.Future) -> None:
+    if future.done():
+        return
+    exception = pool_future.exception()
+    if exception is not None:
+        future.set_exception(exception)
+    else:
+        future.set_result(pool_future.result())
+
+def _set_result_if_pending(future: asyncio.Future, result: Any) -> None:
+    if not future.done():
+        future.set_result(result)
+
+_audio_executor: AudioExecutor | None = None
+_audio_executor_lock = threading.Lock()
+
+def get_audio_executor() -> AudioExecutor:
+    """
+    The process-wide executor, created with defaults on first use.
+    """
+    global _audio_executor
+    with _audio_executor_lock:
+        if _audio_executor is None:
+            _audio_executor = AudioExecutor()
+        return _audio_executor
+
+def configure_audio_executor(
+    max_workers: int | None = None,
+    max_queued_jobs: int = 64,
+    use_processes: bool = False,
+) -> AudioExecutor:
+    """
+    Replace the process-wide executor. Jobs already running on the old one finish.
+    """
+    global _audio_executor
+    with _audio_executor_lock:
+        previous_executor = _audio_executor
+        _audio_executor = AudioExecutor(
+            max_workers=max_workers,
+            max_queued_jobs=max_queued_jobs,
+            use_processes=use_processes,
+        )
+    if previous_executor is not None:
+        previous_executor.shutdown(wait=False)
+    return _audio_executor
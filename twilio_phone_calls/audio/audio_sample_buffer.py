@@ -1,25 +1,90 @@
 import numpy as np
 
+from .vad import EndpointingConfig, VoiceActivityDetector
+
 class AudioSampleBuffer:
     """
     Concat audio until a pause that denotes the sample is complete.
+
+    Audio is written into a preallocated array that doubles when full,
+    and the voice-activity state is updated incrementally as each chunk arrives,
+    so appending costs O(chunk) no matter how long the caller has been talking.
+    Frames can also be decoded straight into the buffer (`reserve`, then `commit`),
+    which together with the reused scratch arrays leaves only a few small objects
+    to allocate per frame (without a `vad`).
+
+    Without a `vad`, a sample is voiced if `abs(x) >= 8` (the original behavior).
+    With one, the detector decides per 20ms frame. Either way `endpointing` sets the thresholds.
     """
-    def __init__(self):
-        self._audio_buffer = np.empty(0, dtype=np.int8)
-        self._nonempty_threshold = 8
-        self._pause_size = 10000
-        self._min_total = 1000
-        self._padding = 1000
+    def __init__(
+        self,
+        initial_capacity: int = 8000 * 10,
+        vad: VoiceActivityDetector | None = None,
+        endpointing: EndpointingConfig | None = None,
+    ):
+        endpointing = endpointing or EndpointingConfig()
+        self._audio_buffer = np.empty(max(1, initial_capacity), dtype=np.int8)
+        self._size = 0
+        self._vad = vad
+        self._nonempty_threshold = np.int8(8) # A numpy scalar, so comparing doesn't convert it each time.
+        self._pause_size = endpointing.pause_samples
+        self._min_total = endpointing.min_speech_samples
+        self._padding = endpointing.padding_samples
+        # Running voice-activity state.
+        self._nonempty_total = 0
+        self._trailing_empty = 0
+        self._first_nonempty_index: int | None = None
+        self._last_nonempty_index: int | None = None
+        # Reused by `_update_state`, sized for the largest chunk so far.
+        self._magnitude_scratch = np.empty(0, dtype=np.int8)
+        self._not_empty_scratch = np.empty(0, dtype=bool)
+        self._is_nonempty_scratch = np.empty(0, dtype=bool)
+
+    def __len__(self) -> int:
+        return self._size
 
     def append(self, data: np.ndarray) -> None:
-        self._audio_buffer = np.concatenate([self._audio_buffer, data])
+        data_size = len(data)
+        if data_size == 0:
+            return
+        self.reserve(data_size)[:] = data
+        self.commit(data_size)
+
+    def append_silence(self, data_size: int) -> None:
+        """
+        Stand-in for audio that never arrived, so pauses are measured in media time.
+        """
+        if data_size == 0:
+            return
+        self.reserve(data_size)[:] = 0
+        self.commit(data_size)
+
+    def reserve(self, data_size: int) -> np.ndarray:
+        """
+        Room for `data_size` more samples, as a view to write them into
+        (e.g. with `twilio_mulaw_str__into__np_pcm_wav`). Then `commit` what was written.
+        """
+        self._reserve(data_size)
+        return self._audio_buffer[self._size:self._size + data_size]
+
+    def commit(self, data_size: int) -> None:
+        """
+        Append the first `data_size` samples written into the last `reserve`.
+        """
+        assert self._size + data_size <= len(self._audio_buffer), \
+            f"Expected {data_size=} to fit what was reserved"
+        if data_size == 0:
+            return
+        self._update_state(self._audio_buffer[self._size:self._size + data_size], offset=self._size)
+        self._size += data_size
 
     def count_trailing_empty_audio(self) -> int:
-        not_empty = np.abs(self._audio_buffer) >= self._nonempty_threshold
-        return int(np.argmax(not_empty[::-1]))
+        if self._nonempty_total == 0:
+            return 0
+        return self._trailing_empty
 
     def nonempty_total(self) -> int:
-        return int(np.sum(np.abs(self._audio_buffer) >= self._nonempty_threshold))
+        return self._nonempty_total
 
     def check_has_started(self) -> bool:
         return self.nonempty_total() >= self._min_total
@@ -28,17 +93,78 @@ class AudioSampleBuffer:
         return self.check_has_started() and \
             self.count_trailing_empty_audio() >= self._pause_size
 
-    def crop_audio(self) -> np.ndarray:
+    @property
+    def audio(self) -> np.ndarray:
+        """
+        Everything appended so far, as a view. Appending never changes
+        samples already in the view (growing copies to a new array).
+        """
+        return self._audio_buffer[:self._size]
+
+    def crop_bounds(self) -> tuple[int, int]:
         starting_index = max(0, self.first_nonempty_index - self._padding)
-        ending_index = min(len(self._audio_buffer), self.last_nonempty_index + self._padding)
+        ending_index = min(self._size, self.last_nonempty_index + self._padding)
+        return starting_index, ending_index
+
+    def crop_audio(self) -> np.ndarray:
+        """
+        Returns a view into the buffer (no copy).
+        """
+        starting_index, ending_index = self.crop_bounds()
         return self._audio_buffer[starting_index:ending_index]
 
     @property
     def first_nonempty_index(self) -> int:
-        is_nonempty = np.abs(self._audio_buffer) > self._nonempty_threshold
-        return int(np.argmax(is_nonempty))
+        if self._first_nonempty_index is None:
+            return 0
+        return self._first_nonempty_index
 
     @property
     def last_nonempty_index(self) -> int:
-        is_nonempty = np.abs(self._audio_buffer) > self._nonempty_threshold
-        return int(len(self._audio_buffer) - np.argmax(is_nonempty[::-1]))
+        """
+        Exclusive: one past the last nonempty sample (`len(self)` if there are none).
+        """
+        if self._last_nonempty_index is None:
+            return self._size
+        return self._last_nonempty_index
+
+    # Private.
+
+    def _reserve(self, data_size: int) -> None:
+        required = self._size + data_size
+        if required <= len(self._audio_buffer):
+            return
+        capacity = len(self._audio_buffer)
+        while capacity < required:
+            capacity *= 2
+        grown = np.empty(capacity, dtype=np.int8)
+        grown[:self._size] = self._audio_buffer[:self._size]
+        self._audio_buffer = grown
+
+    def _update_state(self, chunk: np.ndarray, offset: int) -> None:
+        """
+        Without a VAD the thresholds differ on purpose: the counters use `>=`
+        while the crop indices use `>`.
+        """
+        if self._vad is not None:
+            not_empty = is_nonempty = self._vad.voiced_mask(chunk)
+        else:
+            chunk_size = len(chunk)
+            if len(self._magnitude_scratch) < chunk_size:
+                self._magnitude_scratch = np.empty(chunk_size, dtype=np.int8)
+                self._not_empty_scratch = np.empty(chunk_size, dtype=bool)
+                self._is_nonempty_scratch = np.empty(chunk_size, dtype=bool)
+            magnitude = np.abs(chunk, out=self._magnitude_scratch[:chunk_size])
+            not_empty = np.greater_equal(magnitude, self._nonempty_threshold, out=self._not_empty_scratch[:chunk_size])
+            is_nonempty = np.greater(magnitude, self._nonempty_threshold, out=self._is_nonempty_scratch[:chunk_size])
+        not_empty_count = int(np.count_nonzero(not_empty))
+        if not_empty_count == 0:
+            self._trailing_empty += len(chunk)
+        else:
+            self._nonempty_total += not_empty_count
+            self._trailing_empty = int(np.argmax(not_empty[::-1]))
+
+        if np.count_nonzero(is_nonempty):
+            if self._first_nonempty_index is None:
+                self._first_nonempty_index = offset + int(np.argmax(is_nonempty))
+            self._last_nonempty_index = offset + len(chunk) - int(np.argmax(is_nonempty[::-1]))
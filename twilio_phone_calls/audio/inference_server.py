@@ -0,0 +1,242 @@
+"""
+A process that holds one model (speech-to-text or text-to-speech) for any number of
+call-handling processes, so each of them doesn't load its own copy.
+Clients connect over a Unix socket or TCP (see `remote_backends.py`).
+
+    python -m twilio_phone_calls.audio.inference_server stt [--address unix:/tmp/twilio_phone_calls_stt.sock]
+    python -m twilio_phone_calls.audio.inference_server tts [--address 127.0.0.1:7002]
+
+Every message is a JSON header and a binary body, each prefixed by its length.
+Requests carry an `id`, echoed in the response, so a connection can have many in flight.
+Requests from every connection are batched together (`SttBatcher` / `TtsBatcher`).
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import struct
+from pathlib import Path
+
+import numpy as np
+
+from .audio_executor import AudioExecutor, get_audio_executor
+from .stt_batcher import SttBatcher
+from .tts_batcher import TtsBatcher
+
+_LENGTHS = struct.Struct("!II") # Header length, body length.
+_DTYPES = {"int8", "int16", "float32"} # What an utterance can be sent as.
+MODELS = ("stt", "tts")
+
+logger = logging.getLogger(__name__)
+
+def default_address(model: str) -> str:
+    return f"unix:/tmp/twilio_phone_calls_{model}.sock"
+
+def parse_address(address: str) -> tuple[str, str | tuple[str, int]]:
+    """
+    "unix:/path/to.sock" or "host:port" -> ("unix", path) or ("tcp", (host, port)).
+    """
+    if address.startswith("unix:"):
+        return "unix", address[len("unix:"):]
+    host, _, port = address.rpartition(":")
+    assert host and port.isdigit(), f"Expected unix:<path> or <host>:<port>, got {address=}"
+    return "tcp", (host, int(port))
+
+def encode_message(header: dict, body: bytes = b"") -> bytes:
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    return b"".join([_LENGTHS.pack(len(header_bytes), len(body)), header_bytes, body])
+
+async def read_message(reader: asyncio.StreamReader) -> tuple[dict, bytes]:
+    header_length, body_length = _LENGTHS.unpack(await reader.readexactly(_LENGTHS.size))
+    header = json.loads(await reader.readexactly(header_length))
+    return header, await reader.readexactly(body_length)
+
+def recv_message(sock: socket.socket) -> tuple[dict, bytes]:
+    """
+    `read_message` for a blocking socket.
+    """
+    header_length, body_length = _LENGTHS.unpack(_recv_exactly(sock, _LENGTHS.size))
+    header = json.loads(_recv_exactly(sock, header_length))
+    return header, _recv_exactly(sock, body_length)
+
+def np_pcm_wavs__to__message_body(np_pcm_wavs: list[np.ndarray]) -> tuple[dict, bytes]:
+    """
+    Utterances as one body (in a dtype both sides know), and what the header needs to split them again.
+    """
+    dtype = str(np_pcm_wavs[0].dtype) if np_pcm_wavs else "float32"
+    if dtype not in _DTYPES or any(str(np_pcm_wav.dtype) != dtype for np_pcm_wav in np_pcm_wavs):
+        dtype = "float32"
+    arrays = [np.ascontiguousarray(np_pcm_wav, dtype=dtype) for np_pcm_wav in np_pcm_wavs]
+    return {"dtype": dtype, "lengths": [len(array) for array in arrays]}, b"".join(array.tobytes() for array in arrays)
+
+def message_body__to__np_pcm_wavs(header: dict, body: bytes) -> list[np.ndarray]:
+    assert header["dtype"] in _DTYPES, f"Unexpected {header['dtype']=}"
+    samples = np.frombuffer(body, dtype=header["dtype"])
+    ends = np.cumsum(header["lengths"], dtype=np.int64)
+    assert len(samples) == (ends[-1] if len(ends) else 0), "Expected the lengths to add up to the body"
+    return np.split(samples, ends[:-1]) if len(ends) else []
+
+class InferenceServer:
+    """
+    Serves `model` ("stt" or "tts") with the process-wide backend, batching the requests
+    of every connected process together (a batch runs once `max_batch_size` items are waiting,
+    or `max_wait_ms` after the first).
+    """
+    def __init__(
+        self,
+        model: str,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10,
+        audio_executor: AudioExecutor | None = None,
+    ):
+        assert model in MODELS, f"Expected one of {MODELS}, got {model=}"
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._audio_executor = audio_executor or get_audio_executor()
+        self._stt_batchers: dict[int, SttBatcher] = {} # By sample rate.
+        self._tts_batcher: TtsBatcher | None = None
+        self.served_requests = 0
+
+    async def start(self, address: str) -> asyncio.AbstractServer:
+        """
+        Start listening (a stale Unix socket file is replaced).
+        `address` is "unix:<path>" or "<host>:<port>" (port 0 picks a free one).
+        """
+        _, location = parse_address(address)
+        if isinstance(location, str): # A Unix socket path.
+            Path(location).unlink(missing_ok=True)
+            return await asyncio.start_unix_server(self._handle_connection, path=location)
+        host, port = location
+        return await asyncio.start_server(self._handle_connection, host=host, port=port)
+
+    async def handle_request(self, header: dict, body: bytes) -> tuple[dict, bytes]:
+        method = header.get("method")
+        if method == "info":
+            return self._info(), b""
+        if method == "transcribe_batch" and self.model == "stt":
+            stt_batcher = self._get_stt_batcher(int(header.get("sample_rate", 8000)))
+            texts = await asyncio.gather(*[
+                stt_batcher.transcribe(np_pcm_wav)
+                for np_pcm_wav in message_body__to__np_pcm_wavs(header, body)
+            ])
+            return {"texts": list(texts)}, b""
+        if method == "synthesize_batch" and self.model == "tts":
+            tts_batcher = self._get_tts_batcher()
+            mulaw_bytes = await asyncio.gather(*[
+                tts_batcher.synthesize(text) for text in header["texts"]
+            ])
+            return {"lengths": [len(clip) for clip in mulaw_bytes]}, b"".join(mulaw_bytes)
+        raise ValueError(f"The {self.model} server doesn't serve {method=}")
+
+    # Private.
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        request_tasks: set[asyncio.Task] = set()
+        try:
+            while True:
+                try:
+                    header, body = await read_message(reader)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break # The client went away.
+                request_task = asyncio.create_task(self._respond(header, body, writer))
+                request_tasks.add(request_task)
+                request_task.add_done_callback(request_tasks.discard)
+        finally:
+            for request_task in list(request_tasks):
+                request_task.cancel()
+            writer.close()
+
+    async def _respond(self, header: dict, body: bytes, writer: asyncio.StreamWriter) -> None:
+        response_header: dict
+        try:
+            response_header, response_body = await self.handle_request(header, body)
+        except Exception as e:
+            response_header, response_body = {"error": f"{type(e).__name__}: {e}"}, b""
+        response_header["id"] = header.get("id")
+        self.served_requests += 1
+        writer.write(encode_message(response_header, response_body)) # One write per message: they don't interleave.
+        await writer.drain()
+
+    def _info(self) -> dict:
+        if self.model == "stt":
+            from .stt_engine import get_stt_backend
+            return {"model": "stt", "name": type(get_stt_backend()).__name__}
+        from .tts_engine import get_tts_backend
+        tts_backend = get_tts_backend()
+        return {"model": "tts", "name": tts_backend.name, "language": tts_backend.language, "speaker": tts_backend.speaker}
+
+    def _get_stt_batcher(self, sample_rate: int) -> SttBatcher:
+        if sample_rate not in self._stt_batchers:
+            self._stt_batchers[sample_rate] = SttBatcher(
+                max_batch_size=self.max_batch_size,
+                max_wait_ms=self.max_wait_ms,
+                audio_executor=self._audio_executor,
+                sample_rate=sample_rate,
+                safe=False, # Raw transcripts and errors go back to the caller, which applies the fallback.
+            )
+        return self._stt_batchers[sample_rate]
+
+    def _get_tts_batcher(self) -> TtsBatcher:
+        if self._tts_batcher is None:
+            self._tts_batcher = TtsBatcher(
+                max_batch_size=self.max_batch_size,
+                max_wait_ms=self.max_wait_ms,
+                audio_executor=self._audio_executor,
+            )
+        return self._tts_batcher
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            raise ConnectionError("The inference server closed the connection")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve one speech model to the call-handling processes.")
+    parser.add_argument("model", choices=MODELS)
+    parser.add_argument("--address", help="unix:<path> or <host>:<port> (default: a Unix socket in /tmp).")
+    parser.add_argument("--max-batch-size", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=float, default=10)
+    parser.add_argument("--workers", type=int, default=1, help="Batches run at once (they share the model).")
+    parser.add_argument("--whisper-model", default="base", help="stt only.")
+    parser.add_argument("--tts-backend", choices=["default", "coqui", "gtts", "tone"], default="default", help="tts only.")
+    parser.add_argument("--device", default="cuda", help="coqui only.")
+    args = parser.parse_args()
+    address = args.address or default_address(args.model)
+
+    from ..call_logging import enable_call_logging
+    enable_call_logging()
+    from ..preload import preload
+    if args.model == "stt":
+        from .stt_engine import WhisperSttBackend, set_stt_backend
+        set_stt_backend(WhisperSttBackend(args.whisper_model))
+    elif args.tts_backend != "default":
+        from .tts_engine import CoquiTtsBackend, GttsTtsBackend, ToneTtsBackend, set_tts_backend
+        set_tts_backend({"coqui": lambda: CoquiTtsBackend(args.device), "gtts": GttsTtsBackend, "tone": ToneTtsBackend}[args.tts_backend]())
+    preload(stt=args.model == "stt", tts=args.model == "tts")
+
+    async def serve() -> None:
+        server = InferenceServer(
+            args.model,
+            max_batch_size=args.max_batch_size,
+            max_wait_ms=args.max_wait_ms,
+            audio_executor=AudioExecutor(max_workers=args.workers),
+        )
+        async with await server.start(address) as listener:
+            logger.info("Serving %s on %s (pid %d).", args.model, address, os.getpid())
+            await listener.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
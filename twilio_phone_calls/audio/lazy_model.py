@@ -0,0 +1,30 @@
+import threading
+from typing import Callable, Generic, TypeVar
+
+ModelT = TypeVar("ModelT")
+
+class LazyModel(Generic[ModelT]):
+    """
+    Loads a model on first use, exactly once, even when several threads ask at the same time.
+    Call `preload()` to pay the cost up front (e.g. when a server starts).
+    """
+    def __init__(self, loader: Callable[[], ModelT]):
+        self._loader = loader
+        self._model: ModelT | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    def get(self) -> ModelT:
+        model = self._model
+        if model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._loader()
+                model = self._model
+        return model
+
+    def preload(self) -> None:
+        self.get()
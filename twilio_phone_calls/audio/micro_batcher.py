@@ -0,0 +1,94 @@
+import asyncio
+from typing import Any, Callable, Generic, TypeVar
+
+from .audio_executor import AudioExecutor, get_audio_executor
+
+Item = TypeVar("Item")
+Result = TypeVar("Result")
+
+class _PendingItem:
+    def __init__(self, item: Any, loop: asyncio.AbstractEventLoop):
+        self.item = item
+        self.future: asyncio.Future = loop.create_future()
+
+class MicroBatcher(Generic[Item, Result]):
+    """
+    Collects the requests that calls make at about the same time and runs them together:
+    `batch_fn(items)` returns one result per item, in order, and runs on `audio_executor`
+    like any other audio job (so it should be a plain, picklable function).
+
+    A batch goes out once it has `max_batch_size` items, or `max_wait_ms` after
+    its first one arrived, whichever comes first: `max_wait_ms` bounds the latency added.
+    Up to `max_workers` batches can be in flight. Use it from one event loop.
+    """
+    def __init__(
+        self,
+        batch_fn: Callable[[list[Item]], list[Result]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10,
+        audio_executor: AudioExecutor | None = None,
+        call_key: str = "micro_batcher",
+    ):
+        assert max_batch_size > 0, f"Expected a positive batch size, got {max_batch_size=}"
+        assert max_wait_ms >= 0, f"Expected a non-negative wait, got {max_wait_ms=}"
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._batch_fn = batch_fn
+        self._audio_executor = audio_executor or get_audio_executor()
+        self._call_key = call_key # What the batches run as on the executor.
+        self._pending: list[_PendingItem] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._batch_tasks: set[asyncio.Task] = set()
+        self.batch_sizes: list[int] = []
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def submit(self, item: Item) -> Result:
+        loop = asyncio.get_running_loop()
+        pending_item = _PendingItem(item, loop)
+        self._pending.append(pending_item)
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait_ms / 1000, self._flush)
+        try:
+            return await pending_item.future
+        except asyncio.CancelledError:
+            if pending_item in self._pending: # Not sent yet: leave it out of the batch.
+                self._pending.remove(pending_item)
+            raise
+
+    # Private.
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending[:self.max_batch_size], self._pending[self.max_batch_size:]
+        batch_task = asyncio.create_task(self._run_batch(batch))
+        self._batch_tasks.add(batch_task)
+        batch_task.add_done_callback(self._batch_tasks.discard)
+        if self._pending:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.max_wait_ms / 1000, self._flush)
+
+    async def _run_batch(self, batch: list[_PendingItem]) -> None:
+        self.batch_sizes.append(len(batch))
+        try:
+            results: list = await self._audio_executor.run(
+                self._call_key,
+                self._batch_fn,
+                [pending_item.item for pending_item in batch],
+            )
+            assert len(results) == len(batch), f"Expected {len(batch)} results, got {len(results)}"
+        except Exception as e:
+            for pending_item in batch:
+                if not pending_item.future.done():
+                    pending_item.future.set_exception(e)
+            return
+        for pending_item, result in zip(batch, results):
+            if not pending_item.future.done():
+                pending_item.future.set_result(result)
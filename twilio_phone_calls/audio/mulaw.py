@@ -0,0 +1,95 @@
+"""
+Vectorized G.711 mu-law codec (a drop-in for `audioop.ulaw2lin`/`audioop.lin2ulaw`,
+which are removed in Python 3.13).
+
+Decoding is a 256-entry table lookup and encoding is a 65536-entry lookup
+indexed by the 16-bit sample, so both are a single `ndarray.take`.
+Pass `out=` to write into a caller-provided buffer without allocating.
+Indices always fit the table, so `take` runs with mode="clip": with the default
+mode="raise", numpy buffers `out=` through a temporary array. `take` also converts
+its indices to intp; for frame-sized decodes into `out=` they are converted into
+a reused per-thread array instead.
+"""
+import threading
+
+import numpy as np
+
+_BIAS = 0x84
+_CLIP = 8159 # Largest 14-bit magnitude mu-law can represent (before the bias).
+
+def _build_mulaw_to_int16() -> np.ndarray:
+    u_val = ~np.arange(256, dtype=np.int32) & 0xFF
+    t = ((u_val & 0x0F) << 3) + _BIAS
+    t <<= (u_val & 0x70) >> 4
+    return np.where(u_val & 0x80, _BIAS - t, t - _BIAS).astype(np.int16)
+
+def _build_int16_to_mulaw() -> np.ndarray:
+    """
+    Indexed by the int16 sample viewed as uint16.
+    """
+    pcm_val = np.arange(65536, dtype=np.uint16).view(np.int16).astype(np.int32) >> 2 # 14-bit.
+    mask = np.where(pcm_val < 0, 0x7F, 0xFF)
+    magnitude = np.minimum(np.abs(pcm_val), _CLIP) + (_BIAS >> 2)
+    segment_ends = np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF])
+    segment = np.searchsorted(segment_ends, magnitude)
+    u_val = (segment << 4) | ((magnitude >> (segment + 1)) & 0x0F)
+    u_val = np.where(segment >= 8, 0x7F, u_val) # Out of range: the maximum value.
+    return (u_val ^ mask).astype(np.uint8)
+
+MULAW_TO_INT16: np.ndarray = _build_mulaw_to_int16()
+MULAW_TO_INT8: np.ndarray = (MULAW_TO_INT16 >> 8).astype(np.int8)
+MULAW_TO_FLOAT32: np.ndarray = (MULAW_TO_INT16 / 32768).astype(np.float32)
+INT16_TO_MULAW: np.ndarray = _build_int16_to_mulaw()
+INT8_TO_MULAW: np.ndarray = INT16_TO_MULAW[(np.arange(256, dtype=np.uint8).view(np.int8).astype(np.int16) << 8).view(np.uint16)]
+
+_DECODE_TABLES: dict[type | np.dtype, np.ndarray] = {
+    np.int16: MULAW_TO_INT16,
+    np.int8: MULAW_TO_INT8,
+    np.float32: MULAW_TO_FLOAT32,
+}
+_DECODE_TABLES.update({np.dtype(dtype): table for dtype, table in list(_DECODE_TABLES.items())})
+
+_MAX_SCRATCH_INDICES = 8000 # One second; bigger decodes aren't on the per-frame path.
+_scratch = threading.local()
+
+def mulaw_decode(
+    mulaw: bytes | bytearray | memoryview | np.ndarray,
+    dtype: type | np.dtype = np.int16,
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Decode mu-law bytes to linear PCM: int16, int8 (same as `audioop.ulaw2lin(x, 1)`)
+    or float32 in [-1, 1).
+    """
+    table = _DECODE_TABLES.get(dtype)
+    assert table is not None, f"Expected one of int8, int16 or float32, got {dtype=}"
+    mulaw_u8 = mulaw if isinstance(mulaw, np.ndarray) else np.frombuffer(mulaw, dtype=np.uint8)
+    assert mulaw_u8.dtype == np.uint8, f"Expected uint8 mu-law, got {mulaw_u8.dtype=}"
+    if out is not None:
+        assert out.dtype == table.dtype, f"Expected {out.dtype=} to be {table.dtype}"
+        if len(mulaw_u8) <= _MAX_SCRATCH_INDICES:
+            return table.take(_scratch_indices(mulaw_u8), out=out, mode="clip")
+    return table.take(mulaw_u8, out=out, mode="clip")
+
+def mulaw_encode(np_pcm_wav: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    """
+    Encode linear PCM (int8, int16, or float in [-1, 1]) to mu-law bytes as a uint8 array.
+    int8 and int16 match `audioop.lin2ulaw` with width 1 and 2.
+    """
+    if out is not None:
+        assert out.dtype == np.uint8, f"Expected uint8 output, got {out.dtype=}"
+    if np_pcm_wav.dtype == np.int8:
+        return INT8_TO_MULAW.take(np_pcm_wav.view(np.uint8), out=out, mode="clip")
+    if np_pcm_wav.dtype == np.int16:
+        return INT16_TO_MULAW.take(np_pcm_wav.view(np.uint16), out=out, mode="clip")
+    assert np.issubdtype(np_pcm_wav.dtype, np.floating), f"Unsupported dtype {np_pcm_wav.dtype=}"
+    np_pcm_int16 = np.clip(np.rint(np_pcm_wav * 32768), -32768, 32767).astype(np.int16)
+    return INT16_TO_MULAW.take(np_pcm_int16.view(np.uint16), out=out, mode="clip")
+
+def _scratch_indices(mulaw_u8: np.ndarray) -> np.ndarray:
+    indices: np.ndarray | None = getattr(_scratch, "indices", None)
+    if indices is None:
+        indices = _scratch.indices = np.empty(_MAX_SCRATCH_INDICES, dtype=np.intp)
+    indices = indices[:len(mulaw_u8)]
+    np.copyto(indices, mulaw_u8)
+    return indices
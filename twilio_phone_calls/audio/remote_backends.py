@@ -0,0 +1,162 @@
+import itertools
+import socket
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+
+from .inference_server import (
+    default_address,
+    encode_message,
+    np_pcm_wavs__to__message_body,
+    parse_address,
+    recv_message,
+)
+from .stt_engine import SttBackend, set_stt_backend
+from .tts_engine import TtsBackend, set_tts_backend
+
+class InferenceClient:
+    """
+    One connection to an `InferenceServer`, shared by every thread in the process
+    (e.g. the audio executor's workers): requests are tagged with an id and a reader thread
+    hands each response to whoever is waiting for it, so many can be in flight at once.
+    Connects on first use, and again after the connection drops.
+    """
+    def __init__(self, address: str, timeout_seconds: float = 60):
+        self.address = address
+        self.timeout_seconds = timeout_seconds
+        self._lock = threading.Lock()
+        self._socket: socket.socket | None = None
+        self._pending: dict[int, Future] = {}
+        self._request_ids = itertools.count(1)
+
+    def request(self, header: dict, body: bytes = b"") -> tuple[dict, bytes]:
+        """
+        Send one request and wait for its response (raises if the server reports an error).
+        """
+        response_future: Future = Future()
+        with self._lock:
+            sock = self._connect_locked()
+            request_id = next(self._request_ids)
+            self._pending[request_id] = response_future
+            try:
+                sock.sendall(encode_message({**header, "id": request_id}, body))
+            except OSError as e:
+                self._disconnect_locked(sock, e)
+                raise
+        try:
+            response_header, response_body = response_future.result(timeout=self.timeout_seconds)
+        finally:
+            with self._lock:
+                self._pending.pop(request_id, None)
+        if "error" in response_header:
+            raise RuntimeError(f"Inference server at {self.address}: {response_header['error']}")
+        return response_header, response_body
+
+    def close(self) -> None:
+        with self._lock:
+            if self._socket is not None:
+                self._disconnect_locked(self._socket, ConnectionError("Closed"))
+
+    # Private.
+
+    def _connect_locked(self) -> socket.socket:
+        if self._socket is None:
+            kind, location = parse_address(self.address)
+            sock = socket.socket(socket.AF_UNIX if kind == "unix" else socket.AF_INET, socket.SOCK_STREAM)
+            sock.connect(location)
+            if kind == "tcp":
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._socket = sock
+            threading.Thread(target=self._read_responses, args=(sock,), daemon=True).start()
+        return self._socket
+
+    def _disconnect_locked(self, sock: socket.socket, error: Exception) -> None:
+        """
+        Fail whatever was waiting on `sock`; the next request reconnects.
+        """
+        if self._socket is sock:
+            self._socket = None
+            for response_future in self._pending.values():
+                if not response_future.done():
+                    response_future.set_exception(error)
+            self._pending.clear()
+        try:
+            sock.shutdown(socket.SHUT_RDWR) # Wakes the reader thread, and tells the server.
+        except OSError:
+            pass # Already disconnected.
+        sock.close()
+
+    def _read_responses(self, sock: socket.socket) -> None:
+        try:
+            while True:
+                header, body = recv_message(sock)
+                with self._lock:
+                    response_future = self._pending.pop(header.get("id", 0), None) # Ids start at 1.
+                if response_future is not None and not response_future.done():
+                    response_future.set_result((header, body))
+        except OSError as e:
+            with self._lock:
+                self._disconnect_locked(sock, e)
+
+class RemoteSttBackend(SttBackend):
+    """
+    Speech-to-text on an inference server (`python -m twilio_phone_calls.audio.inference_server stt`),
+    so call-handling processes don't each load Whisper.
+    """
+    def __init__(self, address: str = default_address("stt"), timeout_seconds: float = 60):
+        self._client = InferenceClient(address, timeout_seconds=timeout_seconds)
+
+    def load(self) -> None:
+        """
+        Nothing to load here; checks that the server is up.
+        """
+        self._client.request({"method": "info"})
+
+    def transcribe(self, np_pcm_wav: np.ndarray, sample_rate: int = 8000) -> str:
+        return self.transcribe_batch([np_pcm_wav], sample_rate=sample_rate)[0]
+
+    def transcribe_batch(self, np_pcm_wavs: list[np.ndarray], sample_rate: int = 8000) -> list[str]:
+        body_header, body = np_pcm_wavs__to__message_body(np_pcm_wavs)
+        response_header, _ = self._client.request(
+            {"method": "transcribe_batch", "sample_rate": sample_rate, **body_header},
+            body,
+        )
+        return response_header["texts"]
+
+class RemoteTtsBackend(TtsBackend):
+    """
+    Text-to-speech on an inference server (`python -m twilio_phone_calls.audio.inference_server tts`),
+    so call-handling processes don't each load XTTS. `load()` takes the voice's name and speaker
+    from the server, so cached sentences aren't mixed up with another voice's.
+    """
+    name = "remote"
+
+    def __init__(self, address: str = default_address("tts"), timeout_seconds: float = 60):
+        self._client = InferenceClient(address, timeout_seconds=timeout_seconds)
+
+    def load(self) -> None:
+        info, _ = self._client.request({"method": "info"})
+        self.name = f"remote:{info['name']}"
+        self.language = info["language"]
+        self.speaker = info["speaker"]
+
+    def text__to__mulaw_bytes(self, text: str) -> bytes:
+        return self.texts__to__mulaw_bytes([text])[0]
+
+    def texts__to__mulaw_bytes(self, texts: list[str]) -> list[bytes]:
+        response_header, body = self._client.request({"method": "synthesize_batch", "texts": texts})
+        ends = itertools.accumulate(response_header["lengths"])
+        return [body[end - length:end] for end, length in zip(ends, response_header["lengths"])]
+
+def enable_remote_inference(stt_address: str | None = None, tts_address: str | None = None) -> None:
+    """
+    Install remote backends process-wide (None leaves that model local), e.g. in each
+    uvicorn worker, with one inference server per model on the same box.
+    """
+    if stt_address is not None:
+        set_stt_backend(RemoteSttBackend(stt_address))
+    if tts_address is not None:
+        tts_backend = RemoteTtsBackend(tts_address)
+        tts_backend.load()
+        set_tts_backend(tts_backend)
@@ -0,0 +1,185 @@
+"""
+NumPy-only resampling and gain normalization, in place of librosa.
+Both work on chunks as they arrive (e.g. TTS output as it's generated),
+and give the same result as processing the whole signal at once.
+"""
+import math
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .mulaw import mulaw_encode
+
+def design_lowpass_filter(up: int, down: int, half_width: int = 16, kaiser_beta: float = 8.0) -> np.ndarray:
+    """
+    Kaiser-windowed sinc low-pass for resampling by `up / down`, at the upsampled rate:
+    cut off at the lower of the two Nyquist frequencies, with unity gain after upsampling.
+    `half_width` zero crossings on each side (of the lower rate).
+    """
+    max_rate = max(up, down)
+    tap_count = 2 * half_width * max_rate + 1
+    times = (np.arange(tap_count) - (tap_count - 1) / 2) / max_rate
+    return np.sinc(times) * np.kaiser(tap_count, kaiser_beta) * up / max_rate
+
+class PolyphaseResampler:
+    """
+    Resamples by the rational ratio `target_sample_rate / orig_sample_rate` (e.g. 24kHz XTTS to 8kHz,
+    or 8kHz to the 16kHz that whisper expects), computing only the output samples:
+    each one is a dot product of the recent input with one phase of the low-pass filter.
+
+    Feed chunks of any size to `process`, then `flush` for the tail. Output sample `n`
+    is at input time `n / target_sample_rate` (no delay), and there are
+    `ceil(len(input) * target_sample_rate / orig_sample_rate)` of them overall.
+    """
+    def __init__(self, orig_sample_rate: int, target_sample_rate: int, half_width: int = 16, kaiser_beta: float = 8.0):
+        assert orig_sample_rate > 0 and target_sample_rate > 0, \
+            f"Expected positive sample rates, got {orig_sample_rate=} and {target_sample_rate=}"
+        divisor = math.gcd(orig_sample_rate, target_sample_rate)
+        self.up = target_sample_rate // divisor
+        self.down = orig_sample_rate // divisor
+        lowpass_filter = design_lowpass_filter(self.up, self.down, half_width, kaiser_beta)
+        self._center = (len(lowpass_filter) - 1) // 2 # The filter delay, at the upsampled rate.
+        self._taps_per_phase = -(-len(lowpass_filter) // self.up)
+        padded_filter = np.zeros(self._taps_per_phase * self.up)
+        padded_filter[:len(lowpass_filter)] = lowpass_filter
+        # `_phases[p, i]` weighs input `t // up - i` for the output at upsampled time `t`, where `p = t % up`.
+        self._phases = padded_filter.reshape(self._taps_per_phase, self.up).T.astype(np.float32)
+        self._reset()
+
+    def process(self, chunk: np.ndarray) -> np.ndarray:
+        """
+        The float32 output samples that `chunk` completes (the filter looks a few samples ahead,
+        so the last few wait for the next chunk).
+        """
+        self._input_count += len(chunk)
+        return self._emit(np.asarray(chunk, dtype=np.float32), self._input_count)
+
+    def flush(self) -> np.ndarray:
+        """
+        The remaining output, treating what comes after the input as silence.
+        The resampler can be reused afterwards for a new signal.
+        """
+        remaining_count = -(-self._input_count * self.up // self.down) - self._output_count
+        lookahead = self._center // self.up + 1
+        output = self._emit(np.zeros(lookahead, dtype=np.float32), self._input_count + lookahead)
+        self._reset()
+        return output[:max(0, remaining_count)]
+
+    # Private.
+
+    def _reset(self) -> None:
+        self._history = np.zeros(self._taps_per_phase - 1, dtype=np.float32) # Zeros before the start.
+        self._history_start = -(self._taps_per_phase - 1) # Input index of `_history[0]`.
+        self._input_count = 0
+        self._output_count = 0
+
+    def _emit(self, chunk: np.ndarray, available_count: int) -> np.ndarray:
+        """
+        Every output whose newest input sample is before `available_count`.
+        """
+        buffer = np.concatenate([self._history, chunk])
+        # Output n needs inputs up to (n * down + center) // up.
+        end = max(self._output_count, -(-(available_count * self.up - self._center) // self.down))
+        output = np.empty(end - self._output_count, dtype=np.float32)
+        if len(output):
+            windows = sliding_window_view(buffer, self._taps_per_phase)
+            # Every `up`-th output uses the same phase, with its window `down` inputs further on:
+            # one strided view (no copy) per phase.
+            for offset in range(min(self.up, len(output))):
+                upsampled_time = (self._output_count + offset) * self.down + self._center
+                oldest_input = upsampled_time // self.up - self._history_start - (self._taps_per_phase - 1)
+                phase_windows = windows[oldest_input::self.down][:len(output[offset::self.up])]
+                output[offset::self.up] = np.einsum(
+                    "ij,j->i", phase_windows, self._phases[upsampled_time % self.up, ::-1],
+                )
+        self._output_count = end
+        # Keep what the next output's window reaches back to.
+        next_newest_input = (end * self.down + self._center) // self.up
+        keep_from = max(0, next_newest_input - (self._taps_per_phase - 1) - self._history_start)
+        self._history = buffer[keep_from:]
+        self._history_start += keep_from
+        return output
+
+def resample(np_pcm_wav: np.ndarray, orig_sample_rate: int, target_sample_rate: int) -> np.ndarray:
+    """
+    The whole signal at once, as float32 (in the input's scale).
+    """
+    if orig_sample_rate == target_sample_rate:
+        return np_pcm_wav.astype(np.float32)
+    resampler = PolyphaseResampler(orig_sample_rate, target_sample_rate)
+    return np.concatenate([resampler.process(np_pcm_wav), resampler.flush()])
+
+def normalize_peak(np_pcm_wav: np.ndarray) -> np.ndarray:
+    """
+    Scale to a peak of 1 as float32, like `librosa.util.normalize` (silence stays silent).
+    """
+    np_pcm_float32 = np_pcm_wav.astype(np.float32)
+    peak = float(np.max(np.abs(np_pcm_float32))) if len(np_pcm_float32) else 0.0
+    if peak < np.finfo(np.float32).tiny:
+        return np_pcm_float32
+    return np_pcm_float32 / peak
+
+class StreamingNormalizer:
+    """
+    Peak normalization when the whole signal isn't available yet: the gain is
+    `target_peak / (the loudest sample so far)` (at most `target_peak / min_peak`), so it only ever falls.
+
+    A lookahead limiter keeps that from clipping: output lags input by `lookahead_samples`,
+    and each sample's gain is the average of the gains over its lookahead window,
+    so the gain ramps down before a new peak and no output exceeds `target_peak`.
+    """
+    def __init__(self, target_peak: float = 1.0, min_peak: float = 0.01, lookahead_samples: int = 80):
+        assert 0 < min_peak and 0 < target_peak, f"Expected positive peaks, got {target_peak=}, {min_peak=}"
+        assert lookahead_samples >= 0, f"Expected a non-negative lookahead, got {lookahead_samples=}"
+        self.target_peak = target_peak
+        self.min_peak = min_peak
+        self.lookahead_samples = lookahead_samples
+        self._peak = min_peak
+        self._pending_samples = np.zeros(0, dtype=np.float32)
+        self._pending_gains = np.zeros(0, dtype=np.float64)
+
+    def process(self, chunk: np.ndarray) -> np.ndarray:
+        """
+        The float32 output for all but the last `lookahead_samples` received.
+        """
+        chunk = np.asarray(chunk, dtype=np.float32)
+        if len(chunk):
+            peaks = np.maximum(np.maximum.accumulate(np.abs(chunk)), self._peak)
+            self._peak = float(peaks[-1])
+            gains = self.target_peak / peaks.astype(np.float64)
+        else:
+            gains = np.zeros(0, dtype=np.float64)
+        samples = np.concatenate([self._pending_samples, chunk])
+        gains = np.concatenate([self._pending_gains, gains])
+        ready_count = max(0, len(samples) - self.lookahead_samples)
+        window = self.lookahead_samples + 1
+        gain_sums = np.concatenate([[0.0], np.cumsum(gains)])
+        applied_gains = (gain_sums[window:window + ready_count] - gain_sums[:ready_count]) / window
+        self._pending_samples, self._pending_gains = samples[ready_count:], gains[ready_count:]
+        return (samples[:ready_count] * applied_gains).astype(np.float32)
+
+    def flush(self) -> np.ndarray:
+        """
+        The held-back tail. The normalizer keeps its gain for whatever comes next.
+        """
+        pending_count = len(self._pending_samples)
+        output = self.process(np.zeros(self.lookahead_samples, dtype=np.float32))
+        self._pending_samples = self._pending_samples[:0]
+        self._pending_gains = self._pending_gains[:0]
+        return output[:pending_count]
+
+class PcmToMulawStream:
+    """
+    Generated audio (float in [-1, 1], or int) at any sample rate, to Twilio-ready 8kHz mulaw,
+    chunk by chunk: resample, normalize, encode.
+    """
+    def __init__(self, orig_sample_rate: int, target_sample_rate: int = 8000, lookahead_samples: int = 80):
+        self._resampler = PolyphaseResampler(orig_sample_rate, target_sample_rate)
+        self._normalizer = StreamingNormalizer(lookahead_samples=lookahead_samples)
+
+    def process(self, chunk: np.ndarray) -> bytes:
+        return mulaw_encode(self._normalizer.process(self._resampler.process(chunk))).tobytes()
+
+    def flush(self) -> bytes:
+        tail = self._normalizer.process(self._resampler.flush())
+        return mulaw_encode(np.concatenate([tail, self._normalizer.flush()])).tobytes()
@@ -0,0 +1,140 @@
+import asyncio
+from typing import Awaitable, Callable
+
+import numpy as np
+
+from .audio_executor import AudioExecutor
+from .audio_sample_buffer import AudioSampleBuffer
+from .voice_to_text import np_pcm_wav__to__text
+
+def np_pcm_wav__to__text_or_empty(np_pcm_wav: np.ndarray) -> str:
+    """
+    Partial passes shouldn't apologize for audio that's still arriving.
+    """
+    try:
+        return np_pcm_wav__to__text(np_pcm_wav)
+    except Exception:
+        return ""
+
+class StreamingTranscriber:
+    """
+    Transcribes an utterance while the caller is still speaking.
+
+    Every `partial_interval_samples` of new audio, the not-yet-committed audio is
+    transcribed in the background and `committed + hypothesis` goes to the partial callback.
+    Once the uncommitted audio is longer than `max_window_samples`, the part up to
+    the quietest recent frame is committed: transcribed once and never again.
+    At the end of speech only the uncommitted tail is left to transcribe.
+
+    One instance per utterance: make a new one after `finalize`.
+    """
+    def __init__(
+        self,
+        audio_executor: AudioExecutor,
+        call_key: str,
+        partial_transcript_async_method: Callable[[str], Awaitable[None]] | None = None,
+        partial_interval_samples: int = 8000, # 1s.
+        max_window_samples: int = 8000 * 5, # 5s.
+        frame_size: int = 160,
+    ):
+        assert 0 < partial_interval_samples <= max_window_samples, \
+            f"Expected 0 < {partial_interval_samples=} <= {max_window_samples=}"
+        self._audio_executor = audio_executor
+        self._call_key = call_key
+        self._partial_transcript_async_method = partial_transcript_async_method
+        self._partial_interval_samples = partial_interval_samples
+        self._max_window_samples = max_window_samples
+        self._frame_size = frame_size
+        self._committed_texts: list[str] = []
+        self._committed_upto: int | None = None # Buffer index; None until the first commit.
+        self._last_partial_size = 0
+        self._partial_task: asyncio.Task | None = None
+        self._committing = False
+        self._finalizing = False
+
+    @property
+    def committed_text(self) -> str:
+        return " ".join(text for text in self._committed_texts if text)
+
+    def on_audio(self, audio_buffer: AudioSampleBuffer) -> None:
+        """
+        Call after each append once speech has started. Never blocks:
+        at most one partial pass runs at a time, and a due pass is skipped while one is running.
+        """
+        if self._partial_task is not None and not self._partial_task.done():
+            return
+        size = len(audio_buffer)
+        if size - self._last_partial_size < self._partial_interval_samples:
+            return
+        self._last_partial_size = size
+        speech_start_index, _ = audio_buffer.crop_bounds()
+        self._partial_task = asyncio.create_task(self._partial_pass(audio_buffer.audio, speech_start_index))
+
+    async def finalize(self, audio_buffer: AudioSampleBuffer) -> str:
+        """
+        The full transcript of the utterance, transcribing only what hasn't been committed.
+        Returns "" if nothing intelligible was said.
+        """
+        self._finalizing = True
+        if self._partial_task is not None and not self._partial_task.done():
+            if self._committing:
+                await self._partial_task # Its result is part of the transcript.
+            else:
+                self._partial_task.cancel()
+                await asyncio.gather(self._partial_task, return_exceptions=True)
+        starting_index, ending_index = audio_buffer.crop_bounds()
+        if self._committed_upto is not None:
+            starting_index = max(starting_index, self._committed_upto)
+        tail_text = ""
+        if ending_index > starting_index:
+            tail_text = await self._audio_executor.run(
+                self._call_key,
+                np_pcm_wav__to__text_or_empty,
+                audio_buffer.audio[starting_index:ending_index],
+            )
+        return " ".join(text for text in self._committed_texts + [tail_text] if text)
+
+    # Private.
+
+    async def _partial_pass(self, audio: np.ndarray, speech_start_index: int) -> None:
+        """
+        `audio` is a view of everything so far; later appends don't change it.
+        """
+        window_start = speech_start_index if self._committed_upto is None else self._committed_upto
+        if len(audio) - window_start > self._max_window_samples:
+            commit_index = self._quietest_frame_end(audio, window_start)
+            self._committing = True
+            try:
+                committed_text: str = await self._audio_executor.run(
+                    self._call_key,
+                    np_pcm_wav__to__text_or_empty,
+                    audio[window_start:commit_index],
+                )
+            finally:
+                self._committing = False
+            self._committed_texts.append(committed_text)
+            self._committed_upto = window_start = commit_index
+            if self._finalizing:
+                return
+        hypothesis: str = await self._audio_executor.run(
+            self._call_key,
+            np_pcm_wav__to__text_or_empty,
+            audio[window_start:],
+        )
+        if self._partial_transcript_async_method is not None:
+            partial_text = " ".join(text for text in self._committed_texts + [hypothesis] if text)
+            await self._partial_transcript_async_method(partial_text)
+
+    def _quietest_frame_end(self, audio: np.ndarray, window_start: int) -> int:
+        """
+        Where to cut: the end of the quietest frame in the second half of the window,
+        so the cut most likely falls between words.
+        """
+        search_start = window_start + (len(audio) - window_start) // 2
+        frame_count = (len(audio) - search_start) // self._frame_size
+        if frame_count == 0:
+            return len(audio)
+        frames = audio[search_start:search_start + frame_count * self._frame_size]
+        frame_energy = np.abs(frames.reshape(frame_count, self._frame_size).astype(np.int16)).sum(axis=1)
+        quietest_frame = int(np.argmin(frame_energy))
+        return search_start + (quietest_frame + 1) * self._frame_size
@@ -0,0 +1,67 @@
+import functools
+import threading
+
+import numpy as np
+
+from .audio_executor import AudioExecutor
+from .micro_batcher import MicroBatcher
+from .voice_to_text import np_pcm_wavs__to__texts, np_pcm_wavs__to__texts_safe
+
+class SttBatcher(MicroBatcher[np.ndarray, str]):
+    """
+    Collects the utterances that calls finish at about the same time and transcribes them
+    together (`SttBackend.transcribe_batch`), so the model runs once per batch instead of once per call.
+    See `MicroBatcher` for how batches form.
+    With `safe=False` the transcripts come back raw (`np_pcm_wavs__to__texts`): blank ones stay blank
+    and a failed batch fails every utterance in it, for a caller that applies the fallback itself.
+    """
+    def __init__(
+        self,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10,
+        audio_executor: AudioExecutor | None = None,
+        sample_rate: int = 8000,
+        safe: bool = True,
+    ):
+        batch_fn = np_pcm_wavs__to__texts_safe if safe else np_pcm_wavs__to__texts
+        super().__init__(
+            functools.partial(batch_fn, sample_rate=sample_rate),
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            audio_executor=audio_executor,
+            call_key="stt_batcher",
+        )
+        self.sample_rate = sample_rate
+
+    async def transcribe(self, np_pcm_wav: np.ndarray) -> str:
+        """
+        Like `np_pcm_wav__to__text_safe` (or the raw transcript with `safe=False`), batched with whatever other calls are transcribing
+        (a batch runs on the executor as shared work, not as any one call's).
+        """
+        return await self.submit(np_pcm_wav)
+
+_stt_batcher: SttBatcher | None = None
+_stt_batcher_lock = threading.Lock()
+
+def get_stt_batcher() -> SttBatcher | None:
+    """
+    The process-wide batcher, or None while batching is disabled (the default).
+    """
+    with _stt_batcher_lock:
+        return _stt_batcher
+
+def set_stt_batcher(stt_batcher: SttBatcher | None) -> None:
+    """
+    Calls created afterwards transcribe through `stt_batcher` (None transcribes each call on its own).
+    """
+    global _stt_batcher
+    with _stt_batcher_lock:
+        _stt_batcher = stt_batcher
+
+def enable_stt_batching(max_batch_size: int = 8, max_wait_ms: float = 10) -> SttBatcher:
+    """
+    Install (and return) a batcher on the process-wide audio executor.
+    """
+    stt_batcher = SttBatcher(max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    set_stt_batcher(stt_batcher)
+    return stt_batcher
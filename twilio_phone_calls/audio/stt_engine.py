@@ -0,0 +1,105 @@
+import abc
+import threading
+
+import numpy as np
+
+from .audio_conversions import np_pcm_wav__to__normalized_float32
+from .lazy_model import LazyModel
+
+class SttBackend(abc.ABC):
+    """
+    Speech-to-text on in-memory linear PCM audio.
+
+    Subclass this to plug in another model (or a fake one for tests)
+    and install it with `set_stt_backend`.
+    """
+    def load(self) -> None:
+        """
+        Load any model weights. Called before the first transcription;
+        override it so the expensive part happens once per process.
+        """
+
+    @abc.abstractmethod
+    def transcribe(self, np_pcm_wav: np.ndarray, sample_rate: int = 8000) -> str:
+        ...
+
+    def transcribe_batch(self, np_pcm_wavs: list[np.ndarray], sample_rate: int = 8000) -> list[str]:
+        """
+        One text per utterance, in order. Override it to run them through the model together;
+        by default they are transcribed one at a time.
+        """
+        return [self.transcribe(np_pcm_wav, sample_rate=sample_rate) for np_pcm_wav in np_pcm_wavs]
+
+class WhisperSttBackend(SttBackend):
+    """
+    OpenAI Whisper, loaded on first use (or `load()`) and kept in memory.
+    """
+    def __init__(self, model_name: str = "base"):
+        self.model_name = model_name
+        self._model = LazyModel(self._load_whisper_model)
+
+    def load(self) -> None:
+        self._model.preload()
+
+    def transcribe(self, np_pcm_wav: np.ndarray, sample_rate: int = 8000) -> str:
+        import torch
+        audio: np.ndarray = np_pcm_wav__to__normalized_float32(
+            np_pcm_wav,
+            sample_rate=sample_rate,
+            target_sample_rate=16000,
+        )
+        text = self._model.get().transcribe(audio, fp16=torch.cuda.is_available())["text"]
+        assert isinstance(text, str), f"Expected Whisper to return text, got {type(text)=}"
+        return text
+
+    def transcribe_batch(self, np_pcm_wavs: list[np.ndarray], sample_rate: int = 8000) -> list[str]:
+        """
+        Utterances that fit in Whisper's 30s window are padded to it and decoded
+        in one forward pass; longer ones go through `transcribe` on their own.
+        """
+        import torch
+        import whisper
+        model = self._model.get()
+        audios: list[np.ndarray] = [
+            np_pcm_wav__to__normalized_float32(np_pcm_wav, sample_rate=sample_rate, target_sample_rate=16000)
+            for np_pcm_wav in np_pcm_wavs
+        ]
+        texts: list[str] = [""] * len(audios)
+        batch_indices: list[int] = []
+        for index, audio in enumerate(audios):
+            if len(audio) <= whisper.audio.N_SAMPLES:
+                batch_indices.append(index)
+            else:
+                texts[index] = self.transcribe(np_pcm_wavs[index], sample_rate=sample_rate)
+        if batch_indices:
+            mels = torch.stack([
+                whisper.log_mel_spectrogram(whisper.pad_or_trim(torch.from_numpy(audios[index])), model.dims.n_mels)
+                for index in batch_indices
+            ]).to(model.device)
+            results = whisper.decode(model, mels, whisper.DecodingOptions(fp16=torch.cuda.is_available()))
+            assert isinstance(results, list) # One per mel, given a batch of them.
+            for index, result in zip(batch_indices, results):
+                texts[index] = result.text
+        return texts
+
+    def _load_whisper_model(self):
+        import whisper
+        return whisper.load_model(self.model_name)
+
+_stt_backend: SttBackend | None = None
+_stt_backend_lock = threading.Lock()
+
+def get_stt_backend() -> SttBackend:
+    """
+    The process-wide backend (Whisper unless `set_stt_backend` was called).
+    """
+    global _stt_backend
+    with _stt_backend_lock:
+        if _stt_backend is None:
+            _stt_backend = WhisperSttBackend()
+        return _stt_backend
+
+def set_stt_backend(stt_backend: SttBackend) -> None:
+    global _stt_backend
+    with _stt_backend_lock:
+        _stt_backend = stt_backend
@@ -1,29 +1,63 @@
 from pathlib import Path
+import functools
+import logging
+import threading
 import time
 
-import torch
+import numpy as np
 
-if torch.cuda.is_available():
+from .lazy_model import LazyModel
+
+logger = logging.getLogger(__name__)
+
+def _load_xtts_model(device: str = "cuda"):
+    import torch
+    if device.startswith("cuda"):
+        assert torch.cuda.is_available(), "No TTS model available (coqui-tts needs CUDA, or pass device=\"cpu\")"
     from TTS.api import TTS
     start_time = time.time()
-    tts = TTS("tts_models/multilingual/multi-dataset/xtts_v2").to("cuda")
+    model = TTS("tts_models/multilingual/multi-dataset/xtts_v2").to(device)
+    end_time = time.time()
+    logger.info("Loaded the TTS model in %.1fs.", end_time - start_time)
+    return model
+
+xtts_model = LazyModel(_load_xtts_model)
+_xtts_models: dict[str, LazyModel] = {"cuda": xtts_model}
+_xtts_models_lock = threading.Lock()
+
+def get_xtts_model(device: str = "cuda") -> LazyModel:
+    """
+    One model per device, loaded on first use.
+    """
+    with _xtts_models_lock:
+        if device not in _xtts_models:
+            _xtts_models[device] = LazyModel(functools.partial(_load_xtts_model, device))
+        return _xtts_models[device]
+
+def __getattr__(name: str):
+    """
+    `tts` used to be loaded when this module was imported; keep it reachable.
+    """
+    if name == "tts":
+        return xtts_model.get()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def text__to__np_pcm_wav(text: str, device: str = "cuda") -> tuple[np.ndarray, int]:
+    """
+    Synthesize in memory: float32 linear PCM WAV and its sample rate (24kHz for XTTS v2).
+    """
+    model = get_xtts_model(device).get()
+    start_time = time.time()
+    np_pcm_wav = np.asarray(model.tts(text=text, speaker='Tammy Grit', language="en"), dtype=np.float32)
     end_time = time.time()
-    print(f"Time taken to load TTS model: {end_time - start_time} seconds")
-else:
-    tts = None
+    logger.debug("Generated audio in %.2fs.", end_time - start_time)
+    return np_pcm_wav, model.synthesizer.output_sample_rate
 
-def text__to__wav_filepath(text: str, wav_path: str | Path) -> None:
+def text__to__wav_filepath(text: str, wav_path: str | Path, device: str = "cuda") -> None:
+    from .audio_conversions import np_pcm_wav__to__wav_bytes
     wav_path = Path(wav_path)
     assert wav_path.parent.exists(), f"Expected {wav_path.parent} to exist"
     assert not wav_path.exists(), f"Expected {wav_path} to not exist"
     assert wav_path.suffix == ".wav", f"Expected .wav file, got {wav_path}"
-    start_time = time.time()
-    assert tts is not None, "No TTS model available"
-    tts.tts_to_file(
-        text=text,
-        speaker='Tammy Grit',
-        language="en",
-        file_path=str(wav_path),
-    )
-    end_time = time.time()
-    print(f"Time taken to generate audio: {end_time - start_time} seconds")
+    np_pcm_wav, sample_rate = text__to__np_pcm_wav(text, device=device)
+    wav_path.write_bytes(np_pcm_wav__to__wav_bytes(np_pcm_wav, sample_rate=sample_rate))
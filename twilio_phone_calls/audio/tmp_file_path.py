@@ -1,14 +1,17 @@
 from pathlib import Path
-from datetime import datetime
+import uuid
 
 class TmpFilePath:
+    """
+    A uniquely named file under `/tmp/twilio_phone_calls`, deleted on exit.
+    The conversions keep audio in memory (see the `*_bytes` functions); this is for callers that need a file.
+    """
     def __init__(self, extension: str):
         assert extension in {"mp3", "wav"}, extension
         assert Path("/tmp").exists(), "Expected `/tmp` directory to exist."
         self._tmp_dir = Path("/tmp/twilio_phone_calls")
         self._tmp_dir.mkdir(parents=True, exist_ok=True)
-        now_ms_filename = datetime.now().strftime("%Y-%m-%d_%H-%M-%S-%f")
-        self._path = self._tmp_dir / f"{now_ms_filename}.{extension}"
+        self._path = self._tmp_dir / f"{uuid.uuid4().hex}.{extension}"
 
     def __enter__(self) -> Path:
         return self._path
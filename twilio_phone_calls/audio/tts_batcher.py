@@ -0,0 +1,58 @@
+import threading
+
+from .audio_executor import AudioExecutor
+from .micro_batcher import MicroBatcher
+from .tts_engine import texts__to__mulaw_bytes
+
+class TtsBatcher(MicroBatcher[str, bytes]):
+    """
+    Collects the sentences that calls need synthesized at about the same time and synthesizes
+    them together (`TtsBackend.texts__to__mulaw_bytes`), each distinct sentence once.
+    See `MicroBatcher` for how batches form.
+    """
+    def __init__(
+        self,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10,
+        audio_executor: AudioExecutor | None = None,
+    ):
+        super().__init__(
+            texts__to__mulaw_bytes,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            audio_executor=audio_executor,
+            call_key="tts_batcher",
+        )
+
+    async def synthesize(self, text: str) -> bytes:
+        """
+        Like `text__to__mulaw_bytes`, batched with whatever other calls are synthesizing
+        (a batch runs on the executor as shared work, not as any one call's).
+        """
+        return await self.submit(text)
+
+_tts_batcher: TtsBatcher | None = None
+_tts_batcher_lock = threading.Lock()
+
+def get_tts_batcher() -> TtsBatcher | None:
+    """
+    The process-wide batcher, or None while batching is disabled (the default).
+    """
+    with _tts_batcher_lock:
+        return _tts_batcher
+
+def set_tts_batcher(tts_batcher: TtsBatcher | None) -> None:
+    """
+    Calls created afterwards synthesize through `tts_batcher` (None synthesizes each sentence on its own).
+    """
+    global _tts_batcher
+    with _tts_batcher_lock:
+        _tts_batcher = tts_batcher
+
+def enable_tts_batching(max_batch_size: int = 8, max_wait_ms: float = 10) -> TtsBatcher:
+    """
+    Install (and return) a batcher on the process-wide audio executor.
+    """
+    tts_batcher = TtsBatcher(max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    set_tts_batcher(tts_batcher)
+    return tts_batcher
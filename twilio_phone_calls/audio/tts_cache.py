@@ -0,0 +1,208 @@
+import asyncio
+import collections
+import hashlib
+import mmap
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterable
+
+from .tts_engine import TtsBackend, get_tts_backend, split_into_sentences
+
+def normalize_tts_text(text: str) -> str:
+    """
+    Whitespace differences don't change what the voice says.
+    """
+    return " ".join(text.split())
+
+class TtsCache:
+    """
+    Synthesized sentences as Twilio-ready mulaw bytes, keyed by normalized text,
+    language, speaker and backend, so repeated phrases (greetings, fallbacks)
+    skip synthesis entirely.
+
+    Entries live in an in-memory LRU bounded by `max_memory_bytes`.
+    With `disk_dir`, entries are also written there and memory-mapped back
+    on a memory miss, so they survive restarts.
+    """
+    def __init__(
+        self,
+        max_memory_bytes: int = 32 * 1024 * 1024,
+        disk_dir: str | Path | None = None,
+    ):
+        assert max_memory_bytes >= 0, f"Expected a non-negative size, got {max_memory_bytes=}"
+        self.max_memory_bytes = max_memory_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir is not None else None
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+        self._entries: collections.OrderedDict[str, bytes | mmap.mmap] = collections.OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._memory_bytes
+
+    @staticmethod
+    def make_key(text: str, tts_backend: TtsBackend) -> str:
+        key_parts = (tts_backend.name, tts_backend.language, tts_backend.speaker, normalize_tts_text(text))
+        return hashlib.sha256("\x1f".join(key_parts).encode("utf-8")).hexdigest()
+
+    def get_from_memory(self, text: str, tts_backend: TtsBackend) -> bytes | mmap.mmap | None:
+        """
+        Non-blocking (safe on the event loop): the memory tier only.
+        Only hits are counted; on None, follow up with `get` or `get_or_synthesize` (blocking), which check the disk.
+        """
+        key = self.make_key(text, tts_backend)
+        with self._lock:
+            mulaw_bytes = self._entries.get(key)
+            if mulaw_bytes is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return mulaw_bytes
+
+    def get(self, text: str, tts_backend: TtsBackend) -> bytes | mmap.mmap | None:
+        """
+        The cached mulaw audio (bytes, or a read-only memory map from the disk tier), or None.
+        Blocking with a `disk_dir`.
+        """
+        key = self.make_key(text, tts_backend)
+        with self._lock:
+            mulaw_bytes = self._entries.get(key)
+            if mulaw_bytes is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return mulaw_bytes
+        mulaw_bytes = self._read_from_disk(key)
+        with self._lock:
+            if mulaw_bytes is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._insert_locked(key, mulaw_bytes)
+        return mulaw_bytes
+
+    def put(self, text: str, tts_backend: TtsBackend, mulaw_bytes: bytes) -> None:
+        """
+        Blocking with a `disk_dir`.
+        """
+        key = self.make_key(text, tts_backend)
+        self._write_to_disk(key, mulaw_bytes)
+        with self._lock:
+            self._insert_locked(key, mulaw_bytes)
+
+    def get_or_synthesize(self, text: str, tts_backend: TtsBackend | None = None) -> bytes | mmap.mmap:
+        """
+        Blocking: synthesizes on a miss.
+        """
+        tts_backend = tts_backend or get_tts_backend()
+        mulaw_bytes = self.get(text, tts_backend)
+        if mulaw_bytes is None:
+            mulaw_bytes = tts_backend.text__to__mulaw_bytes(text)
+            self.put(text, tts_backend, mulaw_bytes)
+        return mulaw_bytes
+
+    async def get_or_synthesize_async(
+        self,
+        text: str,
+        tts_backend: TtsBackend,
+        synthesize_async_method: Callable[[str], Awaitable[bytes]],
+    ) -> bytes | mmap.mmap:
+        """
+        `get_or_synthesize` for the event loop: the memory tier is checked right away, the disk tier
+        (if any) on a thread, and a miss is synthesized with `synthesize_async_method`
+        (e.g. on the audio executor, which only gets the text: the cache itself can't be pickled).
+        """
+        mulaw_bytes = self.get_from_memory(text, tts_backend)
+        if mulaw_bytes is not None:
+            return mulaw_bytes
+        mulaw_bytes = await self._run_disk_io(self.get, text, tts_backend)
+        if mulaw_bytes is None:
+            mulaw_bytes = await synthesize_async_method(text)
+            await self._run_disk_io(self.put, text, tts_backend, mulaw_bytes)
+        return mulaw_bytes
+
+    def warm_up(self, phrases: Iterable[str], tts_backend: TtsBackend | None = None) -> None:
+        """
+        Pre-render known phrases (e.g. the greeting) at startup.
+        Blocking. Phrases are cached per sentence, the way `send_text_as_audio` looks them up.
+        """
+        for phrase in phrases:
+            for sentence in split_into_sentences(phrase):
+                self.get_or_synthesize(sentence, tts_backend)
+
+    def clear(self) -> None:
+        """
+        Empty the memory tier (the disk tier is left alone).
+        """
+        with self._lock:
+            self._entries.clear()
+            self._memory_bytes = 0
+
+    # Private.
+
+    async def _run_disk_io(self, method: Callable, *args) -> Any:
+        if self.disk_dir is None:
+            return method(*args) # Memory only: nothing to block on.
+        return await asyncio.to_thread(method, *args)
+
+    def _insert_locked(self, key: str, mulaw_bytes: bytes | mmap.mmap) -> None:
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        if len(mulaw_bytes) > self.max_memory_bytes:
+            return
+        self._entries[key] = mulaw_bytes
+        self._memory_bytes += len(mulaw_bytes)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _disk_path(self, key: str) -> Path:
+        assert self.disk_dir is not None
+        return self.disk_dir / f"{key}.ulaw"
+
+    def _read_from_disk(self, key: str) -> bytes | mmap.mmap | None:
+        if self.disk_dir is None:
+            return None
+        try:
+            with self._disk_path(key).open("rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return b""
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+
+    def _write_to_disk(self, key: str, mulaw_bytes: bytes) -> None:
+        if self.disk_dir is None:
+            return
+        path = self._disk_path(key)
+        if path.exists():
+            return
+        tmp_path = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        tmp_path.write_bytes(mulaw_bytes)
+        os.replace(tmp_path, path) # Atomic, so readers never see a partial file.
+
+_tts_cache: TtsCache | None = None
+_tts_cache_lock = threading.Lock()
+
+def get_tts_cache() -> TtsCache:
+    """
+    The process-wide cache (memory only unless `set_tts_cache` was called).
+    """
+    global _tts_cache
+    with _tts_cache_lock:
+        if _tts_cache is None:
+            _tts_cache = TtsCache()
+        return _tts_cache
+
+def set_tts_cache(tts_cache: TtsCache) -> None:
+    global _tts_cache
+    with _tts_cache_lock:
+        _tts_cache = tts_cache
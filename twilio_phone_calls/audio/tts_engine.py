@@ -0,0 +1,172 @@
+import abc
+import re
+import threading
+import zlib
+
+import numpy as np
+
+from .audio_conversions import (
+    text__to__mp3_bytes,
+    mp3_bytes__to__mulaw_bytes,
+    np_pcm_wav__to__twilio_np_pcm_wav,
+    np_pcm_wav__to__mulaw_bytes,
+    TWILIO_SAMPLE_RATE,
+)
+from .mulaw import mulaw_encode
+
+class TtsBackend(abc.ABC):
+    """
+    Text-to-speech producing Twilio-ready audio (8kHz mulaw bytes).
+
+    Subclass this to plug in another voice and install it with `set_tts_backend`.
+    """
+    name: str = "tts"
+    language: str = "en"
+    speaker: str = "default"
+
+    def load(self) -> None:
+        """
+        Load any model weights. Called before the first synthesis.
+        """
+
+    @abc.abstractmethod
+    def text__to__mulaw_bytes(self, text: str) -> bytes:
+        ...
+
+    def texts__to__mulaw_bytes(self, texts: list[str]) -> list[bytes]:
+        """
+        One clip per text, in order. Override it to synthesize them together;
+        by default they are synthesized one at a time.
+        """
+        return [self.text__to__mulaw_bytes(text) for text in texts]
+
+class ToneTtsBackend(TtsBackend):
+    """
+    A deterministic stand-in for a voice that needs no network, GPU or model:
+    each word is a tone (its pitch from the word, its length from its letters)
+    followed by a short gap. For tests, benchmarks and offline development.
+    A batch is rendered in one vectorized pass.
+    """
+    name = "tone"
+
+    def __init__(self, seconds_per_letter: float = 0.06, gap_seconds: float = 0.08, volume: float = 0.3):
+        self.seconds_per_letter = seconds_per_letter
+        self.gap_seconds = gap_seconds
+        self.volume = volume
+
+    def text__to__mulaw_bytes(self, text: str) -> bytes:
+        return self.texts__to__mulaw_bytes([text])[0]
+
+    def texts__to__mulaw_bytes(self, texts: list[str]) -> list[bytes]:
+        frequencies: list[float] = [] # Per segment; 0 is silence.
+        lengths: list[int] = []
+        text_lengths: list[int] = []
+        gap_length = int(self.gap_seconds * TWILIO_SAMPLE_RATE)
+        for text in texts:
+            text_length = 0
+            for word in text.split():
+                word_length = int(max(1, len(word)) * self.seconds_per_letter * TWILIO_SAMPLE_RATE)
+                frequencies += [200 + zlib.crc32(word.lower().encode("utf-8")) % 400, 0]
+                lengths += [word_length, gap_length]
+                text_length += word_length + gap_length
+            text_lengths.append(text_length)
+        lengths_array = np.array(lengths, dtype=np.int64)
+        segment_starts = np.repeat(np.cumsum(lengths_array) - lengths_array, lengths_array)
+        sample_times = (np.arange(int(lengths_array.sum())) - segment_starts) / TWILIO_SAMPLE_RATE
+        sample_frequencies = np.repeat(np.array(frequencies, dtype=np.float64), lengths_array)
+        np_pcm_wav = (self.volume * np.sin(2 * np.pi * sample_frequencies * sample_times)).astype(np.float32)
+        mulaw_bytes = mulaw_encode(np_pcm_wav).tobytes()
+        text_ends = np.cumsum(text_lengths, dtype=np.int64)
+        return [mulaw_bytes[end - length:end] for end, length in zip(text_ends.tolist(), text_lengths)]
+
+class GttsTtsBackend(TtsBackend):
+    """
+    Google Text-to-Speech (needs network access).
+    """
+    name = "gtts"
+
+    def load(self) -> None:
+        import gtts, pydub
+
+    def text__to__mulaw_bytes(self, text: str) -> bytes:
+        return mp3_bytes__to__mulaw_bytes(text__to__mp3_bytes(text))
+
+class CoquiTtsBackend(TtsBackend):
+    """
+    Coqui XTTS v2 on `device` ("cuda" by default; "cpu" works, slowly).
+    XTTS synthesizes one text per forward pass, so a batch runs its sentences back to back.
+    """
+    name = "coqui"
+    speaker = "Tammy Grit"
+
+    def __init__(self, device: str = "cuda"):
+        self.device = device
+
+    def load(self) -> None:
+        from .text_to_voice import get_xtts_model
+        get_xtts_model(self.device).preload()
+
+    def text__to__mulaw_bytes(self, text: str) -> bytes:
+        from .text_to_voice import text__to__np_pcm_wav
+        np_pcm_wav, sample_rate = text__to__np_pcm_wav(text, device=self.device)
+        return np_pcm_wav__to__mulaw_bytes(np_pcm_wav__to__twilio_np_pcm_wav(np_pcm_wav, sample_rate))
+
+_tts_backend: TtsBackend | None = None
+_tts_backend_lock = threading.Lock()
+
+def get_tts_backend() -> TtsBackend:
+    """
+    The process-wide backend: coqui when CUDA is available, otherwise gTTS,
+    unless `set_tts_backend` was called.
+    """
+    global _tts_backend
+    with _tts_backend_lock:
+        if _tts_backend is None:
+            import torch
+            _tts_backend = CoquiTtsBackend() if torch.cuda.is_available() else GttsTtsBackend()
+        return _tts_backend
+
+def get_tts_backend_nowait() -> TtsBackend | None:
+    """
+    The process-wide backend if it's been chosen (or set) already, otherwise None:
+    unlike `get_tts_backend`, never imports torch, so it's safe on the event loop.
+    """
+    with _tts_backend_lock:
+        return _tts_backend
+
+def set_tts_backend(tts_backend: TtsBackend) -> None:
+    global _tts_backend
+    with _tts_backend_lock:
+        _tts_backend = tts_backend
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+
+def split_into_sentences(text: str) -> list[str]:
+    """
+    Split on sentence-ending punctuation followed by whitespace (or on newlines),
+    keeping the punctuation so the voice still sounds like a question or an exclamation.
+    """
+    return [sentence.strip() for sentence in _SENTENCE_END.split(text) if sentence.strip()]
+
+def split_off_sentences(text: str) -> tuple[list[str], str]:
+    """
+    For text that's still arriving (e.g. streamed tokens): the sentences known to be complete
+    (followed by whitespace), and the rest, to prepend to what comes next.
+    """
+    parts = _SENTENCE_END.split(text)
+    return [sentence.strip() for sentence in parts[:-1] if sentence.strip()], parts[-1]
+
+def text__to__mulaw_bytes(text: str) -> bytes:
+    """
+    Synthesize with the process-wide backend.
+    A plain function so it can be shipped to a process pool.
+    """
+    return get_tts_backend().text__to__mulaw_bytes(text)
+
+def texts__to__mulaw_bytes(texts: list[str]) -> list[bytes]:
+    """
+    `text__to__mulaw_bytes` for a batch, synthesizing each distinct text once.
+    """
+    distinct_texts = list(dict.fromkeys(texts))
+    mulaw_bytes_by_text = dict(zip(distinct_texts, get_tts_backend().texts__to__mulaw_bytes(distinct_texts)))
+    return [mulaw_bytes_by_text[text] for text in texts]
@@ -0,0 +1,161 @@
+import abc
+from typing import Callable
+
+import numpy as np
+from pydantic import BaseModel
+
+class EndpointingConfig(BaseModel):
+    """
+    When an utterance counts as started and finished, in milliseconds of audio.
+    The defaults are the original fixed thresholds (10000, 1000 and 1000 samples at 8kHz).
+    """
+    pause_ms: int = 1250 # Trailing quiet that ends the turn (plus any VAD hangover: the end-of-turn latency).
+    min_speech_ms: int = 125 # Voiced audio needed before the caller counts as talking (and interrupts us).
+    padding_ms: int = 125 # Kept on each side of the voiced audio when cropping.
+    sample_rate: int = 8000
+
+    @property
+    def pause_samples(self) -> int:
+        return self.pause_ms * self.sample_rate // 1000
+
+    @property
+    def min_speech_samples(self) -> int:
+        return self.min_speech_ms * self.sample_rate // 1000
+
+    @property
+    def padding_samples(self) -> int:
+        return self.padding_ms * self.sample_rate // 1000
+
+def _full_scale(np_pcm_wav: np.ndarray) -> float:
+    if np.issubdtype(np_pcm_wav.dtype, np.integer):
+        return float(-np.iinfo(np_pcm_wav.dtype).min)
+    return 1.0
+
+class VoiceActivityDetector(abc.ABC):
+    """
+    Decides which samples are speech, 20ms frame by 20ms frame.
+
+    Detectors may keep state (noise estimates, hangover) across calls to `voiced_mask`,
+    so use one instance per phone call.
+    """
+    def __init__(self, frame_size: int = 160, hangover_frames: int = 0):
+        assert frame_size > 0, f"Expected a positive frame size, got {frame_size=}"
+        self.frame_size = frame_size
+        self.hangover_frames = hangover_frames
+        self._hangover_left = 0
+
+    def voiced_mask(self, np_pcm_wav: np.ndarray) -> np.ndarray:
+        """
+        One bool per sample. Samples are classified in frames of `frame_size`
+        (the last frame of a chunk may be shorter).
+        """
+        frame_count = -(-len(np_pcm_wav) // self.frame_size)
+        if frame_count == 0:
+            return np.zeros(0, dtype=bool)
+        padded = np.zeros(frame_count * self.frame_size, dtype=np.float32)
+        padded[:len(np_pcm_wav)] = np_pcm_wav
+        frames = padded.reshape(frame_count, self.frame_size) / _full_scale(np_pcm_wav)
+        frame_lengths = np.full(frame_count, self.frame_size)
+        frame_lengths[-1] = len(np_pcm_wav) - (frame_count - 1) * self.frame_size
+        voiced_frames = self._apply_hangover(self.classify_frames(frames, frame_lengths))
+        return np.repeat(voiced_frames, self.frame_size)[:len(np_pcm_wav)]
+
+    @abc.abstractmethod
+    def classify_frames(self, frames: np.ndarray, frame_lengths: np.ndarray) -> np.ndarray:
+        """
+        `frames` is (frame_count, frame_size) float32 in [-1, 1], zero-padded past `frame_lengths`.
+        Returns one bool per frame, before hangover.
+        """
+
+    # Private.
+
+    def _apply_hangover(self, voiced_frames: np.ndarray) -> np.ndarray:
+        """
+        Keep reporting speech for `hangover_frames` after it stops,
+        so short gaps between words don't count towards the pause.
+        """
+        if self.hangover_frames == 0:
+            return voiced_frames
+        voiced_frames = voiced_frames.copy()
+        for i, is_voiced in enumerate(voiced_frames):
+            if is_voiced:
+                self._hangover_left = self.hangover_frames
+            elif self._hangover_left > 0:
+                self._hangover_left -= 1
+                voiced_frames[i] = True
+        return voiced_frames
+
+class EnergyVad(VoiceActivityDetector):
+    """
+    Frame energy against an adaptive noise floor, with a zero-crossing check
+    so steady hiss on the line isn't mistaken for speech.
+
+    A frame is voiced when its energy is `threshold_db` above the noise floor
+    (and above `min_energy_db`), unless it is both noise-like (zero-crossing rate
+    above `max_zero_crossing_rate`) and not clearly louder than the floor.
+    The floor tracks the quietest recent frames: down quickly, up slowly (every frame,
+    so it recovers even if the line gets noisier mid-speech), never below `min_noise_floor_db`.
+    The first `calibration_frames` above digital silence only set the floor: callers
+    don't talk over the line connecting, and noise appearing out of silence isn't speech.
+    """
+    def __init__(
+        self,
+        frame_size: int = 160,
+        hangover_frames: int = 4,
+        threshold_db: float = 10.0,
+        min_energy_db: float = -45.0,
+        max_zero_crossing_rate: float = 0.4,
+        min_noise_floor_db: float = -60.0,
+        noise_floor_rise: float = 0.005, # Per frame: ~4s time constant.
+        noise_floor_fall: float = 0.5,
+        calibration_frames: int = 10,
+    ):
+        super().__init__(frame_size=frame_size, hangover_frames=hangover_frames)
+        self.threshold_db = threshold_db
+        self.min_energy_db = min_energy_db
+        self.max_zero_crossing_rate = max_zero_crossing_rate
+        self.min_noise_floor_db = min_noise_floor_db
+        self.noise_floor_db = min_noise_floor_db
+        self.noise_floor_rise = noise_floor_rise
+        self.noise_floor_fall = noise_floor_fall
+        self._calibration_frames_left = calibration_frames
+
+    def classify_frames(self, frames: np.ndarray, frame_lengths: np.ndarray) -> np.ndarray:
+        energy_db = 10 * np.log10(np.square(frames).sum(axis=1) / frame_lengths + 1e-10)
+        sign_changes = np.count_nonzero(np.diff(np.signbit(frames), axis=1), axis=1)
+        zero_crossing_rate = sign_changes / np.maximum(frame_lengths - 1, 1)
+        voiced_frames = np.zeros(len(frames), dtype=bool)
+        for i in range(len(frames)): # Usually one frame per chunk; the floor update is sequential.
+            if self._calibration_frames_left > 0:
+                if energy_db[i] > self.min_noise_floor_db:
+                    self._calibration_frames_left -= 1
+                    self.noise_floor_db += (energy_db[i] - self.noise_floor_db) * 0.5
+                continue
+            above_floor_db = energy_db[i] - self.noise_floor_db
+            is_voiced = above_floor_db >= self.threshold_db and energy_db[i] >= self.min_energy_db
+            if is_voiced and zero_crossing_rate[i] > self.max_zero_crossing_rate:
+                is_voiced = above_floor_db >= self.threshold_db + 6
+            voiced_frames[i] = is_voiced
+            rate = self.noise_floor_fall if energy_db[i] < self.noise_floor_db else self.noise_floor_rise
+            self.noise_floor_db += (energy_db[i] - self.noise_floor_db) * rate
+            self.noise_floor_db = max(self.noise_floor_db, self.min_noise_floor_db)
+        return voiced_frames
+
+class ModelVad(VoiceActivityDetector):
+    """
+    Hook for a model-based detector (e.g. Silero): `predict` gets the frames
+    as a (frame_count, frame_size) float32 array and returns a speech probability per frame.
+    """
+    def __init__(
+        self,
+        predict: Callable[[np.ndarray], np.ndarray],
+        threshold: float = 0.5,
+        frame_size: int = 160,
+        hangover_frames: int = 4,
+    ):
+        super().__init__(frame_size=frame_size, hangover_frames=hangover_frames)
+        self.predict = predict
+        self.threshold = threshold
+
+    def classify_frames(self, frames: np.ndarray, frame_lengths: np.ndarray) -> np.ndarray:
+        return np.asarray(self.predict(frames)) >= self.threshold
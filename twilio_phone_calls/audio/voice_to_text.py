@@ -1,27 +1,70 @@
 from pathlib import Path
-import traceback
+import io
+import logging
 
-import speech_recognition as sr
+import numpy as np
 
-def voice_to_text(wav_path: str | Path) -> str:
+from .stt_engine import get_stt_backend
+
+FALLBACK_CALLER_TEXT = "I'm sorry, I didn't get that. Will you try again?"
+
+logger = logging.getLogger(__name__)
+
+def np_pcm_wav__to__text(np_pcm_wav: np.ndarray, sample_rate: int = 8000) -> str:
     """
-    Converts Linear PCM WAV (as opposed to mulaw) audio to text using SpeechRecognition (OpenAI Whisper).
+    Converts Linear PCM WAV (as opposed to mulaw) audio to text
+    with the process-wide speech-to-text backend (OpenAI Whisper by default).
     """
-    assert Path(wav_path).exists(), f"Expected {wav_path} to exist"
-    r = sr.Recognizer()
-    with sr.AudioFile(str(wav_path)) as source:
-        audio = r.record(source)
-    try:
-        # return r.recognize_google(audio)  # Use Google Speech Recognition engine
-        return r.recognize_whisper(audio)
-    except sr.UnknownValueError:
+    text: str = get_stt_backend().transcribe(np_pcm_wav, sample_rate=sample_rate).strip()
+    if not text:
         raise Exception("Speech recognition could not understand audio.")
-    except sr.RequestError as e:
-        raise Exception(f"Could not request results from SpeechRecognition service; {e}")
+    return text
+
+def np_pcm_wav__to__text_safe(np_pcm_wav: np.ndarray, sample_rate: int = 8000) -> str:
+    try:
+        return np_pcm_wav__to__text(np_pcm_wav, sample_rate=sample_rate)
+    except Exception:
+        logger.exception("Speech-to-text failed.")
+        return FALLBACK_CALLER_TEXT
+
+def np_pcm_wavs__to__texts(np_pcm_wavs: list[np.ndarray], sample_rate: int = 8000) -> list[str]:
+    """
+    The backend's transcripts of several utterances in one call, as they are
+    (a blank one stays blank, and errors are raised), for whoever applies the fallback.
+    """
+    texts: list[str] = get_stt_backend().transcribe_batch(np_pcm_wavs, sample_rate=sample_rate)
+    assert len(texts) == len(np_pcm_wavs), f"Expected {len(np_pcm_wavs)} texts, got {len(texts)}"
+    return texts
+
+def np_pcm_wavs__to__texts_safe(np_pcm_wavs: list[np.ndarray], sample_rate: int = 8000) -> list[str]:
+    """
+    `np_pcm_wav__to__text_safe` for several utterances in one backend call.
+    If the batch fails, each one is retried on its own, so one bad utterance
+    doesn't cost the others their transcripts.
+    """
+    try:
+        texts = np_pcm_wavs__to__texts(np_pcm_wavs, sample_rate=sample_rate)
+    except Exception:
+        logger.exception("Batched speech-to-text failed, retrying one by one.")
+        return [np_pcm_wav__to__text_safe(np_pcm_wav, sample_rate=sample_rate) for np_pcm_wav in np_pcm_wavs]
+    return [text.strip() or FALLBACK_CALLER_TEXT for text in texts]
+
+def voice_to_text(wav_path_or_bytes: str | Path | bytes) -> str:
+    """
+    Converts a Linear PCM WAV file (a path, or the file's bytes) to text.
+    """
+    import soundfile as sf
+    if isinstance(wav_path_or_bytes, bytes):
+        wav_file = io.BytesIO(wav_path_or_bytes)
+    else:
+        assert Path(wav_path_or_bytes).exists(), f"Expected {wav_path_or_bytes} to exist"
+        wav_file = str(wav_path_or_bytes)
+    audio_data, sample_rate = sf.read(wav_file, dtype="float32")
+    return np_pcm_wav__to__text(audio_data, sample_rate=sample_rate)
 
-def voice_to_text_safe(wav_path: str | Path) -> str:
+def voice_to_text_safe(wav_path_or_bytes: str | Path | bytes) -> str:
     try:
-        return voice_to_text(wav_path)
-    except Exception as e:
-        print(traceback.format_exc())
-        return "I'm sorry, I didn't get that. Will you try again?"
+        return voice_to_text(wav_path_or_bytes)
+    except Exception:
+        logger.exception("Speech-to-text failed.")
+        return FALLBACK_CALLER_TEXT
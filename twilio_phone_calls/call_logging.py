@@ -0,0 +1,144 @@
+"""
+Logging for the package, under the "twilio_phone_calls" logger.
+
+Each call logs through a `CallLoggerAdapter`, so its records carry the call's
+`stream_sid`, `call_sid` and `caller`. `enable_call_logging` hands records to a
+background thread through a queue: the event loop only enqueues them, and
+message formatting, tracebacks and the write itself happen on that thread.
+Repeated warnings are rate-limited before they're queued.
+
+Debug logging in hot paths is guarded by `logger.isEnabledFor(logging.DEBUG)`
+(a cached check), so it costs nothing more while disabled.
+"""
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from typing import Callable
+
+LOGGER_NAME = "twilio_phone_calls"
+CALL_FIELDS = ("stream_sid", "call_sid", "caller")
+DEFAULT_FORMAT = "%(asctime)s %(levelname)s %(name)s [%(stream_sid)s %(call_sid)s %(caller)s] %(message)s"
+
+class CallLoggerAdapter(logging.LoggerAdapter):
+    """
+    Adds one call's context to every record (as attributes, for formatters and handlers).
+    """
+    def __init__(self, logger: logging.Logger, stream_sid: str, call_sid: str, caller: str):
+        super().__init__(logger, {"stream_sid": stream_sid, "call_sid": call_sid, "caller": caller})
+
+    def process(self, msg, kwargs):
+        kwargs["extra"] = {**(self.extra or {}), **kwargs.get("extra", {})}
+        return msg, kwargs
+
+def get_call_logger(name: str, stream_sid: str, call_sid: str, caller: str) -> CallLoggerAdapter:
+    return CallLoggerAdapter(logging.getLogger(name), stream_sid, call_sid, caller)
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets through at most `burst` records per `interval_seconds` for each message
+    (by logger and format string, so the same warning from different calls counts together);
+    the next one let through says how many were dropped. Below `min_level`, everything passes.
+    """
+    def __init__(
+        self,
+        burst: int = 5,
+        interval_seconds: float = 60,
+        min_level: int = logging.WARNING,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__()
+        assert burst > 0, f"Expected a positive burst, got {burst=}"
+        self.burst = burst
+        self.interval_seconds = interval_seconds
+        self.min_level = min_level
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._windows: dict[tuple[str, str], list] = {} # Key -> [window start, passed, suppressed].
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.min_level:
+            return True
+        key = (record.name, str(record.msg))
+        now = self._clock()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval_seconds:
+                suppressed = window[2] if window is not None else 0
+                window = self._windows[key] = [now, 0, 0]
+            else:
+                suppressed = 0
+            if window[1] >= self.burst:
+                window[2] += 1
+                return False
+            window[1] += 1
+        if suppressed:
+            record.msg = f"{record.msg} ({suppressed} similar messages suppressed)"
+        return True
+
+def _fill_call_fields(record: logging.LogRecord) -> bool:
+    """
+    "-" for the call fields of records logged outside a call, so any handler can format them.
+    """
+    for field in CALL_FIELDS:
+        if not hasattr(record, field):
+            setattr(record, field, "-")
+    return True
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queues records as they are: unlike `QueueHandler`, leaves formatting to the listener's thread.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+_call_logging: tuple[logging.Handler, logging.handlers.QueueListener] | None = None
+_call_logging_lock = threading.Lock()
+
+def enable_call_logging(
+    level: int | str = logging.INFO,
+    handler: logging.Handler | None = None,
+    rate_limit: RateLimitFilter | None = None,
+) -> logging.handlers.QueueListener:
+    """
+    Log the package's records at `level` (e.g. `logging.INFO` or "INFO") and above to `handler`
+    (by default stderr, in `DEFAULT_FORMAT`) from a background thread, rate-limiting warnings with
+    `rate_limit`. Every record has the call fields (`CALL_FIELDS`), "-" outside a call.
+    Replaces any previous setup; returns the running listener.
+    """
+    if handler is None:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter(DEFAULT_FORMAT))
+    disable_call_logging()
+    global _call_logging
+    record_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _DeferredQueueHandler(record_queue)
+    queue_handler.addFilter(rate_limit if rate_limit is not None else RateLimitFilter())
+    queue_handler.addFilter(_fill_call_fields)
+    listener = logging.handlers.QueueListener(record_queue, handler, respect_handler_level=True)
+    package_logger = logging.getLogger(LOGGER_NAME)
+    with _call_logging_lock:
+        package_logger.setLevel(level)
+        package_logger.addHandler(queue_handler)
+        package_logger.propagate = False
+        listener.start()
+        _call_logging = (queue_handler, listener)
+    return listener
+
+def disable_call_logging() -> None:
+    """
+    Write out what's queued and go back to standard logging (warnings to stderr, through the root logger).
+    """
+    global _call_logging
+    package_logger = logging.getLogger(LOGGER_NAME)
+    with _call_logging_lock:
+        if _call_logging is None:
+            return
+        queue_handler, listener = _call_logging
+        package_logger.removeHandler(queue_handler)
+        package_logger.setLevel(logging.NOTSET)
+        package_logger.propagate = True
+        listener.stop()
+        _call_logging = None
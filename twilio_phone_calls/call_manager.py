@@ -0,0 +1,158 @@
+import asyncio
+import contextlib
+from typing import AsyncIterator, Awaitable, Callable, Iterable
+
+from .twilio_phone_call import TwilioPhoneCall
+from .audio.audio_executor import AudioExecutor, get_audio_executor
+from .audio.tts_cache import TtsCache, get_tts_cache
+from .audio.tts_engine import get_tts_backend, split_into_sentences, text__to__mulaw_bytes
+
+class CallManager:
+    """
+    The calls one worker process is carrying, with limits so that an overloaded
+    worker turns new callers away and asks current ones to hold,
+    instead of every caller waiting longer and longer.
+
+    - Past `max_concurrent_calls`, `start_call` answers with `busy_text` and returns None.
+    - At most `max_inflight_jobs` turns run speech-to-text / text-to-speech at once
+      (a turn has one such job in flight at a time). A turn that has to wait
+      first tells the caller `hold_text`, which `warm_up` puts in the TTS cache.
+
+    Calls are registered by both stream sid and call sid.
+    """
+    def __init__(
+        self,
+        max_concurrent_calls: int = 8,
+        max_inflight_jobs: int | None = None,
+        hold_text: str = "One moment, please.",
+        busy_text: str = "Sorry, all of our lines are busy right now. Please call back later.",
+        audio_executor: AudioExecutor | None = None,
+        tts_cache: TtsCache | None = None,
+    ):
+        self._audio_executor = audio_executor or get_audio_executor()
+        self._tts_cache = tts_cache if tts_cache is not None else get_tts_cache()
+        max_inflight_jobs = max_inflight_jobs or self._audio_executor.max_workers * 2
+        assert max_concurrent_calls > 0, f"Expected a positive number of calls, got {max_concurrent_calls=}"
+        assert max_inflight_jobs > 0, f"Expected a positive number of jobs, got {max_inflight_jobs=}"
+        self.max_concurrent_calls = max_concurrent_calls
+        self.max_inflight_jobs = max_inflight_jobs
+        self.hold_text = hold_text
+        self.busy_text = busy_text
+        self._calls_by_sid: dict[str, TwilioPhoneCall] = {}
+        self._calls: set[TwilioPhoneCall] = set()
+        self._inference_slots = asyncio.Semaphore(max_inflight_jobs)
+        self._inflight_jobs = 0
+        self.rejected_calls = 0
+        self.held_turns = 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def get_call(self, sid: str) -> TwilioPhoneCall | None:
+        """
+        By stream sid or call sid.
+        """
+        return self._calls_by_sid.get(sid)
+
+    @property
+    def inflight_jobs(self) -> int:
+        return self._inflight_jobs
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Jobs waiting for an audio worker (across every call on the executor).
+        """
+        return self._audio_executor.queue_depth
+
+    def is_full(self) -> bool:
+        return len(self) >= self.max_concurrent_calls
+
+    def is_overloaded(self) -> bool:
+        return self._inflight_jobs >= self.max_inflight_jobs
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "active_calls": len(self),
+            "max_concurrent_calls": self.max_concurrent_calls,
+            "inflight_jobs": self._inflight_jobs,
+            "max_inflight_jobs": self.max_inflight_jobs,
+            "queue_depth": self.queue_depth,
+            "running_jobs": self._audio_executor.running,
+            "rejected_calls": self.rejected_calls,
+            "held_turns": self.held_turns,
+        }
+
+    async def warm_up(self, texts: Iterable[str] = ()) -> None:
+        """
+        Synthesize the hold and busy prompts ahead of time, so shedding load costs no inference
+        (and `texts`, e.g. the greeting every call starts with).
+        """
+        tts_backend = await asyncio.to_thread(get_tts_backend)
+        for text in [self.hold_text, self.busy_text, *texts]:
+            for sentence in split_into_sentences(text): # Cached per sentence, the way calls look them up.
+                await self._tts_cache.get_or_synthesize_async(sentence, tts_backend, self._synthesize)
+
+    async def start_call(
+        self,
+        twilio_message: dict,
+        send_websocket_message_async_method: Callable[[str], Awaitable[None]],
+        text_to_text_async_method: Callable[[str], Awaitable[str]] | None = None,
+        **call_kwargs,
+    ) -> TwilioPhoneCall | None:
+        """
+        Create and register a call from its start message (`call_kwargs` go to `TwilioPhoneCall`).
+        Returns None if the worker is full; the caller has then been told `busy_text`
+        and the websocket can be closed.
+        """
+        phone_call = TwilioPhoneCall.from_start_message(
+            twilio_message,
+            send_websocket_message_async_method=send_websocket_message_async_method,
+            text_to_text_async_method=text_to_text_async_method,
+            audio_executor=self._audio_executor,
+            tts_cache=self._tts_cache,
+            call_manager=self,
+            **call_kwargs,
+        )
+        if self.is_full():
+            self.rejected_calls += 1
+            phone_call.logger.warning("Rejecting call, %d calls in progress.", len(self))
+            await phone_call.send_text_as_audio(self.busy_text)
+            return None
+        self._calls.add(phone_call)
+        self._calls_by_sid[phone_call.stream_sid] = phone_call
+        self._calls_by_sid[phone_call.call_sid] = phone_call
+        return phone_call
+
+    def end_call(self, phone_call: TwilioPhoneCall) -> None:
+        """
+        Unregister a call (e.g. when the websocket closes). Safe to call twice.
+        """
+        self._calls.discard(phone_call)
+        for sid in (phone_call.stream_sid, phone_call.call_sid):
+            if self._calls_by_sid.get(sid) is phone_call:
+                del self._calls_by_sid[sid]
+
+    @contextlib.asynccontextmanager
+    async def inference_slot(self, phone_call: TwilioPhoneCall, hold_prompt: bool = True) -> AsyncIterator[None]:
+        """
+        Held by a call while it transcribes a turn, and again while it speaks the answer
+        (without another hold prompt).
+        """
+        if hold_prompt and self.is_overloaded():
+            self.held_turns += 1
+            await phone_call.send_text_as_audio(self.hold_text)
+        async with self._inference_slots:
+            self._inflight_jobs += 1
+            try:
+                yield
+            finally:
+                self._inflight_jobs -= 1
+
+    # Private.
+
+    async def _synthesize(self, sentence: str) -> bytes:
+        """
+        Only the text goes to the executor, which may be a process pool.
+        """
+        return await self._audio_executor.run("call_manager", text__to__mulaw_bytes, sentence)
@@ -0,0 +1,181 @@
+import abc
+import bisect
+import collections
+import enum
+import threading
+import time
+
+class TurnStage(enum.Enum):
+    """
+    The moments in one conversational turn, in order.
+    `tts_first_chunk` is the first audio sent in the turn (a hold prompt, if there was one).
+    With a streaming text-to-text, `text_to_text_end` is when the first sentence of the answer was complete.
+    """
+    first_voiced_frame = "first_voiced_frame"
+    pause_detected = "pause_detected"
+    crop = "crop"
+    stt_start = "stt_start"
+    stt_end = "stt_end"
+    text_to_text_start = "text_to_text_start"
+    text_to_text_end = "text_to_text_end"
+    tts_first_chunk = "tts_first_chunk"
+    tts_last_chunk = "tts_last_chunk"
+    mark_acknowledged = "mark_acknowledged"
+
+# The latencies kept for every turn: name -> (from stage, to stage).
+TURN_LATENCIES: dict[str, tuple[TurnStage, TurnStage]] = {
+    "speech": (TurnStage.first_voiced_frame, TurnStage.pause_detected), # Includes the pause itself.
+    "crop": (TurnStage.pause_detected, TurnStage.crop),
+    "stt": (TurnStage.stt_start, TurnStage.stt_end),
+    "text_to_text": (TurnStage.text_to_text_start, TurnStage.text_to_text_end),
+    "tts": (TurnStage.tts_first_chunk, TurnStage.tts_last_chunk),
+    "playback": (TurnStage.tts_last_chunk, TurnStage.mark_acknowledged),
+    "time_to_first_audio": (TurnStage.pause_detected, TurnStage.tts_first_chunk),
+    "turn": (TurnStage.pause_detected, TurnStage.mark_acknowledged),
+}
+
+class TurnSpan:
+    """
+    When each stage of one turn of one call happened (`time.perf_counter()` seconds).
+    Stages that didn't happen (e.g. the caller hung up) are missing.
+    """
+    __slots__ = ("stream_sid", "turn_index", "timestamps")
+
+    def __init__(self, stream_sid: str, turn_index: int):
+        self.stream_sid = stream_sid
+        self.turn_index = turn_index
+        self.timestamps: dict[TurnStage, float] = {}
+
+    def mark(self, stage: TurnStage, timestamp: float | None = None) -> None:
+        self.timestamps[stage] = time.perf_counter() if timestamp is None else timestamp
+
+    def duration(self, start_stage: TurnStage, end_stage: TurnStage) -> float | None:
+        if start_stage not in self.timestamps or end_stage not in self.timestamps:
+            return None
+        return self.timestamps[end_stage] - self.timestamps[start_stage]
+
+    def durations(self) -> dict[str, float]:
+        """
+        The `TURN_LATENCIES` this turn has both ends of.
+        """
+        durations = {}
+        for name, (start_stage, end_stage) in TURN_LATENCIES.items():
+            duration = self.duration(start_stage, end_stage)
+            if duration is not None:
+                durations[name] = duration
+        return durations
+
+class InstrumentationSink(abc.ABC):
+    """
+    Where finished turns go. Subclass this to export them elsewhere
+    (override `on_stage` too for live tracing) and install it with `set_instrumentation_sink`.
+    """
+    def on_stage(self, span: TurnSpan, stage: TurnStage) -> None:
+        """
+        Called as each stage is marked, on the event loop: keep it cheap.
+        """
+
+    @abc.abstractmethod
+    def record_turn(self, span: TurnSpan) -> None:
+        ...
+
+class Histogram:
+    """
+    Prometheus-style bucket counts, plus the most recent `max_samples` values for percentiles.
+    """
+    default_buckets: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, buckets: tuple[float, ...] = default_buckets, max_samples: int = 10000):
+        self.buckets = tuple(sorted(buckets))
+        self.bucket_counts = [0] * (len(self.buckets) + 1) # The last one is +Inf.
+        self.count = 0
+        self.sum = 0.0
+        self._samples: collections.deque[float] = collections.deque(maxlen=max_samples)
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self._samples.append(value)
+
+    def percentile(self, q: float) -> float | None:
+        """
+        `q` in [0, 100], over the recent samples. None if there are none.
+        """
+        if not self._samples:
+            return None
+        samples = sorted(self._samples)
+        return samples[min(len(samples) - 1, int(q / 100 * len(samples)))]
+
+class InMemorySink(InstrumentationSink):
+    """
+    Keeps the last `max_spans` turns and a histogram per `TURN_LATENCIES` entry.
+    """
+    def __init__(self, max_spans: int = 1000):
+        self._lock = threading.Lock()
+        self._spans: collections.deque[TurnSpan] = collections.deque(maxlen=max_spans)
+        self.histograms: dict[str, Histogram] = {name: Histogram() for name in TURN_LATENCIES}
+
+    def record_turn(self, span: TurnSpan) -> None:
+        with self._lock:
+            self._spans.append(span)
+            for name, duration in span.durations().items():
+                self.histograms[name].observe(duration)
+
+    def spans(self, stream_sid: str | None = None) -> list[TurnSpan]:
+        """
+        The recent turns, optionally of one call only.
+        """
+        with self._lock:
+            return [span for span in self._spans if stream_sid is None or span.stream_sid == stream_sid]
+
+    def prometheus_text(self) -> str:
+        with self._lock:
+            return histograms__to__prometheus_text(self.histograms)
+
+def histograms__to__prometheus_text(
+    histograms: dict[str, Histogram],
+    metric_name: str = "twilio_phone_calls_turn_latency_seconds",
+) -> str:
+    """
+    The Prometheus text exposition format, one `stage` label per histogram.
+    """
+    lines = [
+        f"# HELP {metric_name} Latency of each stage of a conversational turn.",
+        f"# TYPE {metric_name} histogram",
+    ]
+    for name, histogram in histograms.items():
+        cumulative_count = 0
+        for upper_bound, bucket_count in zip(histogram.buckets + (float("inf"),), histogram.bucket_counts):
+            cumulative_count += bucket_count
+            le = "+Inf" if upper_bound == float("inf") else f"{upper_bound:g}"
+            lines.append(f'{metric_name}_bucket{{stage="{name}",le="{le}"}} {cumulative_count}')
+        lines.append(f'{metric_name}_sum{{stage="{name}"}} {histogram.sum:.6f}')
+        lines.append(f'{metric_name}_count{{stage="{name}"}} {histogram.count}')
+    return "\n".join(lines) + "\n"
+
+_instrumentation_sink: InstrumentationSink | None = None
+_instrumentation_sink_lock = threading.Lock()
+
+def get_instrumentation_sink() -> InstrumentationSink | None:
+    """
+    The process-wide sink, or None while instrumentation is disabled (the default).
+    """
+    with _instrumentation_sink_lock:
+        return _instrumentation_sink
+
+def set_instrumentation_sink(instrumentation_sink: InstrumentationSink | None) -> None:
+    """
+    Calls created afterwards report to `instrumentation_sink` (None disables instrumentation).
+    """
+    global _instrumentation_sink
+    with _instrumentation_sink_lock:
+        _instrumentation_sink = instrumentation_sink
+
+def enable_instrumentation() -> InMemorySink:
+    """
+    Install (and return) an in-memory sink.
+    """
+    in_memory_sink = InMemorySink()
+    set_instrumentation_sink(in_memory_sink)
+    return in_memory_sink
@@ -0,0 +1,112 @@
+from .twilio_pydantic.stream_media_frame import StreamMediaFrame
+from .audio.audio_conversions import TWILIO_FRAME_SIZE, TWILIO_SAMPLE_RATE
+
+def _payload_samples(payload: str) -> int:
+    """
+    Exact decoded length of a base64 payload (one mulaw byte per sample).
+    """
+    return len(payload) * 3 // 4 - payload.endswith("=") - payload.endswith("==")
+
+class JitterBuffer:
+    """
+    Puts one call's inbound media frames back in order (by `chunk`) before they reach the
+    audio buffer, so endpointing counts media time rather than arrival order.
+
+    In-order frames pass straight through. A frame that arrives ahead of a missing one waits
+    for it, for up to `depth_frames` newer frames; after that the missing audio counts as lost
+    and is filled with silence (sized from the `timestamp`s on either side, at most `max_silence_ms`).
+    Frames arriving after their place was filled (or twice) are dropped and counted as late.
+    """
+    def __init__(self, depth_frames: int = 3, max_silence_ms: int = 1000, sample_rate: int = TWILIO_SAMPLE_RATE):
+        assert depth_frames >= 0, f"Expected a non-negative depth, got {depth_frames=}"
+        self.depth_frames = depth_frames
+        self.max_silence_samples = max_silence_ms * sample_rate // 1000
+        self.sample_rate = sample_rate
+        self._pending: dict[int, StreamMediaFrame] = {}
+        self._next_chunk: int | None = None
+        self._newest_chunk = 0
+        self._media_time_ms: float | None = None # Where the audio released so far ends.
+        self.received_frames = 0
+        self.reordered_frames = 0 # Arrived after a newer one, in time to be put back in place.
+        self.late_frames = 0
+        self.lost_frames = 0
+        self.filled_samples = 0
+
+    @property
+    def pending_frames(self) -> int:
+        return len(self._pending)
+
+    @property
+    def media_time_ms(self) -> float | None:
+        """
+        The stream's clock at the end of the audio released so far (None before the first frame).
+        """
+        return self._media_time_ms
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "received_frames": self.received_frames,
+            "reordered_frames": self.reordered_frames,
+            "late_frames": self.late_frames,
+            "lost_frames": self.lost_frames,
+            "filled_samples": self.filled_samples,
+        }
+
+    def push(self, stream_media_frame: StreamMediaFrame) -> list[StreamMediaFrame | int]:
+        """
+        What can be played out now, in order: frames, and (as ints) samples of silence for lost ones.
+        """
+        self.received_frames += 1
+        chunk = int(stream_media_frame.chunk)
+        if self._next_chunk is None:
+            self._next_chunk = self._newest_chunk = chunk
+        if chunk < self._next_chunk or chunk in self._pending:
+            self.late_frames += 1
+            return []
+        if chunk < self._newest_chunk:
+            self.reordered_frames += 1
+        self._newest_chunk = max(self._newest_chunk, chunk)
+        self._pending[chunk] = stream_media_frame
+        if chunk == self._next_chunk: # The usual case: nothing to wait for.
+            if len(self._pending) == 1:
+                del self._pending[chunk]
+                self._release(stream_media_frame)
+                return [stream_media_frame]
+        released: list[StreamMediaFrame | int] = []
+        while self._pending:
+            if self._next_chunk not in self._pending:
+                if len(self._pending) < self.depth_frames:
+                    break # Still worth waiting for.
+                next_frame_chunk = min(self._pending)
+                silence_samples = self._silence_samples(self._pending[next_frame_chunk], next_frame_chunk)
+                self.lost_frames += next_frame_chunk - self._next_chunk
+                self.filled_samples += silence_samples
+                if silence_samples:
+                    released.append(silence_samples)
+                self._next_chunk = next_frame_chunk
+            released_frame = self._pending.pop(self._next_chunk)
+            self._release(released_frame)
+            released.append(released_frame)
+        return released
+
+    # Private.
+
+    def _release(self, stream_media_frame: StreamMediaFrame) -> None:
+        assert self._next_chunk is not None # Set by the first `push`.
+        self._next_chunk += 1
+        self._media_time_ms = int(stream_media_frame.timestamp) \
+            + _payload_samples(stream_media_frame.payload) * 1000 / self.sample_rate
+
+    def _silence_samples(self, stream_media_frame: StreamMediaFrame, chunk: int) -> int:
+        """
+        The audio missing before `stream_media_frame`: by its timestamp when it's sensible,
+        otherwise a standard frame per missing chunk.
+        """
+        assert self._next_chunk is not None
+        missing_frames = chunk - self._next_chunk
+        silence_samples = missing_frames * TWILIO_FRAME_SIZE
+        if self._media_time_ms is not None:
+            gap_ms = int(stream_media_frame.timestamp) - self._media_time_ms
+            if gap_ms > 0:
+                silence_samples = round(gap_ms * self.sample_rate / 1000)
+        return min(silence_samples, self.max_silence_samples)
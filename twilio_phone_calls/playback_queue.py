@@ -0,0 +1,105 @@
+import collections
+import mmap
+from typing import Awaitable, Callable, NamedTuple
+
+from .twilio_pydantic.outgoing_message_encoder import OutgoingMessageEncoder
+from .audio.audio_conversions import TWILIO_SAMPLE_RATE, mulaw_bytes__to__twilio_mulaw_strs
+
+class _PendingMark(NamedTuple):
+    name: str
+    played_bytes: int # What the caller will have heard once this mark is echoed.
+    cleared: bool
+
+class PlaybackQueue:
+    """
+    The audio going out to one caller, as fixed-size media messages each followed
+    by a numbered mark, so we know how much they have actually heard:
+    Twilio echoes each mark back once the audio before it has played.
+
+    After `clear`, Twilio drops the buffered audio and echoes the outstanding marks
+    right away; those don't count as played.
+    """
+    mark_prefix: str = "audio-"
+
+    def __init__(
+        self,
+        send_websocket_message_async_method: Callable[[str], Awaitable[None]],
+        message_encoder: OutgoingMessageEncoder,
+    ):
+        self._send_websocket_message_async_method = send_websocket_message_async_method
+        self._message_encoder = message_encoder
+        self._pending_marks: collections.deque[_PendingMark] = collections.deque()
+        self._mark_count = 0
+        self._sent_bytes = 0
+        self._queued_bytes = 0 # `_played_bytes` plus what's still buffered at Twilio.
+        self._played_bytes = 0
+        self.interrupted_at_seconds: float | None = None
+
+    @property
+    def pending_marks(self) -> int:
+        """
+        Marks sent but not echoed back yet (cleared ones included, until Twilio echoes them).
+        """
+        return len(self._pending_marks)
+
+    @property
+    def sent_seconds(self) -> float:
+        """
+        Everything sent on this call, played or not.
+        """
+        return self._sent_bytes / TWILIO_SAMPLE_RATE
+
+    @property
+    def played_seconds(self) -> float:
+        """
+        Everything the caller has heard on this call, as of the last acknowledged mark.
+        """
+        return self._played_bytes / TWILIO_SAMPLE_RATE
+
+    def is_playing(self) -> bool:
+        return any(not pending_mark.cleared for pending_mark in self._pending_marks)
+
+    async def send_audio(self, mulaw_bytes: bytes | mmap.mmap, chunk_size: int) -> None:
+        """
+        `chunk_size` bytes (samples) per media message, each followed by a numbered mark.
+        """
+        unsent_bytes = len(mulaw_bytes)
+        for twilio_mulaw_str in mulaw_bytes__to__twilio_mulaw_strs(mulaw_bytes, chunk_size):
+            await self._send_websocket_message_async_method(
+                self._message_encoder.media_message_json(twilio_mulaw_str)
+            )
+            self._sent_bytes += min(chunk_size, unsent_bytes)
+            self._queued_bytes += min(chunk_size, unsent_bytes)
+            unsent_bytes -= chunk_size
+            self._mark_count += 1
+            await self.send_mark(f"{self.mark_prefix}{self._mark_count}")
+
+    async def send_mark(self, name: str) -> None:
+        self._pending_marks.append(_PendingMark(name, self._queued_bytes, cleared=False))
+        await self._send_websocket_message_async_method(self._message_encoder.mark_message_json(name))
+
+    def on_mark(self, name: str) -> None:
+        """
+        Twilio echoed the mark `name`. Marks come back in order, so everything before it is done too.
+        Unknown names are ignored.
+        """
+        if all(pending_mark.name != name for pending_mark in self._pending_marks):
+            return
+        while True:
+            pending_mark = self._pending_marks.popleft()
+            if not pending_mark.cleared:
+                self._played_bytes = pending_mark.played_bytes
+            if pending_mark.name == name:
+                return
+
+    async def clear(self) -> None:
+        """
+        Stop playback now (the caller is talking over us).
+        """
+        if self.is_playing():
+            self.interrupted_at_seconds = self.played_seconds
+        self._pending_marks = collections.deque(
+            pending_mark._replace(cleared=True) for pending_mark in self._pending_marks
+        )
+        self._queued_bytes = self._played_bytes
+        await self._send_websocket_message_async_method(self._message_encoder.clear_message_json)
@@ -0,0 +1,13 @@
+from .audio.stt_engine import get_stt_backend
+from .audio.tts_engine import get_tts_backend
+
+def preload(stt: bool = True, tts: bool = True) -> None:
+    """
+    Load the speech models now instead of during the first caller's first turn.
+    Importing `twilio_phone_calls` loads nothing; call this at server startup for eager warm-up.
+    Blocking, and safe to call from several threads.
+    """
+    if stt:
+        get_stt_backend().load()
+    if tts:
+        get_tts_backend().load()
@@ -0,0 +1,346 @@
+"""
+A ready-made server for Twilio calls: the TwiML route Twilio's voice webhook posts to,
+and the `/stream` websocket Twilio then opens, each call handled by a `TwilioPhoneCall`.
+
+    python -m twilio_phone_calls.serve [--port 8000] [--workers 4] [--text-to-text mymodule:answer]
+
+The websocket URL in the TwiML defaults to this server's own host (as the webhook reached it);
+set `--public-url wss://<host>/stream` if Twilio has to go another way.
+On SIGTERM / Ctrl-C, each worker turns new calls away and lets its calls in progress finish
+(for up to `--drain-seconds`) before shutting down; the same signal again skips the wait.
+"""
+import argparse
+import asyncio
+import contextlib
+import importlib
+import json
+import logging
+import os
+import signal
+import threading
+import time
+from types import FrameType
+from typing import Awaitable, Callable
+from urllib.parse import parse_qs
+
+import uvicorn
+from fastapi import FastAPI, Request, WebSocket
+from fastapi.responses import Response
+
+from .call_logging import enable_call_logging
+from .call_manager import CallManager
+from .twilio_phone_call import TwilioPhoneCall
+from .twilio_voice_response import create_twilio_voice_response
+from .twilio_pydantic.stream_events_enum import StreamEventsEnum
+from .twilio_pydantic.stream_media_frame import parse_stream_media_frame
+
+try:
+    import orjson
+    _json_loads: Callable[[str | bytes], dict] = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+_OPTIONS_ENVIRONMENT_VARIABLE = "TWILIO_PHONE_CALLS_SERVE_OPTIONS" # How `main` configures its worker processes.
+_EXIT_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+
+logger = logging.getLogger(__name__)
+
+class WebSocketSender:
+    """
+    The outgoing messages of one connection, written in order by one task through a bounded queue.
+    Senders wait while the queue is full, so a slow connection slows down its own call
+    (instead of its messages piling up in memory); if it stays full for `send_timeout_seconds`,
+    the other end has stopped reading, and sending fails with `ConnectionError`.
+    """
+    def __init__(
+        self,
+        send_text_async_method: Callable[[str], Awaitable[None]],
+        max_queued_messages: int = 64,
+        send_timeout_seconds: float = 10,
+    ):
+        assert max_queued_messages > 0, f"Expected a positive queue size, got {max_queued_messages=}"
+        self._send_text_async_method = send_text_async_method
+        self._queue: asyncio.Queue[str | None] = asyncio.Queue(max_queued_messages)
+        self.send_timeout_seconds = send_timeout_seconds
+        self._writer_task: asyncio.Task | None = None
+        self.sent_messages = 0
+
+    @property
+    def queued_messages(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        self._writer_task = asyncio.create_task(self._write())
+
+    async def send(self, text: str) -> None:
+        if self._writer_task is None or self._writer_task.done():
+            raise ConnectionError("The websocket is closed")
+        try:
+            await asyncio.wait_for(self._queue.put(text), self.send_timeout_seconds)
+        except asyncio.TimeoutError:
+            self._writer_task.cancel()
+            raise ConnectionError(f"The websocket hasn't taken a message in {self.send_timeout_seconds}s") from None
+
+    async def close(self) -> None:
+        """
+        Send what's queued (within `send_timeout_seconds`), then stop.
+        """
+        if self._writer_task is None:
+            return
+        if not self._writer_task.done():
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._queue.put(None), self.send_timeout_seconds)
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(asyncio.shield(self._writer_task), self.send_timeout_seconds)
+        self._writer_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError, Exception):
+            await self._writer_task
+
+    # Private.
+
+    async def _write(self) -> None:
+        while (text := await self._queue.get()) is not None:
+            await self._send_text_async_method(text)
+            self.sent_messages += 1
+
+async def parrot(caller_text: str) -> str:
+    """
+    The default text-to-text function: repeats what the caller said.
+    """
+    return caller_text.strip()
+
+def create_app(
+    text_to_text_async_method: Callable[[str], Awaitable[str]] | None = parrot,
+    public_url: str | None = None,
+    greeting: str | None = "Hey! How can I help you?",
+    call_manager: CallManager | None = None,
+    max_queued_messages: int = 64,
+    send_timeout_seconds: float = 10,
+    drain_seconds: float = 60,
+    **call_kwargs,
+) -> FastAPI:
+    """
+    A FastAPI app with the TwiML route (`POST /`), the media stream (`/stream`) and call stats (`GET /calls`).
+    `public_url` is the websocket URL given to Twilio (by default, this host's `/stream`).
+    Each call says `greeting` (if any) and answers with `text_to_text_async_method`
+    (None to stream answers with a `text_to_text_stream_async_method` in `call_kwargs`);
+    `call_kwargs` go to each `TwilioPhoneCall`.
+
+    Run by a server (e.g. uvicorn) in the main thread, the app holds back its SIGINT / SIGTERM
+    handling until the calls in progress have ended (at most `drain_seconds`), turning new ones away.
+    """
+    call_manager = call_manager if call_manager is not None else CallManager()
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app: FastAPI):
+        try:
+            await call_manager.warm_up([greeting] if greeting else [])
+        except Exception: # E.g. no network for the TTS backend: calls synthesize as they go.
+            logger.exception("TTS cache warm-up failed, starting with a cold cache.")
+        with _drain_before_exit(app, drain_seconds):
+            yield
+
+    app = FastAPI(lifespan=lifespan)
+    app.state.call_manager = call_manager
+    app.state.draining = False
+
+    @app.post("/")
+    async def voice_webhook(request: Request) -> Response:
+        if app.state.draining:
+            return Response(status_code=503) # Twilio tries the fallback URL, if there is one.
+        # Twilio posts a urlencoded form; parsed here rather than with python-multipart.
+        form_data = parse_qs((await request.body()).decode("utf-8"))
+        websocket_url = public_url or f"wss://{request.headers.get('host', request.url.netloc)}/stream"
+        voice_response = create_twilio_voice_response(
+            caller_number=form_data.get("Caller", [""])[0],
+            websocket_url=websocket_url,
+        )
+        return Response(content=voice_response.to_xml(), media_type="application/xml")
+
+    @app.get("/calls")
+    async def calls() -> dict[str, int]:
+        return call_manager.stats()
+
+    @app.websocket("/stream")
+    async def stream(websocket: WebSocket) -> None:
+        if app.state.draining:
+            await websocket.close(code=1013) # Try again later.
+            return
+        await websocket.accept()
+        websocket_sender = WebSocketSender(websocket.send_text, max_queued_messages, send_timeout_seconds)
+        websocket_sender.start()
+        phone_call: TwilioPhoneCall | None = None
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                twilio_json = message.get("text") or message.get("bytes")
+                if twilio_json is None:
+                    continue # Neither text nor bytes: nothing to parse.
+                if phone_call is not None:
+                    # Fast path for the audio frames, which are almost all of the traffic.
+                    stream_media_frame = parse_stream_media_frame(twilio_json)
+                    if stream_media_frame is not None:
+                        await phone_call.receive_media_frame(stream_media_frame)
+                        continue
+                twilio_message = _json_loads(twilio_json)
+                event = twilio_message["event"]
+                if event == StreamEventsEnum.stop.value:
+                    break
+                if phone_call is not None:
+                    await phone_call.receive_twilio_message(twilio_message)
+                elif event == StreamEventsEnum.start.value:
+                    phone_call = await call_manager.start_call(
+                        twilio_message,
+                        send_websocket_message_async_method=websocket_sender.send,
+                        text_to_text_async_method=text_to_text_async_method,
+                        **call_kwargs,
+                    )
+                    if phone_call is None:
+                        break # Busy; the caller has been told.
+                    if greeting:
+                        phone_call.speak(greeting) # The caller can talk over it.
+        finally:
+            if phone_call is not None:
+                call_manager.end_call(phone_call)
+                if phone_call.turn_task is not None:
+                    phone_call.turn_task.cancel()
+            await websocket_sender.close()
+            with contextlib.suppress(Exception): # Already closed by the other end.
+                await websocket.close()
+
+    return app
+
+async def drain_calls(call_manager: CallManager, timeout_seconds: float, poll_seconds: float = 0.5) -> int:
+    """
+    Wait (at most `timeout_seconds`) for the calls in progress to end. Returns how many are left.
+    """
+    deadline = time.monotonic() + timeout_seconds
+    while len(call_manager) and time.monotonic() < deadline:
+        await asyncio.sleep(min(poll_seconds, max(0.0, deadline - time.monotonic())))
+    return len(call_manager)
+
+def app_from_environment() -> FastAPI:
+    """
+    The app factory each worker process runs, configured by `main` (through the environment).
+    """
+    options = json.loads(os.environ.get(_OPTIONS_ENVIRONMENT_VARIABLE, "{}"))
+    enable_call_logging(options.get("log_level", "INFO"))
+    if options.get("tts_backend", "default") != "default":
+        from .audio.tts_engine import GttsTtsBackend, ToneTtsBackend, set_tts_backend
+        set_tts_backend({"gtts": GttsTtsBackend, "tone": ToneTtsBackend}[options["tts_backend"]]())
+    if options.get("stt_address") or options.get("tts_address"):
+        from .audio.remote_backends import enable_remote_inference
+        enable_remote_inference(stt_address=options.get("stt_address"), tts_address=options.get("tts_address"))
+    text_to_text_async_method = parrot
+    if options.get("text_to_text"):
+        module_name, _, function_name = options["text_to_text"].partition(":")
+        assert function_name, f"Expected <module>:<function>, got {options['text_to_text']=}"
+        text_to_text_async_method = getattr(importlib.import_module(module_name), function_name)
+    return create_app(
+        text_to_text_async_method,
+        public_url=options.get("public_url"),
+        greeting=options.get("greeting", "Hey! How can I help you?"),
+        call_manager=CallManager(max_concurrent_calls=options.get("max_concurrent_calls", 8)),
+        max_queued_messages=options.get("max_queued_messages", 64),
+        send_timeout_seconds=options.get("send_timeout_seconds", 10),
+        drain_seconds=options.get("drain_seconds", 60),
+    )
+
+# Private.
+
+@contextlib.contextmanager
+def _drain_before_exit(app: FastAPI, drain_seconds: float):
+    """
+    Wraps the current SIGINT / SIGTERM handlers (e.g. uvicorn's, which close every websocket at once):
+    the first signal starts draining `app`, and the wrapped handler runs once its calls have ended.
+    The same signal a second time runs it right away.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        yield # Signals can only be handled in the main thread.
+        return
+    loop = asyncio.get_running_loop()
+    previous_handlers = {}
+    drain_tasks: set[asyncio.Task] = set()
+    received_signals: set[int] = set()
+
+    def exit_after(signum: int, frame: FrameType | None) -> None:
+        previous_handler = previous_handlers[signum]
+        if callable(previous_handler):
+            previous_handler(signum, frame)
+        else: # The default action (or none), as if this handler weren't here.
+            signal.signal(signum, previous_handler)
+            signal.raise_signal(signum)
+
+    async def drain_then_exit(signum: int, frame: FrameType | None) -> None:
+        left_calls = await drain_calls(app.state.call_manager, drain_seconds)
+        if left_calls:
+            logger.warning("Hanging up on %d calls still in progress.", left_calls)
+        exit_after(signum, frame)
+
+    def handle_exit_signal(signum: int, frame: FrameType | None) -> None:
+        if signum in received_signals:
+            exit_after(signum, frame)
+            return
+        received_signals.add(signum)
+        if app.state.draining:
+            return # Already draining (e.g. a SIGINT, then the supervisor's SIGTERM).
+        app.state.draining = True
+        logger.info("Draining %d calls before exiting.", len(app.state.call_manager))
+        loop.call_soon_threadsafe(start_draining, signum, frame) # Wakes the loop, wherever the signal landed.
+
+    def start_draining(signum: int, frame: FrameType | None) -> None:
+        drain_task = loop.create_task(drain_then_exit(signum, frame))
+        drain_tasks.add(drain_task)
+        drain_task.add_done_callback(drain_tasks.discard)
+
+    for signum in _EXIT_SIGNALS:
+        previous_handlers[signum] = signal.signal(signum, handle_exit_signal)
+    try:
+        yield
+    finally:
+        for signum, previous_handler in previous_handlers.items():
+            signal.signal(signum, previous_handler)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Answer Twilio calls.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1, help="Processes, each with its own calls.")
+    parser.add_argument("--public-url", help="The websocket URL for Twilio (default: wss://<this host>/stream).")
+    parser.add_argument("--text-to-text", help="<module>:<async function> answering the caller (default: repeat them).")
+    parser.add_argument("--greeting", default="Hey! How can I help you?")
+    parser.add_argument("--max-concurrent-calls", type=int, default=8, help="Per worker.")
+    parser.add_argument("--max-queued-messages", type=int, default=64, help="Outgoing, per connection.")
+    parser.add_argument("--send-timeout-seconds", type=float, default=10)
+    parser.add_argument("--drain-seconds", type=float, default=60, help="How long calls get to finish on shutdown.")
+    parser.add_argument("--stt-address", help="An inference server for speech-to-text (see audio/inference_server.py).")
+    parser.add_argument("--tts-address", help="An inference server for text-to-speech.")
+    parser.add_argument("--tts-backend", choices=["default", "gtts", "tone"], default="default", help="tone: offline, for trying it out.")
+    parser.add_argument("--log-level", choices=["DEBUG", "INFO", "WARNING", "ERROR"], default="INFO")
+    args = parser.parse_args()
+    os.environ[_OPTIONS_ENVIRONMENT_VARIABLE] = json.dumps({
+        "public_url": args.public_url,
+        "text_to_text": args.text_to_text,
+        "greeting": args.greeting,
+        "max_concurrent_calls": args.max_concurrent_calls,
+        "max_queued_messages": args.max_queued_messages,
+        "send_timeout_seconds": args.send_timeout_seconds,
+        "stt_address": args.stt_address,
+        "tts_address": args.tts_address,
+        "tts_backend": args.tts_backend,
+        "drain_seconds": args.drain_seconds,
+        "log_level": args.log_level,
+    })
+    uvicorn.run(
+        "twilio_phone_calls.serve:app_from_environment",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        ws_per_message_deflate=False, # Twilio doesn't compress, and it costs memory per connection.
+    )
+
+if __name__ == "__main__":
+    main()
@@ -1,47 +1,146 @@
-import traceback
-from typing import Callable, Awaitable
+import asyncio
+import contextlib
+import json
+import logging
+import mmap
+import time
+from typing import TYPE_CHECKING, Any, AsyncContextManager, AsyncIterator, Callable, Awaitable, Coroutine, Iterable
 
 import numpy as np
-import torch
 
 from .twilio_pydantic.stream_events_enum import StreamEventsEnum
 from .twilio_pydantic.stream_start_message import StreamStartMessage
-from .twilio_pydantic.stream_media_message import StreamMediaMessage
-from .twilio_pydantic.outgoing_media_message import OutgoingMediaMessage
-from .twilio_pydantic.outgoing_mark_message import OutgoingMarkMessage
-from .twilio_pydantic.outgoing_clear_message import OutgoingClearMessage
+from .twilio_pydantic.stream_media_frame import StreamMediaFrame, parse_stream_media_frame
+from .twilio_pydantic.outgoing_message_encoder import OutgoingMessageEncoder
+from .playback_queue import PlaybackQueue
+from .call_logging import CallLoggerAdapter, get_call_logger
+from .jitter_buffer import JitterBuffer
 from .audio.audio_sample_buffer import AudioSampleBuffer
-from .audio.voice_to_text import voice_to_text_safe
-from .audio.text_to_voice import text__to__wav_filepath
-from .audio.tmp_file_path import TmpFilePath
+from .audio.vad import EndpointingConfig, VoiceActivityDetector
+from .instrumentation import InstrumentationSink, TurnSpan, TurnStage, get_instrumentation_sink
+from .audio.audio_executor import AudioExecutor, get_audio_executor
+from .audio.voice_to_text import FALLBACK_CALLER_TEXT, np_pcm_wav__to__text_safe
+from .audio.streaming_transcriber import StreamingTranscriber
+from .audio.stt_batcher import SttBatcher, get_stt_batcher
+from .audio.tts_batcher import TtsBatcher, get_tts_batcher
+from .audio.tts_engine import (
+    get_tts_backend,
+    get_tts_backend_nowait,
+    split_into_sentences,
+    split_off_sentences,
+    text__to__mulaw_bytes,
+)
+from .audio.tts_cache import TtsCache, get_tts_cache
 from .audio.audio_conversions import (
-    text__to__mp3,
-    mp3_filepath__to__twilio_mulaw_str,
-    twilio_mulaw_str__to__np_pcm_wav,
-    np_pcm_wav__to__wav_filepath,
-    wav_filepath__to__np_pcm_wav,
-    np_pcm_wav__to__twilio_mulaw_str,
+    TWILIO_FRAME_SIZE,
+    TWILIO_SAMPLE_RATE,
+    twilio_mulaw_str__into__np_pcm_wav,
+    twilio_mulaw_str__max_samples,
 )
 
+if TYPE_CHECKING:
+    from .call_manager import CallManager
+
 class TwilioPhoneCall:
+    outgoing_chunk_size: int = TWILIO_FRAME_SIZE * 20 # 400ms of audio per outgoing media message.
+
     def __init__(
         self,
         start_message: StreamStartMessage,
         send_websocket_message_async_method: Callable[[str], Awaitable[None]],
-        text_to_text_async_method: Callable[[str], Awaitable[str]],
+        text_to_text_async_method: Callable[[str], Awaitable[str]] | None = None,
+        audio_executor: AudioExecutor | None = None,
+        tts_cache: TtsCache | None = None,
+        streaming_transcription: bool = False,
+        partial_transcript_async_method: Callable[[str], Awaitable[None]] | None = None,
+        vad: VoiceActivityDetector | None = None,
+        endpointing: EndpointingConfig | None = None,
+        call_manager: "CallManager | None" = None,
+        instrumentation_sink: InstrumentationSink | None = None,
+        stt_batcher: SttBatcher | None = None,
+        tts_batcher: TtsBatcher | None = None,
+        text_to_text_stream_async_method: Callable[[str], AsyncIterator[str]] | None = None,
+        jitter_buffer: JitterBuffer | None = None,
     ):
+        """
+        Speech-to-text and text-to-speech run on `audio_executor`
+        (the process-wide one by default) so they don't block the event loop.
+        Synthesized sentences are reused from `tts_cache` (also process-wide by default).
+
+        With `streaming_transcription` (implied by `partial_transcript_async_method`),
+        the caller is transcribed while still speaking, partial transcripts go to
+        `partial_transcript_async_method`, and only the tail is left once they pause.
+
+        `vad` (one instance per call) decides what is speech, and `endpointing` how long
+        a pause ends the caller's turn; by default, the original fixed thresholds.
+
+        A `call_manager` (see `CallManager.start_call`) limits how many turns
+        across calls transcribe and answer at once.
+
+        Each turn is timed stage by stage (see `TurnStage`) and reported to
+        `instrumentation_sink` (the process-wide one by default; none unless enabled).
+
+        With an `stt_batcher` (the process-wide one by default; none unless enabled),
+        utterances are transcribed in batches with other calls' (not with `streaming_transcription`).
+        Likewise with a `tts_batcher`, sentences are synthesized in batches.
+
+        Each turn (transcribe, answer, speak) runs in the background, so incoming audio keeps
+        being processed; if the caller starts talking again, the turn is cancelled wherever it is,
+        and what they had said carries over into the next turn (unless an answer had started).
+        With `text_to_text_stream_async_method` (an async iterator of tokens, given instead of
+        `text_to_text_async_method`), each sentence of the answer is spoken as soon as it's complete.
+
+        Inbound frames are reordered and their gaps filled by `jitter_buffer` (one per call;
+        a default `JitterBuffer` unless given).
+        """
         assert start_message.event == StreamEventsEnum.start.value
+        assert (text_to_text_async_method is None) != (text_to_text_stream_async_method is None), \
+            "Expected exactly one of text_to_text_async_method and text_to_text_stream_async_method"
         self.start_message = start_message
         self._send_websocket_message_async_method = send_websocket_message_async_method
         self._text_to_text_async_method = text_to_text_async_method
-        self._audio_buffer = AudioSampleBuffer()
+        self._text_to_text_stream_async_method = text_to_text_stream_async_method
+        self._audio_executor = audio_executor or get_audio_executor()
+        self._tts_cache = tts_cache if tts_cache is not None else get_tts_cache()
+        self._logger = get_call_logger(__name__, self.stream_sid, self.call_sid, self.caller)
+        self._message_encoder = OutgoingMessageEncoder(self.stream_sid)
+        self._playback = PlaybackQueue(send_websocket_message_async_method, self._message_encoder)
+        self._turn_task: asyncio.Task | None = None
+        self._unanswered_transcriptions: list[asyncio.Task[str]] = []
+        self._jitter_buffer = jitter_buffer or JitterBuffer()
+        self._vad = vad
+        self._endpointing = endpointing
+        self._call_manager = call_manager
+        self._audio_buffer = self._new_audio_buffer()
+        self._streaming_transcription = streaming_transcription or partial_transcript_async_method is not None
+        self._partial_transcript_async_method = partial_transcript_async_method
+        self._streaming_transcriber = self._new_streaming_transcriber()
+        self._instrumentation_sink = instrumentation_sink if instrumentation_sink is not None \
+            else get_instrumentation_sink()
+        self._turn_span: TurnSpan | None = None
+        self._turn_count = 0
+        self._turn_awaiting_ack = False
+        self._stt_batcher = stt_batcher if stt_batcher is not None else get_stt_batcher()
+        self._tts_batcher = tts_batcher if tts_batcher is not None else get_tts_batcher()
 
     @classmethod
     def from_start_message(
         cls,
         twilio_message: dict,
         send_websocket_message_async_method: Callable[[str], Awaitable[None]],
-        text_to_text_async_method: Callable[[str], Awaitable[str]],
+        text_to_text_async_method: Callable[[str], Awaitable[str]] | None = None,
+        audio_executor: AudioExecutor | None = None,
+        tts_cache: TtsCache | None = None,
+        streaming_transcription: bool = False,
+        partial_transcript_async_method: Callable[[str], Awaitable[None]] | None = None,
+        vad: VoiceActivityDetector | None = None,
+        endpointing: EndpointingConfig | None = None,
+        call_manager: "CallManager | None" = None,
+        instrumentation_sink: InstrumentationSink | None = None,
+        stt_batcher: SttBatcher | None = None,
+        tts_batcher: TtsBatcher | None = None,
+        text_to_text_stream_async_method: Callable[[str], AsyncIterator[str]] | None = None,
+        jitter_buffer: JitterBuffer | None = None,
     ):
         assert twilio_message["event"] == StreamEventsEnum.start.value, \
             f"Expected start message, got {twilio_message['event']=}"
@@ -49,6 +148,18 @@ class TwilioPhoneCall:
             start_message=StreamStartMessage.model_validate(twilio_message),
             send_websocket_message_async_method=send_websocket_message_async_method,
             text_to_text_async_method=text_to_text_async_method,
+            audio_executor=audio_executor,
+            tts_cache=tts_cache,
+            streaming_transcription=streaming_transcription,
+            partial_transcript_async_method=partial_transcript_async_method,
+            vad=vad,
+            endpointing=endpointing,
+            call_manager=call_manager,
+            instrumentation_sink=instrumentation_sink,
+            stt_batcher=stt_batcher,
+            tts_batcher=tts_batcher,
+            text_to_text_stream_async_method=text_to_text_stream_async_method,
+            jitter_buffer=jitter_buffer,
         )
 
     @property
@@ -59,6 +170,35 @@ class TwilioPhoneCall:
     def stream_sid(self) -> str:
         return self.start_message.streamSid
 
+    @property
+    def call_sid(self) -> str:
+        return self.start_message.start.callSid
+
+    @property
+    def logger(self) -> CallLoggerAdapter:
+        """
+        Logs with this call's stream sid, call sid and caller attached.
+        """
+        return self._logger
+
+    @property
+    def playback(self) -> PlaybackQueue:
+        """
+        How much of what was sent the caller has heard (and where they interrupted).
+        """
+        return self._playback
+
+    async def receive_twilio_text(self, twilio_json: str | bytes) -> None:
+        """
+        Like `receive_twilio_message`, but for the raw websocket text.
+        Media frames skip `json.loads` and pydantic entirely.
+        """
+        stream_media_frame = parse_stream_media_frame(twilio_json)
+        if stream_media_frame is not None:
+            await self.receive_media_frame(stream_media_frame)
+        else:
+            await self.receive_twilio_message(json.loads(twilio_json))
+
     async def receive_twilio_message(self, twilio_message: dict) -> None:
         """
         This message determines whether this is a media or mark message
@@ -66,83 +206,280 @@ class TwilioPhoneCall:
         in JSON-string format.
         """
         if twilio_message["event"] == StreamEventsEnum.media.value:
-            await self._receive_media_message(StreamMediaMessage.model_validate(twilio_message))
+            await self.receive_media_frame(StreamMediaFrame.from_twilio_message(twilio_message))
         elif twilio_message["event"] == StreamEventsEnum.mark.value:
             """
-            A mark message is received in confirmation of our outgoing messages.
-            We shouldn't get one unless we just sent something.
+            A mark message is received in confirmation of our outgoing messages,
+            once the audio before it has played (or been cleared).
             """
-            pass
+            self._playback.on_mark(twilio_message["mark"]["name"])
+            if self._turn_awaiting_ack and self._playback.pending_marks == 0:
+                self._mark_turn_stage(TurnStage.mark_acknowledged)
+                self._finish_turn_span()
         else:
-            print(f"[warning:phone_call.py] Received other message type: {twilio_message['event']=}")
+            self._logger.warning("Received other message type: %s", twilio_message["event"])
 
-    async def send_text_as_audio(self, text: str) -> None:
+    async def receive_media_frame(self, stream_media_frame: StreamMediaFrame) -> None:
+        """
+        Will process the buffered audio if a pause from the caller is detected.
+        Frames go through the jitter buffer first: back in order, with lost ones as silence.
+        """
+        for released in self._jitter_buffer.push(stream_media_frame):
+            had_started = self._audio_buffer.check_has_started()
+            if isinstance(released, int):
+                self._audio_buffer.append_silence(released)
+            else:
+                payload = released.payload
+                self._audio_buffer.commit(twilio_mulaw_str__into__np_pcm_wav(
+                    payload,
+                    self._audio_buffer.reserve(twilio_mulaw_str__max_samples(payload)), # Decoded in place.
+                ))
+            await self._on_audio(had_started)
+
+    @property
+    def turn_task(self) -> asyncio.Task | None:
+        """
+        The turn in progress (or the last one), e.g. to wait for the answer to be sent.
+        """
+        return self._turn_task
+
+    @property
+    def jitter_buffer(self) -> JitterBuffer:
+        """
+        Its counters say how many inbound frames arrived out of order, late or not at all.
+        """
+        return self._jitter_buffer
+
+    def speak(self, text: str) -> asyncio.Task:
+        """
+        `send_text_as_audio` in the background, so incoming audio keeps being processed:
+        if the caller starts talking over it, it stops, along with any synthesis still pending.
+        """
+        return self._start_turn(self.send_text_as_audio(text))
+
+    async def send_text_as_audio(self, text: str | AsyncIterator[str]) -> None:
         """
         Convert a text message to the twilio message that need to be sent
         to send it as voice-audio to the caller.
+
+        Sentences are synthesized in a background task while the ones before them
+        are being sent, so the caller starts hearing audio after the first sentence.
+        `text` can also be the sentences themselves, as they become available.
+        Audio goes out through the playback queue (a numbered mark after each chunk),
+        then an "ack" mark.
         """
-        if not torch.cuda.is_available():
-            with TmpFilePath("mp3") as tmp_file_path:
-                text__to__mp3(text, tmp_file_path)
-                twilio_mulaw_str: str = mp3_filepath__to__twilio_mulaw_str(tmp_file_path)
-            outgoing_media_message = OutgoingMediaMessage.from_sid_and_mulaw_str(
-                stream_sid=self.stream_sid,
-                twilio_mulaw_str=twilio_mulaw_str,
-            )
-            await self._send_websocket_message_async_method(
-                outgoing_media_message.model_dump_json()
-            )
-        else:
-            print("[debug:twilio_phone_call.py] CUDA available: using coqui-tts.")
-            sentences: list[str] = [s.strip() for s in text.split(".") if s.strip()]
-            for sentence in sentences:
-                with TmpFilePath("wav") as tmp_file_path:
-                    try:
-                        text__to__wav_filepath(sentence, tmp_file_path)
-                        np_pcm_wav: np.ndarray = wav_filepath__to__np_pcm_wav(tmp_file_path)
-                        twilio_mulaw_str: str = np_pcm_wav__to__twilio_mulaw_str(np_pcm_wav)
-                    except Exception as e:
-                        traceback.print_exc()
-                        raise e
-                outgoing_media_message = OutgoingMediaMessage.from_sid_and_mulaw_str(
-                    stream_sid=self.stream_sid,
-                    twilio_mulaw_str=twilio_mulaw_str,
-                )
-                await self._send_websocket_message_async_method(
-                    outgoing_media_message.model_dump_json()
-                )
-        outgoing_mark_message = OutgoingMarkMessage.create_default(
-            stream_sid=self.stream_sid,
-        )
-        await self._send_websocket_message_async_method(
-            outgoing_mark_message.model_dump_json()
-        )
+        sentences = _iterate_async(split_into_sentences(text)) if isinstance(text, str) else text
+        synthesized_sentences: asyncio.Queue[bytes | mmap.mmap | None] = asyncio.Queue()
+        synthesis_task = asyncio.create_task(self._synthesize_sentences(sentences, synthesized_sentences))
+        try:
+            while (mulaw_bytes := await synthesized_sentences.get()) is not None:
+                if self._turn_span is not None and TurnStage.tts_first_chunk not in self._turn_span.timestamps:
+                    self._mark_turn_stage(TurnStage.tts_first_chunk)
+                await self._playback.send_audio(mulaw_bytes, self.outgoing_chunk_size)
+        finally:
+            synthesis_task.cancel()
+        await synthesis_task # Raises if synthesis failed.
+        self._mark_turn_stage(TurnStage.tts_last_chunk)
+        await self._playback.send_mark("ack")
 
     # Private.
 
-    async def _receive_media_message(self, stream_media_message: StreamMediaMessage) -> None:
+    async def _on_audio(self, had_started: bool) -> None:
         """
-        Will return parsed_audio if a pause from the caller is detected, otherwise None.
+        After each frame (or stretch of silence) lands in the audio buffer.
         """
-        audio_chunk: np.ndarray = twilio_mulaw_str__to__np_pcm_wav(stream_media_message.media.payload)
-
-        had_started = self._audio_buffer.check_has_started()
-        self._audio_buffer.append(audio_chunk)
         just_started = (not had_started) and self._audio_buffer.check_has_started()
 
         if just_started:
-            print(f"[debug:twilio_phone_call.py] Just started - interrupting.")
-            await self._send_websocket_message_async_method(
-                OutgoingClearMessage.create_default(stream_sid=self.stream_sid).model_dump_json()
-            )
+            if self._logger.isEnabledFor(logging.DEBUG):
+                self._logger.debug("Just started - interrupting.")
+            self._cancel_turn() # Stop transcribing, answering or synthesizing: they're still talking.
+            if self._instrumentation_sink is not None:
+                self._start_turn_span()
+            await self._playback.clear()
+
+        if self._streaming_transcriber is not None and self._audio_buffer.check_has_started():
+            self._streaming_transcriber.on_audio(self._audio_buffer)
 
         if self._audio_buffer.check_has_finished():
-            print(f"[debug:twilio_phone_call.py] Pause detected - processing.")
-            parsed_audio: np.ndarray = self._audio_buffer.crop_audio()
-            self._audio_buffer = AudioSampleBuffer() # New clean buffer.
-            with TmpFilePath("wav") as tmp_file_path:
-                np_pcm_wav__to__wav_filepath(np_pcm_wav=parsed_audio, wav_path=tmp_file_path)
-                caller_text: str = voice_to_text_safe(wav_path=tmp_file_path)
-                print(f"[debug:twilio_phone_call.py] Caller text deciphered: {caller_text=}")
-                response_text: str = await self._text_to_text_async_method(caller_text)
-                await self.send_text_as_audio(response_text)
+            if self._logger.isEnabledFor(logging.DEBUG):
+                self._logger.debug("Pause detected - processing.")
+            self._mark_turn_stage(TurnStage.pause_detected)
+            finished_audio_buffer = self._audio_buffer
+            self._audio_buffer = self._new_audio_buffer() # New clean buffer.
+            streaming_transcriber = self._streaming_transcriber
+            if streaming_transcriber is not None:
+                self._streaming_transcriber = self._new_streaming_transcriber()
+            self._start_turn(self._respond(finished_audio_buffer, streaming_transcriber))
+
+    def _start_turn(self, turn: Coroutine[Any, Any, None]) -> asyncio.Task:
+        self._cancel_turn()
+        self._turn_task = asyncio.create_task(turn)
+        self._turn_task.add_done_callback(self._log_turn_error)
+        return self._turn_task
+
+    def _log_turn_error(self, turn_task: asyncio.Task) -> None:
+        """
+        Nobody awaits background turns, so report their failure here.
+        """
+        if not turn_task.cancelled() and turn_task.exception() is not None:
+            self._logger.error("Turn failed.", exc_info=turn_task.exception())
+
+    def _cancel_turn(self) -> None:
+        if self._turn_task is not None and not self._turn_task.done():
+            if self._logger.isEnabledFor(logging.DEBUG):
+                self._logger.debug("Cancelling turn (played %.1fs so far).", self._playback.played_seconds)
+            self._turn_task.cancel()
+        self._turn_task = None
+
+    async def _respond(
+        self,
+        finished_audio_buffer: AudioSampleBuffer,
+        streaming_transcriber: StreamingTranscriber | None,
+    ) -> None:
+        """
+        One turn, from the caller's pause to the "ack" mark.
+        """
+        async with self._inference_slot():
+            if streaming_transcriber is not None:
+                self._mark_turn_stage(TurnStage.crop) # The transcriber crops what's left itself.
+                self._mark_turn_stage(TurnStage.stt_start)
+                transcription = streaming_transcriber.finalize(finished_audio_buffer)
+            else:
+                cropped_audio = finished_audio_buffer.crop_audio()
+                self._mark_turn_stage(TurnStage.crop)
+                self._mark_turn_stage(TurnStage.stt_start)
+                transcription = self._transcribe(cropped_audio)
+            self._unanswered_transcriptions.append(asyncio.create_task(transcription))
+            caller_text: str = await self._unanswered_caller_text()
+        # Not holding a slot while the answer is being thought of: that isn't STT / TTS work.
+        self._mark_turn_stage(TurnStage.stt_end)
+        if self._logger.isEnabledFor(logging.DEBUG):
+            self._logger.debug("Caller text deciphered: %r", caller_text)
+        self._mark_turn_stage(TurnStage.text_to_text_start)
+        if self._text_to_text_async_method is not None:
+            response_text: str = await self._text_to_text_async_method(caller_text)
+            self._mark_turn_stage(TurnStage.text_to_text_end)
+            self._unanswered_transcriptions.clear()
+            sentences = _iterate_async(split_into_sentences(response_text))
+        else:
+            assert self._text_to_text_stream_async_method is not None
+            sentences = self._stream_response_sentences(self._text_to_text_stream_async_method, caller_text)
+        async with self._inference_slot(hold_prompt=False):
+            await self.send_text_as_audio(sentences)
+        self._turn_awaiting_ack = self._turn_span is not None
+
+    async def _unanswered_caller_text(self) -> str:
+        """
+        Everything the caller said since they were last answered, in order.
+        A transcription that failed is dropped (and logged): it costs that utterance, not the call.
+        """
+        caller_texts: list[str] = []
+        for transcription in list(self._unanswered_transcriptions):
+            try:
+                # Shielded: if the caller interrupts, the next turn still gets this transcript.
+                caller_texts.append(await asyncio.shield(transcription))
+            except Exception:
+                self._logger.error("Transcription failed.", exc_info=True)
+                self._unanswered_transcriptions.remove(transcription)
+        return " ".join(
+            caller_text for caller_text in caller_texts if caller_text and caller_text != FALLBACK_CALLER_TEXT
+        ) or FALLBACK_CALLER_TEXT
+
+    async def _stream_response_sentences(
+        self,
+        text_to_text_stream_async_method: Callable[[str], AsyncIterator[str]],
+        caller_text: str,
+    ) -> AsyncIterator[str]:
+        """
+        The streamed answer, a sentence at a time.
+        """
+        answered = False
+        remainder = ""
+        async for token in text_to_text_stream_async_method(caller_text):
+            sentences, remainder = split_off_sentences(remainder + token)
+            for sentence in sentences:
+                if not answered:
+                    answered = True
+                    self._mark_turn_stage(TurnStage.text_to_text_end)
+                    self._unanswered_transcriptions.clear()
+                yield sentence
+        if not answered:
+            self._mark_turn_stage(TurnStage.text_to_text_end)
+            self._unanswered_transcriptions.clear()
+        for sentence in split_into_sentences(remainder):
+            yield sentence
+
+    def _start_turn_span(self) -> None:
+        """
+        The caller started speaking: a new turn (the previous one is reported as is,
+        e.g. without `mark_acknowledged` if they talked over the answer).
+        The first voiced frame arrived `len(buffer) - first_nonempty_index` samples ago.
+        """
+        self._finish_turn_span()
+        self._turn_count += 1
+        self._turn_span = TurnSpan(self.stream_sid, self._turn_count)
+        samples_ago = len(self._audio_buffer) - self._audio_buffer.first_nonempty_index
+        self._mark_turn_stage(TurnStage.first_voiced_frame, time.perf_counter() - samples_ago / TWILIO_SAMPLE_RATE)
+
+    def _mark_turn_stage(self, stage: TurnStage, timestamp: float | None = None) -> None:
+        if self._turn_span is None or self._instrumentation_sink is None:
+            return # Instrumentation disabled, or not in a turn.
+        self._turn_span.mark(stage, timestamp)
+        self._instrumentation_sink.on_stage(self._turn_span, stage)
+
+    def _finish_turn_span(self) -> None:
+        if self._turn_span is not None and self._instrumentation_sink is not None:
+            self._instrumentation_sink.record_turn(self._turn_span)
+        self._turn_span = None
+        self._turn_awaiting_ack = False
+
+    def _inference_slot(self, hold_prompt: bool = True) -> AsyncContextManager[None]:
+        if self._call_manager is None:
+            return contextlib.nullcontext()
+        return self._call_manager.inference_slot(self, hold_prompt=hold_prompt)
+
+    async def _transcribe(self, np_pcm_wav: np.ndarray) -> str:
+        if self._stt_batcher is not None:
+            return await self._stt_batcher.transcribe(np_pcm_wav)
+        return await self._audio_executor.run(self.stream_sid, np_pcm_wav__to__text_safe, np_pcm_wav)
+
+    async def _synthesize(self, sentence: str) -> bytes:
+        if self._tts_batcher is not None:
+            return await self._tts_batcher.synthesize(sentence)
+        return await self._audio_executor.run(self.stream_sid, text__to__mulaw_bytes, sentence)
+
+    def _new_audio_buffer(self) -> AudioSampleBuffer:
+        return AudioSampleBuffer(vad=self._vad, endpointing=self._endpointing)
+
+    def _new_streaming_transcriber(self) -> StreamingTranscriber | None:
+        if not self._streaming_transcription:
+            return None
+        return StreamingTranscriber(
+            audio_executor=self._audio_executor,
+            call_key=self.stream_sid,
+            partial_transcript_async_method=self._partial_transcript_async_method,
+        )
+
+    async def _synthesize_sentences(
+        self,
+        sentences: AsyncIterator[str],
+        synthesized_sentences: asyncio.Queue[bytes | mmap.mmap | None],
+    ) -> None:
+        """
+        Producer for `send_text_as_audio`. Always ends the queue with `None`.
+        """
+        try:
+            tts_backend = get_tts_backend_nowait()
+            if tts_backend is None: # Choosing the default imports torch: on a thread, and in this process.
+                tts_backend = await asyncio.to_thread(get_tts_backend)
+            async for sentence in sentences:
+                synthesized_sentences.put_nowait(
+                    await self._tts_cache.get_or_synthesize_async(sentence, tts_backend, self._synthesize)
+                )
+        finally:
+            synthesized_sentences.put_nowait(None)
+
+async def _iterate_async(items: Iterable[str]) -> AsyncIterator[str]:
+    for item in items:
+        yield item
@@ -1,10 +1,13 @@
+from .outgoing_clear_message import OutgoingClearMessage
 from .outgoing_mark_message import OutgoingMarkMessage
 from .outgoing_media_message import OutgoingMediaMessage
 from .outgoing_media_payload import OutgoingMediaPayload
+from .outgoing_message_encoder import OutgoingMessageEncoder
 from .stream_connected_message import StreamConnectedPayload # FIXME
 from .stream_events_enum import StreamEventsEnum
 from .stream_mark_message import StreamMarkMessage
 from .stream_mark_payload import StreamMarkPayload
+from .stream_media_frame import StreamMediaFrame, parse_stream_media_frame
 from .stream_media_message import StreamMediaMessage
 from .stream_media_payload import StreamMediaPayload
 from .stream_start_custom_params import StreamStartCustomParams
@@ -0,0 +1,43 @@
+import json
+
+from .outgoing_clear_message import OutgoingClearMessage
+from .outgoing_mark_message import OutgoingMarkMessage
+from .outgoing_media_message import OutgoingMediaMessage
+from .stream_mark_payload import StreamMarkPayload
+
+_PLACEHOLDER = "TWILIO_PHONE_CALLS_PLACEHOLDER"
+
+class OutgoingMessageEncoder:
+    """
+    Serializes the outgoing messages for one stream.
+
+    The JSON around the payload (or mark name) is rendered once with pydantic,
+    so each message is a single string join, byte-identical to `model_dump_json()`.
+    """
+    def __init__(self, stream_sid: str):
+        assert _PLACEHOLDER not in stream_sid, stream_sid
+        self.stream_sid = stream_sid
+        self._media_prefix, self._media_suffix = OutgoingMediaMessage.from_sid_and_mulaw_str(
+            stream_sid=stream_sid,
+            twilio_mulaw_str=_PLACEHOLDER,
+        ).model_dump_json().split(_PLACEHOLDER)
+        self._mark_prefix, self._mark_suffix = OutgoingMarkMessage(
+            streamSid=stream_sid,
+            mark=StreamMarkPayload(name=_PLACEHOLDER),
+        ).model_dump_json().split(_PLACEHOLDER)
+        self.default_mark_message_json: str = OutgoingMarkMessage.create_default(
+            stream_sid=stream_sid,
+        ).model_dump_json()
+        self.clear_message_json: str = OutgoingClearMessage.create_default(
+            stream_sid=stream_sid,
+        ).model_dump_json()
+
+    def media_message_json(self, twilio_mulaw_str: str) -> str:
+        """
+        `twilio_mulaw_str` is base64, so it never needs escaping.
+        """
+        return "".join((self._media_prefix, twilio_mulaw_str, self._media_suffix))
+
+    def mark_message_json(self, name: str) -> str:
+        escaped_name: str = json.dumps(name, ensure_ascii=False)[1:-1]
+        return "".join((self._mark_prefix, escaped_name, self._mark_suffix))
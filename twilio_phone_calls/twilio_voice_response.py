@@ -1,4 +1,7 @@
-from twilio.twiml.voice_response import VoiceResponse, Connect, Stream
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from twilio.twiml.voice_response import VoiceResponse
 
 """
 In FastAPI, the form data for the call POST route is like this:
@@ -36,7 +39,8 @@ form FormData([
 def create_twilio_voice_response(
     caller_number: str,
     websocket_url: str,
-) -> VoiceResponse:
+) -> "VoiceResponse":
+    from twilio.twiml.voice_response import VoiceResponse, Connect, Stream
     response = VoiceResponse()
     connect = Connect()
     stream = Stream(name="stream", url=websocket_url)